@@ -0,0 +1,57 @@
+import time
+
+import streamlit as st
+from utils.progress import format_rows, get_store
+from utils.session_memory import page_rerun
+
+st.set_page_config(page_title="学习进度", page_icon="📊", layout="wide")
+with page_rerun("10_学习进度"):
+
+    st.title("📊 学习进度看板")
+    st.markdown("""
+第 6 页（鸟头模型）和第 8 页（蝴蝶模型）的每一次答题都会被记录下来。
+在页面地址后加上 `?learner=学号`，同一位同学在不同时间、不同设备上的记录就能累计到一起。
+""")
+
+    store = get_store()
+    if store is None:
+        st.warning("进度记录未开启（环境变量 P2J_PROGRESS_DB 为空，或数据库无法打开）。")
+        st.stop()
+
+    windows = {"今天": 86400, "最近 7 天": 7 * 86400, "全部": None}
+    col_window, col_flush = st.columns([3, 1])
+    with col_window:
+        window = st.radio("统计范围", list(windows), horizontal=True, key="progress_window")
+    with col_flush:
+        if st.button("⏬ 立即写入", help="答题记录每秒批量写入一次；点这里马上写入缓冲区中的记录"):
+            store.flush()
+    since = time.time() - windows[window] if windows[window] else 0.0
+
+    totals = store.totals(since)
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric("答题次数", totals["attempts"])
+    c2.metric("学生数", totals["learners"])
+    c3.metric("正确率", "—" if totals["accuracy"] is None else f"{totals['accuracy']:.0%}")
+    c4.metric("平均用时", "—" if totals["avg_seconds"] is None else f"{totals['avg_seconds']:.1f} 秒")
+    c5.metric("待写入", store.pending)
+
+    st.subheader("按页面与题位")
+    st.dataframe(format_rows(store.by_page(since)), hide_index=True, width="stretch")
+
+    st.subheader("按题目")
+    page_filter = st.selectbox("页面", ["全部", "6_鸟头模型", "8_蝴蝶模型"], key="progress_page")
+    st.dataframe(format_rows(store.by_question(None if page_filter == "全部" else page_filter, since)),
+                 hide_index=True, width="stretch")
+    st.caption("正确率低、平均用时长的题目，值得在课堂上再讲一遍。")
+
+    st.subheader("查询某位同学")
+    learner = st.text_input("学号（即地址中的 learner 参数）", key="progress_learner_query")
+    if learner:
+        history = store.learner_history(learner.strip())
+        if history:
+            st.dataframe(format_rows(history), hide_index=True, width="stretch")
+        else:
+            st.info("没有找到这位同学的答题记录。")
+
+    with st.expander("最近的答题记录"):
+        st.dataframe(format_rows(store.recent(50)), hide_index=True, width="stretch")
@@ -0,0 +1,122 @@
+import csv
+import io
+
+import streamlit as st
+from utils.bulk import (CHUNK_ROWS, OUTPUT_FORMATS, read_csv_chunks, read_parquet_chunks,
+                        sample_chunks, start_job)
+from utils.fonts import setup_custom_font
+from utils.session_memory import page_rerun
+
+# 设置页面和字体
+setup_custom_font("font/SimHei.ttf")
+st.set_page_config(page_title="批量三角形分析", page_icon="🗂️", layout="wide")
+with page_rerun("11_批量三角形分析"):
+
+    st.title("🗂️ 批量三角形分析")
+    st.markdown(f"""
+上传全班的三角形数据（每行 **3 个边长** 或 **6 个顶点坐标** x1,y1,x2,y2,x3,y3），
+程序会逐个按角、按边分类，计算面积和三个内角，并统计相似组。
+
+文件按每 {CHUNK_ROWS:,} 行一块流式处理，几百万行也不会占满内存；结果逐块写入文件，
+分析完成后可以下载。分析在后台进行，期间页面上的其他内容照常可用。
+""")
+
+    col_src, col_opt = st.columns([3, 2])
+    with col_src:
+        source = st.radio("数据来源", ["上传文件", "示例数据"], horizontal=True, key="bulk_source")
+        upload = None
+        if source == "上传文件":
+            upload = st.file_uploader("CSV（可 gzip 压缩）或 Parquet 文件",
+                                      type=["csv", "gz", "parquet"], key="bulk_upload")
+        else:
+            sample_rows = st.select_slider("示例数据行数", [10_000, 100_000, 1_000_000, 5_000_000],
+                                           value=1_000_000, key="bulk_sample_rows",
+                                           format_func=lambda n: f"{n:,}")
+    with col_opt:
+        fmt = st.radio("结果文件格式", list(OUTPUT_FORMATS), horizontal=True, key="bulk_fmt",
+                       help="Parquet 文件更小，适合再用程序处理；CSV 可以直接用 Excel 打开")
+        tol = st.select_slider("相似判断的容差", [1e-4, 1e-3, 1e-2], value=1e-3, key="bulk_tol",
+                               help="归一化后的边长比相差不超过容差即视为相似")
+
+
+    def make_chunks():
+        """返回在后台线程里调用的数据块生成函数和数据来源说明。"""
+        if source == "示例数据":
+            return (lambda: sample_chunks(sample_rows)), f"示例数据（{sample_rows:,} 行）"
+        name = upload.name
+        if name.lower().endswith(".parquet"):
+            return (lambda: read_parquet_chunks(upload)), name
+        return (lambda: read_csv_chunks(upload, name)), name
+
+
+    job = st.session_state.get("bulk_job")
+    ready = source == "示例数据" or upload is not None
+    if st.button("▶️ 开始分析", type="primary", disabled=not ready):
+        if job is not None:
+            job.cancel()
+        chunks, label = make_chunks()
+        job = st.session_state["bulk_job"] = start_job(chunks, label, fmt, tol)
+
+    if job is None:
+        st.info("选择数据后点击“开始分析”。")
+        st.stop()
+
+
+    @st.fragment(run_every=0.5)
+    def show_progress():
+        """任务进行中每半秒刷新一次进度；任务结束时整页重跑一次以显示结果。"""
+        if not job.active:
+            st.rerun()
+        status = "排队中…" if job.state == "queued" else f"已处理 {job.rows:,} 行"
+        st.progress(job.progress, text=f"{job.source}：{status}")
+        if st.button("⏹️ 取消", key="bulk_cancel"):
+            job.cancel()
+
+
+    if job.active:
+        show_progress()
+        st.stop()
+
+    if job.state == "failed":
+        st.error(f"分析失败：{job.error}")
+    elif job.state == "cancelled":
+        st.warning(f"分析已取消（已处理 {job.rows:,} 行）。")
+
+    if job.state == "done":
+        st.subheader(f"分析结果：{job.source}")
+        valid = job.rows - job.invalid
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("三角形数", f"{job.rows:,}")
+        c2.metric("不能构成三角形", f"{job.invalid:,}")
+        c3.metric("用时", f"{job.seconds:.2f} 秒")
+        c4.metric("处理速度", f"{job.rows / max(job.seconds, 1e-9):,.0f} 行/秒")
+        if valid:
+            st.caption(f"面积：平均 {job.area_sum / valid:.4g}，最小 {job.area_min:.4g}，"
+                       f"最大 {job.area_max:.4g}")
+
+        st.markdown("#### 分类统计")
+        st.dataframe(job.class_table(), hide_index=True, width="stretch")
+
+        st.markdown("#### 最大的相似组")
+        groups = job.top_groups(50)
+        st.dataframe(groups, hide_index=True, width="stretch")
+        st.caption(f"共 {len(job.groups.keys):,} 个相似组（容差 {job.tol:g}），这里列出最多的 50 组。")
+
+        def read_result():
+            with open(job.path, "rb") as f:
+                return f.read()
+
+        def group_csv():
+            buf = io.StringIO()
+            writer = csv.DictWriter(buf, fieldnames=list(groups[0]) if groups else ["组号"])
+            writer.writeheader()
+            writer.writerows(groups)
+            return buf.getvalue().encode("utf-8-sig")
+
+        d1, d2 = st.columns(2)
+        d1.download_button("📥 下载逐行结果", read_result,
+                           file_name=f"triangles_result{OUTPUT_FORMATS[job.fmt]}",
+                           mime="text/csv" if job.fmt == "CSV" else "application/octet-stream",
+                           width="stretch")
+        d2.download_button("📥 下载相似组汇总 (CSV)", group_csv, file_name="similar_groups.csv",
+                           mime="text/csv", width="stretch")
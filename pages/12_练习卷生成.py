@@ -0,0 +1,77 @@
+import io
+import time
+
+import streamlit as st
+from utils.fonts import setup_custom_font
+from utils.problem_bank import describe, get_default_bank
+from utils.render import RENDER_BACKEND
+from utils.session_memory import page_rerun
+from utils.worksheet import MAX_PROBLEMS, MAX_STUDENTS, TOPICS, WorksheetSpec, write_worksheet
+
+# 设置页面和字体
+setup_custom_font("font/SimHei.ttf")
+st.set_page_config(page_title="练习卷生成", page_icon="🖨️", layout="wide")
+with page_rerun("12_练习卷生成"):
+
+    st.title("🖨️ 练习卷生成")
+    st.markdown("""
+选好题型、份数和每份题数，一键生成可以直接打印的 PDF：**每位同学一份不同的卷子**，
+插图与各模型页面的画法一致，最后附全班的答案。
+
+同样的设置（包括随机种子）总是生成同一套卷子，卷子丢了可以原样重印；想换一套题，改一下随机种子即可。
+""")
+
+    col_topics, col_opts = st.columns([3, 2])
+    with col_topics:
+        topics = st.multiselect("题型", list(TOPICS), default=list(TOPICS), format_func=TOPICS.get,
+                                key="ws_topics", help="每份卷子按这里的顺序轮流出题")
+        title = st.text_input("卷首标题", "几何模型练习卷", max_chars=30, key="ws_title")
+        handout = st.checkbox("最前面附一页例题讲义（等高模型、一半模型的应用示例）", key="ws_handout")
+    with col_opts:
+        students = st.number_input("份数（学生人数）", 1, MAX_STUDENTS, 40, key="ws_students")
+        problems = st.number_input("每份题数", 1, MAX_PROBLEMS, 10, key="ws_problems")
+        seed = st.number_input("随机种子", 1, 9999, 1, key="ws_seed")
+
+    if not topics:
+        st.info("请至少选择一种题型。")
+        st.stop()
+
+    spec = WorksheetSpec(tuple(topics), int(students), int(problems), int(seed),
+                         title.strip() or "几何模型练习卷", handout)
+    st.caption(f"共 {spec.total_pages} 页：每份 {spec.sheet_pages} 页 × {spec.students} 份，"
+               f"另有答案页{'与讲义页' if spec.handout else ''}。")
+
+    if st.button("📄 生成 PDF", type="primary"):
+        bar = st.progress(0.0, text="准备插图…")
+        start = time.perf_counter()
+
+        def on_page(done, total):
+            bar.progress(done / total, text=f"已排好 {done} / {total} 页")
+
+        buf = io.BytesIO()
+        try:
+            write_worksheet(spec, buf, on_page=on_page)
+        except Exception as exc:
+            bar.empty()
+            st.error(f"生成失败：{exc}")
+        else:
+            st.session_state["ws_result"] = (spec, buf.getvalue(), time.perf_counter() - start)
+            bar.empty()
+
+    result = st.session_state.get("ws_result")
+    if result is not None:
+        made, pdf, seconds = result
+        if made != spec:
+            st.warning("设置已经改动，下面是按之前的设置生成的卷子；点“生成 PDF”重新生成。")
+        c1, c2, c3 = st.columns(3)
+        c1.metric("页数", made.total_pages)
+        c2.metric("用时", f"{seconds:.1f} 秒")
+        c3.metric("文件大小", f"{len(pdf) / 1e6:.1f} MB")
+        st.download_button("📥 下载 PDF", pdf, file_name=f"worksheet_seed{made.seed}.pdf",
+                           mime="application/pdf", type="primary")
+        if RENDER_BACKEND.workers == 0:
+            st.caption("当前在单个进程里排版；设置 P2J_RENDER_WORKERS 开启渲染进程池后会快得多。")
+
+        with st.expander("预览第 1 份的题目与答案"):
+            for i, problem in enumerate(made.problems_for(0, get_default_bank()), start=1):
+                st.markdown(f"**{i}.** {describe(problem)}　（答案：{problem.answer_text}）")
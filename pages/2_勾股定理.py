@@ -1,20 +1,26 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Polygon
-import io
-import base64
-import matplotlib
 from utils.fonts import setup_custom_font
+from utils.illustrations import ladder_example, pythagorean_proof, triple_distribution
+from utils.models import get_model
+from utils.pythagorean import triple_statistics, triples_with_hypotenuse, triples_with_leg
+from utils.render import FigureBatch, figure_job, model_job
+from utils.session_memory import page_rerun
+from utils.widgets import model_widgets
 
 # 使用项目内自定义字体进行初始化（优先使用 font/SimHei.ttf）
 setup_custom_font("font/SimHei.ttf")
 
 st.set_page_config(page_title="勾股定理", page_icon="📐")
+with page_rerun("2_勾股定理"):
 
-st.title("勾股定理")
+    PYTHAGOREAN = get_model("pythagorean")
+    # 页面上的四张图先占位，末尾一次性并发渲染
+    figures = FigureBatch()
 
-st.markdown("""
+    st.title("勾股定理")
+
+    st.markdown("""
 勾股定理（也称为毕达哥拉斯定理）是平面几何中的一个基本定理，描述了直角三角形中三边长度之间的关系。
 
 ### 定理内容
@@ -28,68 +34,20 @@ st.markdown("""
 - $c$ 是直角三角形斜边的长度
 """)
 
-# 创建绘制直角三角形的函数
-def plot_right_triangle(a, b, title, color='skyblue', figsize=(6, 6)):
-    """绘制直角三角形并返回图像的 base64 编码。
-
-    Args:
-        a: 第一条直角边长度。
-        b: 第二条直角边长度。
-        title: 图像标题。
-        color: 三角形填充颜色。
-        figsize: 图像大小。
-
-    Returns:
-        图像的 base64 编码字符串。
-    """
-    c = np.sqrt(a**2 + b**2)
-    vertices = [(0, 0), (a, 0), (0, b)]
-
-    fig, ax = plt.subplots(figsize=figsize)
-
-    triangle = Polygon(vertices, fill=True, color=color, alpha=0.6)
-    ax.add_patch(triangle)
-
-    ax.plot([0, a], [0, 0], 'k-', linewidth=2)
-    ax.plot([0, 0], [0, b], 'k-', linewidth=2)
-    ax.plot([a, 0], [0, b], 'k-', linewidth=2)
-
-    ax.plot([0, 0.2], [0, 0], 'k-', linewidth=2)
-    ax.plot([0, 0], [0, 0.2], 'k-', linewidth=2)
-
-    ax.text(a/2, -0.3, f'a = {a}', ha='center', fontsize=12)
-    ax.text(-0.3, b/2, f'b = {b}', va='center', rotation=90, fontsize=12)
-    ax.text(a/2-0.5, b/2+0.3, f'c = {c:.2f}', ha='center', fontsize=12)
-
-    ax.text(-0.2, -0.2, 'C', fontsize=12)
-    ax.text(a+0.2, -0.2, 'A', fontsize=12)
-    ax.text(-0.2, b+0.2, 'B', fontsize=12)
-
-    ax.set_xlim(-1, a+1)
-    ax.set_ylim(-1, b+1)
-    ax.set_aspect('equal')
-    ax.set_title(title, fontsize=14, pad=10)
-    ax.grid(True, linestyle='--', alpha=0.7)
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight')
-    plt.close(fig)
-    buf.seek(0)
-    img_str = base64.b64encode(buf.read()).decode('utf-8')
-    return img_str
+    # 勾股定理可视化
+    st.header("勾股定理可视化")
 
-# 勾股定理可视化
-st.header("勾股定理可视化")
+    col1, col2 = st.columns(2)
 
-col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("设置直角三角形的边长")
+        # 参数、计算和图形都由注册表中的 "pythagorean" 模型提供
+        params = model_widgets(PYTHAGOREAN)
+        a, b = params["a"], params["b"]
+        result = PYTHAGOREAN.evaluate(**params)
+        c = result["c"]
 
-with col1:
-    st.subheader("设置直角三角形的边长")
-    a = st.slider("直角边a的长度", 1, 10, 3)
-    b = st.slider("直角边b的长度", 1, 10, 4)
-    c = np.sqrt(a**2 + b**2)
-
-    st.markdown(f"""
+        st.markdown(f"""
     ### 计算结果
     - 直角边a = {a}
     - 直角边b = {b}
@@ -103,14 +61,62 @@ with col1:
     因此，$a^2 + b^2 = c^2$ 成立。
     """)
 
-with col2:
-    triangle_img = plot_right_triangle(a, b, f"直角三角形 (a={a}, b={b}, c={c:.2f})")
-    st.image(f"data:image/png;base64,{triangle_img}", caption="勾股定理图示")
+        c_int = result["c_int"]
+        if c_int is not None:
+            k = np.gcd(a, b)
+            if k == 1:
+                st.success(f"🎉 斜边恰好是整数！({a}, {b}, {c_int}) 是一组本原勾股数。")
+            else:
+                st.success(f"🎉 斜边恰好是整数！({a}, {b}, {c_int}) 是本原勾股数 "
+                           f"({a // k}, {b // k}, {c_int // k}) 的 {k} 倍。")
+
+    with col2:
+        figures.image(model_job("pythagorean", **params), caption="勾股定理图示")
+
+    # 勾股数探索
+    st.header("勾股数探索")
 
-# 勾股定理的证明
-st.header("勾股定理的证明")
+    st.markdown("""
+三边都是整数的直角三角形叫做**勾股数**，例如 $(3, 4, 5)$、$(5, 12, 13)$。
+三边没有公因数的叫做**本原勾股数**，其余的都是本原勾股数的整数倍。
 
-st.markdown("""
+任取互素、一奇一偶的整数 $m > n > 0$，令
+$a = m^2 - n^2,\\ b = 2mn,\\ c = m^2 + n^2$，就得到全部本原勾股数。
+""")
+
+    with st.expander("🔍 勾股数查询与分布图"):
+        q1, q2 = st.columns(2)
+        with q1:
+            leg = st.number_input("含有直角边", min_value=3, max_value=10**9, value=12, step=1,
+                                  key="triple_leg")
+            found = triples_with_leg(int(leg))
+            st.markdown(f"共 **{len(found)}** 组：")
+            st.dataframe({"a": found[:, 0], "b": found[:, 1], "c": found[:, 2]},
+                         hide_index=True, height=200)
+        with q2:
+            hyp = st.number_input("斜边等于", min_value=5, max_value=10**9, value=65, step=1,
+                                  key="triple_hyp")
+            found = triples_with_hypotenuse(int(hyp))
+            st.markdown(f"共 **{len(found)}** 组：")
+            st.dataframe({"a": found[:, 0], "b": found[:, 1], "c": found[:, 2]},
+                         hide_index=True, height=200)
+
+        limit = st.select_slider("斜边上界 N", options=[10**3, 10**4, 10**5, 10**6, 10**7],
+                                 value=10**5, format_func=lambda n: f"{n:,}", key="triple_limit")
+        with st.spinner("正在分块枚举勾股数……"):
+            stats = triple_statistics(limit)
+        st.markdown(f"斜边不超过 {limit:,} 的勾股数共有 **{stats['total']:,}** 组，"
+                    f"其中本原勾股数 **{stats['primitive']:,}** 组"
+                    f"（约占 {stats['primitive'] / stats['total']:.1%}）。")
+        # stats 含数组，不能自动生成缓存键；同一个上界的统计结果是确定的，用上界作键
+        figures.image(figure_job(triple_distribution, stats, limit,
+                                 key=("triple_distribution", limit), size_hint=(14, 6)),
+                      caption="勾股数分布图")
+
+    # 勾股定理的证明
+    st.header("勾股定理的证明")
+
+    st.markdown("""
 勾股定理有很多种证明方法，以下是一种常见的几何证明：
 
 1. 构造一个边长为 $a+b$ 的正方形
@@ -122,120 +128,13 @@ st.markdown("""
 7. 化简得到：$a^2 + b^2 = c^2$
 """)
 
-# 下面的图像绘制与原逻辑一致，仅移除局部字体设置，改为全局字体
-def plot_pythagorean_proof(a, b):
-    """
-    绘制勾股定理证明图并返回图像的base64编码
-    
-    参数:
-        a: 第一条直角边的长度
-        b: 第二条直角边的长度
-    
-    返回:
-        图像的base64编码字符串
-    """
-    # 计算斜边长度
-    c = np.sqrt(a**2 + b**2)
-    
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 7))
-    
-    # 第一个图：四个三角形围成的大正方形
-    ax1.set_xlim(-0.5, a+b+0.5)
-    ax1.set_ylim(-0.5, a+b+0.5)
-    
-    # 绘制外部正方形
-    square = plt.Rectangle((0, 0), a+b, a+b, fill=False, color='black', linewidth=2)
-    ax1.add_patch(square)
-    
-    # 绘制四个全等的直角三角形（正确的顶点坐标）
-    triangle1 = Polygon([(0, 0), (a, 0), (0, b)], fill=True, color='skyblue', alpha=0.7, edgecolor='blue')
-    triangle2 = Polygon([(a, 0), (a+b, 0), (a+b, a)], fill=True, color='skyblue', alpha=0.7, edgecolor='blue')
-    triangle3 = Polygon([(a+b, a), (a+b, a+b), (b, a+b)], fill=True, color='skyblue', alpha=0.7, edgecolor='blue')
-    triangle4 = Polygon([(b, a+b), (0, a+b), (0, b)], fill=True, color='skyblue', alpha=0.7, edgecolor='blue')
-    
-    ax1.add_patch(triangle1)
-    ax1.add_patch(triangle2)
-    ax1.add_patch(triangle3)
-    ax1.add_patch(triangle4)
-    
-    # 绘制中间的正方形（边长为c的正方形）
-    inner_square = Polygon([(a, 0), (a+b, a), (b, a+b), (0, b)], fill=True, color='lightgreen', alpha=0.7, edgecolor='green')
-    ax1.add_patch(inner_square)
-    
-    # 添加边长标签
-    ax1.text(a/2, -0.3, f'a = {a}', ha='center', fontsize=12, weight='bold')
-    ax1.text(-0.3, b/2, f'b = {b}', va='center', rotation=90, fontsize=12, weight='bold')
-    ax1.text(a+b+0.3, a/2, f'a = {a}', va='center', rotation=90, fontsize=12, weight='bold')
-    ax1.text((a+b)/2, a+b+0.3, f'b = {b}', ha='center', fontsize=12, weight='bold')
-    
-    # 添加斜边标签
-    ax1.text((a+b/2)/2, (0+a/2)/2, f'c = {c:.1f}', ha='center', va='center', rotation=np.degrees(np.arctan(a/b)), fontsize=10, color='green', weight='bold')
-    
-    # 添加面积标签
-    ax1.text((a+b/2)/2, (a+b+b/2)/2, f'$c^2$', ha='center', va='center', fontsize=14, color='green', weight='bold')
-    
-    # 设置标题（统一使用全局字体设置）
-    ax1.set_title("勾股定理证明：四个三角形 + 中间正方形", fontsize=14, pad=10)
-    
-    ax1.set_aspect('equal')
-    ax1.grid(True, linestyle='--', alpha=0.3)
-    
-    # 第二个图：重新排列的面积分解
-    ax2.set_xlim(-0.5, a+b+0.5)
-    ax2.set_ylim(-0.5, a+b+0.5)
-    
-    # 绘制外部正方形
-    square = plt.Rectangle((0, 0), a+b, a+b, fill=False, color='black', linewidth=2)
-    ax2.add_patch(square)
-    
-    # 绘制重新排列的区域：两个正方形和两个矩形
-    square_a = plt.Rectangle((0, 0), a, a, fill=True, color='lightcoral', alpha=0.7, edgecolor='red')
-    square_b = plt.Rectangle((a, a), b, b, fill=True, color='lightblue', alpha=0.7, edgecolor='blue')
-    rect1 = plt.Rectangle((a, 0), b, a, fill=True, color='lightyellow', alpha=0.7, edgecolor='orange')
-    rect2 = plt.Rectangle((0, a), a, b, fill=True, color='lightyellow', alpha=0.7, edgecolor='orange')
-    
-    ax2.add_patch(square_a)
-    ax2.add_patch(square_b)
-    ax2.add_patch(rect1)
-    ax2.add_patch(rect2)
-    
-    # 添加面积标签
-    ax2.text(a/2, a/2, f'$a^2$\n$= {a**2}$', ha='center', va='center', fontsize=12, weight='bold')
-    ax2.text(a+b/2, a+b/2, f'$b^2$\n$= {b**2}$', ha='center', va='center', fontsize=12, weight='bold')
-    ax2.text(a+b/2, a/2, f'$ab$\n$= {a*b}$', ha='center', va='center', fontsize=11, weight='bold')
-    ax2.text(a/2, a+b/2, f'$ab$\n$= {a*b}$', ha='center', va='center', fontsize=11, weight='bold')
-    
-    # 添加边长标签
-    ax2.text(a/2, -0.3, f'a = {a}', ha='center', fontsize=12, weight='bold')
-    ax2.text(a+b/2, -0.3, f'b = {b}', ha='center', fontsize=12, weight='bold')
-    ax2.text(-0.3, a/2, f'a = {a}', va='center', rotation=90, fontsize=12, weight='bold')
-    ax2.text(-0.3, a+b/2, f'b = {b}', va='center', rotation=90, fontsize=12, weight='bold')
-    
-    # 设置标题（统一使用全局字体设置）
-    ax2.set_title(f"面积重新排列：$(a+b)^2 = a^2 + 2ab + b^2 = {(a+b)**2}$", fontsize=14, pad=10)
-    
-    ax2.set_aspect('equal')
-    ax2.grid(True, linestyle='--', alpha=0.3)
-    
-    plt.tight_layout()
-    
-    # 将图像转换为base64编码
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight', dpi=100)
-    plt.close(fig)
-    buf.seek(0)
-    img_str = base64.b64encode(buf.read()).decode('utf-8')
-    
-    return img_str
-
-# 显示勾股定理证明图
-proof_img = plot_pythagorean_proof(a, b)
-st.image(f"data:image/png;base64,{proof_img}", caption="勾股定理证明图示")
-
-# 勾股定理的应用
-st.header("勾股定理的应用")
-
-st.markdown("""
+    # 显示勾股定理证明图
+    figures.image(figure_job(pythagorean_proof, a, b, size_hint=(14, 7)), caption="勾股定理证明图示")
+
+    # 勾股定理的应用
+    st.header("勾股定理的应用")
+
+    st.markdown("""
 勾股定理在现实生活中有许多应用，例如：
 
 1. **建筑与工程**：用于确保建筑物的墙壁是垂直的，或者计算斜坡的长度。
@@ -249,10 +148,10 @@ st.markdown("""
 5. **计算机图形学**：用于计算屏幕上两点之间的距离。
 """)
 
-# 实际应用示例
-st.subheader("实际应用示例：计算梯子高度")
+    # 实际应用示例
+    st.subheader("实际应用示例：计算梯子高度")
 
-st.markdown("""
+    st.markdown("""
 假设一个梯子靠在墙上，梯子底部距离墙壁3米，梯子长度为5米，我们可以使用勾股定理计算梯子能够到达的高度。
 
 设梯子能够到达的高度为 $h$，则：
@@ -268,55 +167,18 @@ $h = 4$
 因此，梯子能够到达的高度是4米。
 """)
 
-# 创建梯子示例图
-def plot_ladder_example():
-    """
-    绘制梯子示例图并返回图像的base64编码
-    """
-    fig, ax = plt.subplots(figsize=(8, 6))
-    
-    # 绘制墙壁和地面
-    ax.plot([0, 0], [0, 5], 'k-', linewidth=3)  # 墙壁
-    ax.plot([0, 5], [0, 0], 'k-', linewidth=3)  # 地面
-    
-    # 绘制梯子
-    ax.plot([0, 3], [4, 0], 'r-', linewidth=4)  # 梯子
-    
-    # 添加标签
-    ax.text(1.5, -0.3, '3米', ha='center', fontsize=12)
-    ax.text(-0.3, 2, '4米', va='center', rotation=90, fontsize=12)
-    ax.text(1.8, 2.2, '5米', ha='center', rotation=-53, fontsize=12)
-    
-    # 设置坐标轴范围和标题
-    ax.set_xlim(-0.5, 5)
-    ax.set_ylim(-0.5, 5)
-    
-    # 设置标题（统一使用全局字体设置）
-    ax.set_title("梯子靠墙问题", fontsize=14, pad=10)
-    
-    ax.set_aspect('equal')
-    ax.grid(True, linestyle='--', alpha=0.7)
-    
-    # 将图像转换为base64编码
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight')
-    plt.close(fig)
-    buf.seek(0)
-    img_str = base64.b64encode(buf.read()).decode('utf-8')
-    
-    return img_str
-
-# 显示梯子示例图
-ladder_img = plot_ladder_example()
-st.image(f"data:image/png;base64,{ladder_img}", caption="梯子靠墙问题示例")
-
-# 历史背景
-st.header("历史背景")
-
-st.markdown("""
+    # 显示梯子示例图
+    figures.image(figure_job(ladder_example, size_hint=(8, 6)), caption="梯子靠墙问题示例")
+
+    # 历史背景
+    st.header("历史背景")
+
+    st.markdown("""
 勾股定理的名称来源于中国古代数学家勾股（约公元前6世纪），但在西方世界，这个定理通常被称为毕达哥拉斯定理，以纪念古希腊数学家毕达哥拉斯（约公元前570年-约公元前495年）。
 
 实际上，这个定理在毕达哥拉斯之前就已经被巴比伦人和埃及人所知晓。巴比伦人在公元前1800年左右的粘土板上记录了一些勾股三元组（满足勾股定理的三个整数）。
 
 在中国，《周髀算经》（约公元前1100年至公元前256年）中记载了"勾三股四弦五"的直角三角形，这是最早的勾股三元组之一。
-""")
\ No newline at end of file
+""")
+
+    figures.render()
@@ -1,83 +1,110 @@
 import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Polygon
 
 # 引入并初始化项目内自定义字体（优先使用 font/SimHei.ttf）
+from utils.cevians import (REGION_NAMES, ROUTH_GRID, ceva_partner, lookup,
+                            routh_table, solve_cevians, swallowtail_table)
 from utils.fonts import setup_custom_font
+from utils.illustrations import routh_division
+from utils.models import get_model
+from utils.render import FigureBatch, figure_job, model_job
+from utils.session_memory import page_rerun
+from utils.sweep import Axis, render_sweep, swallowtail_ratio, swallowtail_s1
+from utils.widgets import model_widgets
 setup_custom_font("font/SimHei.ttf")
 
 st.set_page_config(page_title="燕尾模型", page_icon="🕊️")
+with page_rerun("5_燕尾模型"):
+    figures = FigureBatch()
 
-st.title("燕尾模型：左右燕尾面积比 = 对应底边比")
-
-# 说明与核心公式（使用 LaTeX 展示所有公式）
-st.markdown("在△ABC中，取点 F∈BC，点 E∈AC，连 AF 与 BE 交于 O。定义四块面积如下：")
-st.latex(r"S_1=S_{\triangle AOB},\ S_2=S_{\triangle AOC},\ S_3=S_{\triangle BOF},\ S_4=S_{\triangle COF}")
-st.markdown("核心结论：")
-st.latex(r"\frac{S_1}{S_2}=\frac{S_3}{S_4}=\frac{BF}{FC}")
-# 参考与等价表述（只做知识性引用，不依赖具体图形编号）
-st.markdown("等价表述：")
-st.latex(r"\frac{S_1+S_3}{S_2+S_4}=\frac{BD}{DC}")
-st.latex(r"\frac{S_{\triangle ABD}}{S_{\triangle ADC}}=\frac{BE}{EC}")
-
-st.subheader("交互演示")
-col1, col2 = st.columns([1,1])
-
-with col1:
-    st.write("在底边BC上移动点F，在边AC上移动点E，观察比值是否恒等于BF/FC。")
-    t = st.slider("F在BC上的位置 (BF/BC)", 0.1, 0.9, 0.4, 0.01)
-    s = st.slider("E在AC上的位置 (AE/AC)", 0.1, 0.9, 0.6, 0.01)
-
-# 几何构造
-A = np.array([0.5, 1.0]); B = np.array([0.0, 0.0]); C = np.array([1.0, 0.0])
-F = B*(1-t) + C*t            # F∈BC
-E = A*(1-s) + C*s            # E∈AC
-
-# 线段交点 O = AF ∩ BE
-def intersect(P1, P2, Q1, Q2):
-    """计算线段P1P2与Q1Q2的交点。
-
-    Args:
-        P1, P2: 第一条线段的端点，形如 np.array([x, y]).
-        Q1, Q2: 第二条线段的端点，形如 np.array([x, y]).
-
-    Returns:
-        np.array: 两线段的交点坐标（假定两线不平行且存在唯一交点）。
-    """
-    u = P2-P1; v = Q2-Q1; w = Q1-P1
-    M = np.array([[u[0], -v[0]], [u[1], -v[1]]])
-    x = np.linalg.solve(M, w)
-    return P1 + x[0]*u
-O = intersect(A, F, B, E)
-
-# 三角形面积
-area = lambda P,Q,R: 0.5*abs(np.cross(Q-P, R-P))
-S1 = area(A, B, O); S2 = area(A, C, O); S3 = area(B, F, O); S4 = area(C, F, O)
-BF = np.linalg.norm(B-F); FC = np.linalg.norm(F-C)
-
-ratio12 = S1/S2 if S2>0 else np.nan
-ratio34 = S3/S4 if S4>0 else np.nan
-ratioBF = BF/FC if FC>0 else np.nan
-
-with col2:
-    fig, ax = plt.subplots(figsize=(6,5))
-    tri = Polygon([A,B,C], fill=False, ec='k', lw=2); ax.add_patch(tri)
-    # 填充四块“燕尾”
-    ax.add_patch(Polygon([A,B,O], fc='#FFE08A', ec='orange', alpha=0.8))  # S1
-    ax.add_patch(Polygon([A,C,O], fc='#F9A8D4', ec='crimson', alpha=0.8))  # S2
-    ax.add_patch(Polygon([B,F,O], fc='#93C5FD', ec='navy', alpha=0.85))    # S3
-    ax.add_patch(Polygon([C,F,O], fc='#86EFAC', ec='green', alpha=0.85))   # S4
-    ax.plot([A[0],F[0]],[A[1],F[1]],'k--',lw=1.2)
-    ax.plot([B[0],E[0]],[B[1],E[1]],'k--',lw=1.2)
-    for name,P in {"A":A,"B":B,"C":C,"E":E,"F":F,"O":O}.items():
-        ax.plot(P[0],P[1],'ko',ms=6); ax.text(P[0]+0.02,P[1]+0.02,name,fontsize=10)
-    ax.set_aspect('equal'); ax.set_xlim(-0.05,1.05); ax.set_ylim(-0.05,1.05)
-    ax.set_title("燕尾模型示意图")
-    st.pyplot(fig)
-
-st.subheader("数值验证")
-st.write(f"S1={S1:.4f}, S2={S2:.4f}, S3={S3:.4f}, S4={S4:.4f};  BF={BF:.4f}, FC={FC:.4f}")
-# 使用 LaTeX 展示理论等式与数值近似
-st.latex(r"\frac{S_1}{S_2}=\frac{S_3}{S_4}=\frac{BF}{FC}")
-st.latex(rf"\frac{{S_1}}{{S_2}}\approx {ratio12:.4f}\ ,\ \frac{{S_3}}{{S_4}}\approx {ratio34:.4f}\ ,\ \frac{{BF}}{{FC}}\approx {ratioBF:.4f}")
+    SWALLOWTAIL = get_model("swallowtail")
+
+    st.title("燕尾模型：左右燕尾面积比 = 对应底边比")
+
+    # 说明与核心公式（使用 LaTeX 展示所有公式）
+    st.markdown("在△ABC中，取点 F∈BC，点 E∈AC，连 AF 与 BE 交于 O。定义四块面积如下：")
+    st.latex(r"S_1=S_{\triangle AOB},\ S_2=S_{\triangle AOC},\ S_3=S_{\triangle BOF},\ S_4=S_{\triangle COF}")
+    st.markdown("核心结论：")
+    st.latex(r"\frac{S_1}{S_2}=\frac{S_3}{S_4}=\frac{BF}{FC}")
+    # 参考与等价表述（只做知识性引用，不依赖具体图形编号）
+    st.markdown("等价表述：")
+    st.latex(r"\frac{S_1+S_3}{S_2+S_4}=\frac{BD}{DC}")
+    st.latex(r"\frac{S_{\triangle ABD}}{S_{\triangle ADC}}=\frac{BE}{EC}")
+
+    st.subheader("交互演示")
+    col1, col2 = st.columns([1,1])
+
+    with col1:
+        st.write("在底边BC上移动点F，在边AC上移动点E，观察比值是否恒等于BF/FC。")
+        params = model_widgets(SWALLOWTAIL)
+        t, s = params["t"], params["s"]
+
+    # 几何构造：整张滑块网格在进程内预计算一次，这里只做查表
+    state = lookup(swallowtail_table(), t, s)
+    S1, S2, S3, S4 = state["S1"], state["S2"], state["S3"], state["S4"]
+    BF, FC = state["BF"], state["FC"]
+    ratio12, ratio34, ratioBF = state["ratio12"], state["ratio34"], state["ratioBF"]
+
+    with col2:
+        figures.image(model_job("swallowtail", **params))
+
+    st.subheader("数值验证")
+    st.write(f"S1={S1:.4f}, S2={S2:.4f}, S3={S3:.4f}, S4={S4:.4f};  BF={BF:.4f}, FC={FC:.4f}")
+    # 使用 LaTeX 展示理论等式与数值近似
+    st.latex(r"\frac{S_1}{S_2}=\frac{S_3}{S_4}=\frac{BF}{FC}")
+    st.latex(rf"\frac{{S_1}}{{S_2}}\approx {ratio12:.4f}\ ,\ \frac{{S_3}}{{S_4}}\approx {ratio34:.4f}\ ,\ \frac{{BF}}{{FC}}\approx {ratioBF:.4f}")
+
+    # 参数全景图：整张 (t, s) 网格一次向量化算完，并标出当前滑块位置
+    with st.expander("🗺️ 参数全景图：一次看遍所有 F、E 的位置"):
+        quantity = st.radio("观察的量", ["S1/S2", "S1 的面积"], horizontal=True, key="sweep5_quantity")
+        render_sweep(swallowtail_ratio if quantity == "S1/S2" else swallowtail_s1,
+                     Axis.linspace("t", "BF/BC", 0.1, 0.9, 81),
+                     Axis.linspace("s", "AE/AC", 0.1, 0.9, 81),
+                     current=(t, s), title=f"{quantity} 随 F、E 位置的变化",
+                     value_label=quantity, key="sweep5")
+        st.caption("S1/S2 的等高线都是竖直的：比值只由 F 的位置（BF/FC）决定，与 E 无关。")
+
+    # 三线进阶：塞瓦定理与劳斯定理
+    st.subheader("进阶：三条线的塞瓦定理与劳斯定理")
+    st.markdown("再从C连一条线CG（G∈AB），三条线AF、BE、CG两两相交，把△ABC分成 7 块。")
+    st.latex(r"\text{塞瓦定理：三线共点} \iff \frac{BF}{FC}\cdot\frac{CE}{EA}\cdot\frac{AG}{GB}=1")
+    st.latex(r"\text{劳斯定理：}\frac{S_{\text{中间}}}{S_{\triangle ABC}}=\frac{(xyz-1)^2}{(xy+x+1)(yz+y+1)(zx+z+1)},\quad x=\frac{BF}{FC},\ y=\frac{CE}{EA},\ z=\frac{AG}{GB}")
+
+    col3, col4 = st.columns([1, 1])
+
+    with col3:
+        u3 = st.slider("F在BC上的位置 (BF/BC)", 0.1, 0.9, 0.35, 0.05, key="routh_u")
+        v3 = st.slider("E在CA上的位置 (CE/CA)", 0.1, 0.9, 0.35, 0.05, key="routh_v")
+        ceva_mode = st.checkbox("按塞瓦定理自动确定G，让三线共点", key="routh_ceva")
+        if ceva_mode:
+            w3 = float(ceva_partner(u3, v3))
+            st.write(f"G在AB上的位置 (AG/AB) = {w3:.4f}")
+        else:
+            w3 = st.slider("G在AB上的位置 (AG/AB)", 0.1, 0.9, 0.35, 0.05, key="routh_w")
+
+    if ceva_mode:
+        # 共点位置不在滑块网格上，单点直接计算（向量化引擎对标量同样适用）
+        routh = solve_cevians(u3, v3, w3)
+    else:
+        # 17×17×17 的滑块网格整体向量化预计算，拖动滑块时只做查表
+        routh = lookup(routh_table(), u3, v3, w3, grid=ROUTH_GRID)
+    # 坐标换成 (点名, (x, y)) 元组：参数可哈希，同一位置的图按参数缓存
+    points = tuple((name, (float(P[0]), float(P[1]))) for name, P in routh.points.items())
+
+    with col4:
+        figures.image(figure_job(routh_division, points, size_hint=(6, 5)))
+
+    total = float(routh.total)
+    # 区域按所含边界线段命名（换成页面上的点名），中间三角形单独命名
+    region_labels = {name: name.translate(str.maketrans("DF", "FG")) for name in REGION_NAMES}
+    region_labels["PQR"] = "中间三角形"
+    st.write("7 块面积（△ABC 面积记为 1）：" + "，".join(
+        f"{region_labels[name]}={float(routh.regions[name]) / total:.4f}"
+        for name in REGION_NAMES))
+    st.write(f"乘积 BF/FC · CE/EA · AG/GB = {float(routh.ceva_product):.4f}")
+    if routh.concurrent:
+        st.success("三线共点！塞瓦条件成立，中间三角形缩成了一个点。")
+    else:
+        st.info(f"中间三角形面积：鞋带公式 {float(routh.regions['PQR']) / total:.4f}，"
+                f"劳斯定理 {float(routh.routh_area) / total:.4f}")
+
+    figures.render()
@@ -0,0 +1,93 @@
+import streamlit as st
+import numpy as np
+from utils.fonts import setup_custom_font
+from utils.illustrations import similar_group_shapes
+from utils.render import FigureBatch, figure_job
+from utils.session_memory import page_rerun, session_artifact
+from utils.similarity import (SimilarityIndex, angles_from_sides, group_similar,
+                              key_to_shape, parse_triangle_csv, sample_triangles)
+
+# 设置页面和字体
+setup_custom_font("font/SimHei.ttf")
+st.set_page_config(page_title="相似三角形分组", page_icon="🧩")
+with page_rerun("9_相似三角形分组"):
+    figures = FigureBatch()
+
+    st.title("🧩 相似三角形分组")
+    st.markdown("""
+上传一批三角形，程序会自动把**相似**的三角形分到同一组。
+
+**原理**：把三条边从小到大排好，再都除以最长边，得到一个“形状指纹”。
+两个三角形相似，当且仅当它们的形状指纹相同——和大小、位置、摆放方向都没有关系。
+按指纹排序就能一次分好组，不需要把三角形两两比较。
+""")
+
+    # --- 数据读取 ---
+    source = st.radio("数据来源", ["上传 CSV 文件", "使用示例数据"], horizontal=True)
+    if source == "上传 CSV 文件":
+        st.caption("CSV 每行一个三角形：`a,b,c`（三条边）或 `x1,y1,x2,y2,x3,y3`（三个顶点）。")
+        uploaded = st.file_uploader("上传三角形数据", type=["csv"])
+        sides = None
+        if uploaded is not None:
+            data_key = ("upload", uploaded.file_id)
+            try:
+                sides = session_artifact("similarity_sides", data_key,
+                                         lambda: parse_triangle_csv(uploaded.getvalue()))
+            except ValueError as e:
+                st.error(f"文件格式错误：{e}")
+    else:
+        n_samples = st.select_slider("示例三角形数量", [1_000, 10_000, 100_000, 1_000_000], value=10_000)
+        sides = sample_triangles(n_samples, 12, 7)
+        data_key = ("sample", n_samples)
+
+    tol = st.select_slider("相似判断的精度（相对边长误差）", [1e-2, 1e-3, 1e-4], value=1e-3,
+                           format_func=lambda x: f"{x:g}")
+
+    # 只有表头的 CSV 解析出 (0, 3) 的空数组，同样没有可分组的数据
+    if sides is None or not len(sides):
+        st.info("请先上传至少包含一个三角形的数据，或者选择“使用示例数据”。")
+        st.stop()
+
+    # --- 分组 ---
+    # 分组结果和查询索引按会话缓存：只改查询条件时不必重算，会话空闲后自动回收
+    labels, group_keys, counts = session_artifact("similarity_groups", (data_key, tol),
+                                                  lambda: group_similar(sides, tol))
+    n_invalid = int((labels < 0).sum())
+    st.success(f"共 {len(sides)} 个三角形，分成 {len(group_keys)} 个相似组。")
+    if n_invalid:
+        st.warning(f"有 {n_invalid} 行不能构成三角形（不满足“两边之和大于第三边”），已跳过。")
+
+    shapes = key_to_shape(group_keys, tol)
+    angles = angles_from_sides(shapes)
+    top = min(len(group_keys), 50)
+    st.subheader("📊 相似组一览")
+    st.dataframe({
+        "组号": np.arange(top),
+        "数量": counts[:top],
+        "边长比（最短 : 中间 : 最长）": [f"{r0:.3f} : {r1:.3f} : 1" for r0, r1, _ in shapes[:top]],
+        "三个内角": [f"{a:.1f}°, {b:.1f}°, {c:.1f}°" for a, b, c in angles[:top]],
+    })
+    if len(group_keys) > top:
+        st.caption(f"只显示数量最多的 {top} 组。")
+
+
+    # 形状与个数由数据和容差决定，用它们作缓存键
+    figures.image(figure_job(similar_group_shapes, shapes[:9], counts[:9],
+                             key=("similar_group_shapes", data_key, tol),
+                             size_hint=(9, 3 * ((min(len(shapes), 9) + 2) // 3))))
+
+    # --- 查询 ---
+    st.subheader("🔍 找出和某个三角形相似的所有三角形")
+    index = session_artifact("similarity_index", (data_key, tol),
+                             lambda: SimilarityIndex.build(sides, tol))
+    q_col1, q_col2, q_col3 = st.columns(3)
+    qa = q_col1.number_input("边 a", min_value=0.0, value=float(sides[0, 0]), format="%.3f")
+    qb = q_col2.number_input("边 b", min_value=0.0, value=float(sides[0, 1]), format="%.3f")
+    qc = q_col3.number_input("边 c", min_value=0.0, value=float(sides[0, 2]), format="%.3f")
+    hits = index.query([qa, qb, qc])
+    if len(hits):
+        st.write(f"找到 {len(hits)} 个相似三角形，前几个的行号：{hits[:20].tolist()}")
+    else:
+        st.write("没有找到相似的三角形（或者这三条边不能构成三角形）。")
+
+    figures.render()
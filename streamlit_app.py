@@ -21,4 +21,23 @@ st.markdown("""
 - 燕尾模型
 
 更多主题即将推出！
-""")
\ No newline at end of file
+""")
+
+with st.expander("🧠 会话内存报告"):
+    from utils.session_memory import TRACKER
+
+    report = TRACKER.report(top=10, allocation_sites=10)
+    totals = report["totals"]
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("活跃会话", totals["sessions"])
+    c2.metric("会话状态", f"{totals['state_bytes'] / 1024:.1f} KB")
+    c3.metric("会话缓存", f"{totals['artifact_bytes'] / 1024:.1f} KB")
+    c4.metric("未关闭的 pyplot 图像", totals["open_pyplot_figures"])
+    if report["sessions"]:
+        st.dataframe(report["sessions"], hide_index=True)
+    if "traced_bytes" in totals:
+        st.caption(f"tracemalloc：当前 {totals['traced_bytes'] / 2**20:.1f} MB，"
+                   f"峰值 {totals['traced_peak_bytes'] / 2**20:.1f} MB")
+        st.dataframe(report["sites"], hide_index=True)
+    else:
+        st.caption("设置环境变量 P2J_MEMORY_TRACKING=1 可开启 tracemalloc，查看分配最多的代码位置。")
@@ -0,0 +1,513 @@
+"""
+loadtest.py
+
+并发会话压测：在本机启动应用，模拟 N 个学生同时使用，测出每台机器能撑多少人。
+
+每个模拟会话直接走 Streamlit 的 websocket 协议（和浏览器一样收发 protobuf），
+按页面剧本操作控件：第 2–7 页拖动滑块、第 6 页切换标签页、第 8 页点按钮……
+每次重跑从发出请求计时到收到 script_finished 为止。
+
+对每个并发档位 N 输出：重跑延迟 p50/p95/p99、吞吐（次/秒）、出错次数、
+服务进程的平均 CPU 与峰值 RSS。全部档位合在一起就是“容量曲线”，
+以 JSON 保存，之后的版本可以用 --compare 和它逐档对比。
+
+用法：
+    python tools/loadtest.py --sessions 1,2,4,8,16 --duration 30
+    python tools/loadtest.py --output before.json
+    python tools/loadtest.py --output after.json --compare before.json
+    python tools/loadtest.py --url http://127.0.0.1:8501 --no-server   # 压已经在跑的实例
+
+需要额外安装 websockets（pip install websockets）；CPU 和 RSS 直接读 /proc，仅支持 Linux。
+压测进程和服务进程在同一台机器上，会争抢 CPU：核数很少时，结果偏保守。
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+try:
+    from websockets.asyncio.client import connect as ws_connect
+except ImportError:  # websockets < 13 或未安装
+    try:
+        from websockets import connect as ws_connect
+    except ImportError:
+        ws_connect = None
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 会产生重跑的控件类型（Element 的 oneof 名）
+WIDGET_KINDS = ("slider", "selectbox", "radio", "checkbox", "number_input", "button")
+
+# 页面剧本：页面路径 → (被选中的权重, 操作列表)。
+# 操作是 (动作, 控件类型, 标签关键字)；关键字为空表示该类型的任意控件。
+# "tab" 动作只消耗思考时间——标签页在浏览器端切换，不触发重跑。
+SCENARIOS = {
+    "": (1, [("load", None, None)]),
+    "三角形分类": (1, [("load", None, None)]),
+    "勾股定理": (3, [("drag", "slider", "直角边"), ("drag", "slider", "直角边"),
+                 ("type", "number_input", "")]),
+    "等高模型": (3, [("drag", "slider", ""), ("drag", "slider", ""), ("toggle", "radio", "")]),
+    "一半模型": (3, [("drag", "slider", ""), ("pick", "selectbox", "")]),
+    "燕尾模型": (3, [("drag", "slider", ""), ("toggle", "checkbox", "塞瓦")]),
+    "鸟头模型": (3, [("drag", "slider", "翅膀"), ("tab", None, None),
+                 ("press", "button", "换一批"), ("tab", None, None)]),
+    "相似模型": (2, [("drag", "slider", "")]),
+    "蝴蝶模型": (3, [("press", "button", "开始计算"), ("press", "button", "换一题"),
+                 ("type", "number_input", "答案"), ("press", "button", "提交答案")]),
+    "相似三角形分组": (1, [("toggle", "radio", "数据来源"), ("type", "number_input", "边")]),
+}
+
+# 一次重跑最长等待时间（秒），超时计为出错
+RERUN_TIMEOUT = 60.0
+
+
+@dataclass
+class Sample:
+    """一次重跑的测量结果。"""
+    page: str
+    action: str
+    start: float
+    latency: float
+    nbytes: int
+    error: str = ""  # 出错时为异常类型名
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+@dataclass
+class LevelResult:
+    """一个并发档位的汇总。"""
+    sessions: int
+    duration: float
+    reruns: int = 0
+    errors: int = 0
+    throughput: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_ms: float = 0.0
+    mb_per_rerun: float = 0.0
+    cpu_percent: float = 0.0
+    rss_mb: float = 0.0
+    rss_peak_mb: float = 0.0
+    error_kinds: dict = field(default_factory=dict)
+    pages: dict = field(default_factory=dict)
+
+
+def percentiles(latencies) -> tuple:
+    """返回 (p50, p95, p99, max)，单位毫秒；空列表返回全 0。"""
+    if len(latencies) == 0:
+        return 0.0, 0.0, 0.0, 0.0
+    ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return round(float(p50), 1), round(float(p95), 1), round(float(p99), 1), round(float(ms.max()), 1)
+
+
+# --- 服务进程 ---
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, extra_env: Optional[dict] = None) -> subprocess.Popen:
+    """在子进程里启动应用，等到健康检查通过后返回。
+
+    服务的 stderr 写到临时日志文件（proc.log_path）而不是管道：没有字体时每张图都会
+    打印缺字警告，管道写满 64 KB 后服务进程会卡住，之后的重跑全部超时。
+    """
+    cmd = [sys.executable, "-m", "streamlit", "run", "streamlit_app.py",
+           "--server.headless", "true", "--server.port", str(port),
+           "--server.address", "127.0.0.1", "--server.fileWatcherType", "none",
+           "--browser.gatherUsageStats", "false"]
+    env = dict(os.environ, **(extra_env or {}))
+    log = tempfile.NamedTemporaryFile(prefix="p2j-server-", suffix=".log", delete=False)
+    with log:
+        proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=log)
+    proc.log_path = log.name
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            with open(log.name, encoding="utf-8", errors="replace") as f:
+                raise RuntimeError("应用启动失败：\n" + f.read())
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return proc
+        except OSError:
+            time.sleep(0.3)
+    stop_server(proc)
+    raise RuntimeError("应用在 60 秒内没有就绪")
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    """结束 start_server 启动的服务进程并删除它的日志文件。"""
+    proc.terminate()
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+    try:
+        os.unlink(proc.log_path)
+    except OSError:
+        pass
+
+
+class ProcSampler:
+    """定期读取 /proc/<pid>，记录服务进程的 CPU 占用和常驻内存。"""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.tick = os.sysconf("SC_CLK_TCK")
+        self.cpu: list = []
+        self.rss: list = []
+
+    def _cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.tick  # utime + stime
+
+    def _rss_bytes(self) -> int:
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    def reset(self) -> None:
+        self.cpu, self.rss = [], []
+
+    async def run(self) -> None:
+        if self.pid is None:
+            return
+        last_t, last_cpu = time.monotonic(), self._cpu_seconds()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                now, cpu = time.monotonic(), self._cpu_seconds()
+                self.rss.append(self._rss_bytes())
+            except OSError:
+                return
+            self.cpu.append(100.0 * (cpu - last_cpu) / (now - last_t))
+            last_t, last_cpu = now, cpu
+
+
+# --- 模拟会话 ---
+class SimSession:
+    """一个模拟学生：维护控件状态，按剧本发重跑请求并计时。"""
+
+    def __init__(self, url: str, rng: random.Random, think: float):
+        self.url = url
+        self.rng = rng
+        self.think = think
+        self.ws = None
+        self.pages: dict = {}        # url 路径 → page_script_hash
+        self.page = ""
+        self.page_hash = ""
+        self.widgets: dict = {}      # 控件 id → (类型, proto)
+        self.states: dict = {}       # 控件 id → 要发送的 WidgetState（只含改动过的）
+
+    async def connect(self) -> None:
+        ws_url = self.url.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream"
+        self.ws = await ws_connect(ws_url, subprotocols=["streamlit"], origin=self.url,
+                                   max_size=None)
+
+    async def close(self) -> None:
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def rerun(self, triggers=()) -> tuple:
+        """发送一次重跑请求，等到脚本结束。返回 (耗时秒, 错误类型, 收到字节数)，成功时错误类型为空串。"""
+        msg = BackMsg()
+        cs = msg.rerun_script
+        cs.page_script_hash = self.page_hash
+        cs.page_name = self.page
+        cs.widget_states.widgets.extend(list(self.states.values()) + list(triggers))
+        seen: dict = {}
+        error, nbytes = "", 0
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            raw = await asyncio.wait_for(self.ws.recv(), RERUN_TIMEOUT)
+            nbytes += len(raw)
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            kind = fwd.WhichOneof("type")
+            if kind == "navigation":
+                # 页面列表和本次实际运行的页面都在 navigation 消息里
+                self.pages = {p.url_pathname: p.page_script_hash
+                              for p in fwd.navigation.app_pages}
+                self.page_hash = fwd.navigation.page_script_hash
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                el_kind = element.WhichOneof("type")
+                if el_kind in WIDGET_KINDS:
+                    proto = getattr(element, el_kind)
+                    seen[proto.id] = (el_kind, proto)
+                elif el_kind == "exception":
+                    error = error or element.exception.type or "Exception"
+            elif kind == "script_finished":
+                if fwd.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                if fwd.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                    error = error or ForwardMsg.ScriptFinishedStatus.Name(fwd.script_finished)
+                break
+        latency = time.perf_counter() - start
+        self.widgets = seen
+        # 页面上已经不存在的控件不再发送
+        self.states = {wid: s for wid, s in self.states.items() if wid in seen}
+        return latency, error, nbytes
+
+    def _find(self, kind: str, label: str):
+        found = [(wid, proto) for wid, (k, proto) in self.widgets.items()
+                 if k == kind and label in proto.label and not proto.disabled]
+        return self.rng.choice(found) if found else (None, None)
+
+    def _new_state(self, kind: str, wid: str, proto) -> Optional[WidgetState]:
+        """给控件换一个新取值，编码方式与浏览器前端一致。"""
+        state = WidgetState(id=wid)
+        rng = self.rng
+        if kind == "slider":
+            if proto.options:  # select_slider：按格式化后的选项文本发送
+                state.string_array_value.data.append(rng.choice(list(proto.options)))
+            else:
+                n = max(int(round((proto.max - proto.min) / proto.step)), 1)
+                state.double_array_value.data.append(proto.min + proto.step * rng.randint(0, n))
+        elif kind in ("selectbox", "radio"):
+            state.string_value = rng.choice(list(proto.options))
+        elif kind == "checkbox":
+            current = self.states.get(wid)
+            state.bool_value = not (current.bool_value if current else proto.default)
+        elif kind == "number_input":
+            low = proto.min if proto.has_min else 0.0
+            high = min(proto.max if proto.has_max else low + 100, low + 100)
+            value = rng.uniform(low, high)
+            state.double_value = round(value) if proto.data_type == proto.INT else round(value, 1)
+        else:
+            return None
+        return state
+
+    async def act(self, action: str, kind: Optional[str], label: Optional[str]):
+        """执行剧本中的一步；不产生重跑时返回 None。"""
+        if action == "tab":
+            await asyncio.sleep(self.rng.uniform(0, self.think))
+            return None
+        if action == "load":
+            return await self.rerun()
+        wid, proto = self._find(kind, label)
+        if wid is None:
+            return None
+        if action == "press":
+            return await self.rerun([WidgetState(id=wid, trigger_value=True)])
+        state = self._new_state(kind, wid, proto)
+        if state is None:
+            return None
+        self.states[wid] = state
+        return await self.rerun()
+
+    async def navigate(self, page: str):
+        """切换到另一页（和点击侧边栏导航一样，换页时清空控件状态）。"""
+        self.page = page
+        self.page_hash = self.pages.get(page, "")
+        self.widgets, self.states = {}, {}
+        return await self.rerun()
+
+
+def pick_page(rng: random.Random, available) -> str:
+    pages = [p for p in SCENARIOS if p in available] or [""]
+    weights = [SCENARIOS[p][0] for p in pages]
+    return rng.choices(pages, weights)[0]
+
+
+async def run_session(url: str, seed: int, deadline: float, think: float,
+                      samples: list, steps_per_page: int) -> None:
+    """一个模拟学生：随机选页，每页按剧本操作若干步，直到截止时间。"""
+    rng = random.Random(seed)
+    session = SimSession(url, rng, think)
+
+    def record(action: str, result) -> None:
+        if result is not None:
+            latency, error, nbytes = result
+            samples.append(Sample(session.page, action, time.time() - latency, latency, nbytes, error))
+
+    try:
+        await session.connect()
+        record("load", await session.rerun())
+        while time.time() < deadline:
+            page = pick_page(rng, session.pages)
+            record("navigate", await session.navigate(page))
+            for _ in range(steps_per_page):
+                if time.time() >= deadline:
+                    break
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * think)
+                action, kind, label = rng.choice(SCENARIOS[page][1])
+                record(action, await session.act(action, kind, label))
+    except Exception as e:  # 断线、超时等计为一次出错
+        samples.append(Sample(session.page, "disconnect", time.time(), 0.0, 0, type(e).__name__))
+    finally:
+        await session.close()
+
+
+async def run_level(url: str, n: int, duration: float, warmup: float, think: float,
+                    sampler: ProcSampler, seed: int, steps_per_page: int) -> LevelResult:
+    """以 n 个并发会话压测 duration 秒（前 warmup 秒的样本不计）。"""
+    samples: list = []
+    start = time.time()
+    deadline = start + warmup + duration
+    sampler_task = asyncio.create_task(sampler.run())
+    # 会话分散在一秒内陆续接入，避免所有人在同一瞬间点击
+    tasks = []
+    for i in range(n):
+        tasks.append(asyncio.create_task(
+            run_session(url, seed * 10_000 + i, deadline, think, samples, steps_per_page)))
+        await asyncio.sleep(1.0 / n)
+    await asyncio.sleep(max(start + warmup - time.time(), 0))
+    sampler.reset()
+    await asyncio.gather(*tasks)
+    sampler_task.cancel()
+
+    measured = [s for s in samples if s.start >= start + warmup]
+    good = [s.latency for s in measured if s.ok]
+    result = LevelResult(sessions=n, duration=duration)
+    result.reruns = len(good)
+    result.errors = sum(not s.ok for s in measured)
+    result.error_kinds = dict(Counter(f"{s.page or '首页'}:{s.error}" for s in measured if not s.ok))
+    result.throughput = round(len(good) / duration, 2)
+    result.p50_ms, result.p95_ms, result.p99_ms, result.max_ms = percentiles(good)
+    if measured:
+        result.mb_per_rerun = round(sum(s.nbytes for s in measured) / len(measured) / 2**20, 3)
+    if sampler.cpu:
+        result.cpu_percent = round(float(np.mean(sampler.cpu)), 1)
+    if sampler.rss:
+        result.rss_mb = round(sampler.rss[-1] / 2**20, 1)
+        result.rss_peak_mb = round(max(sampler.rss) / 2**20, 1)
+    for page in sorted({s.page for s in measured}):
+        lat = [s.latency for s in measured if s.page == page and s.ok]
+        p50, p95, _, _ = percentiles(lat)
+        result.pages[page or "首页"] = {"reruns": len(lat), "p50_ms": p50, "p95_ms": p95}
+    return result
+
+
+# --- 报告 ---
+def capacity(levels: list, slo_ms: float) -> int:
+    """满足 p95 ≤ slo_ms 且没有出错的最大并发数；一个都不满足时返回 0。"""
+    ok = [r["sessions"] for r in levels if r["p95_ms"] <= slo_ms and r["errors"] == 0]
+    return max(ok, default=0)
+
+
+def print_table(levels: list, baseline: Optional[dict] = None) -> None:
+    base = {r["sessions"]: r for r in (baseline or {}).get("levels", [])}
+    header = (f"{'N':>4} {'重跑':>6} {'次/秒':>7} {'p50':>8} {'p95':>8} {'p99':>8} "
+              f"{'出错':>4} {'CPU%':>6} {'RSS峰值MB':>9}")
+    if base:
+        header += f" {'Δp95':>9} {'Δ次/秒':>8}"
+    print(header)
+    for r in levels:
+        line = (f"{r['sessions']:>4} {r['reruns']:>6} {r['throughput']:>7.2f} "
+                f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+                f"{r['errors']:>4} {r['cpu_percent']:>6.1f} {r['rss_peak_mb']:>9.1f}")
+        old = base.get(r["sessions"])
+        if old:
+            line += f" {r['p95_ms'] - old['p95_ms']:>+9.1f} {r['throughput'] - old['throughput']:>+8.2f}"
+        print(line)
+    for r in levels:
+        if r["error_kinds"]:
+            kinds = "，".join(f"{k} ×{n}" for k, n in r["error_kinds"].items())
+            print(f"  N={r['sessions']} 出错：{kinds}")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="并发会话压测，输出各并发档位的重跑延迟与容量曲线。")
+    parser.add_argument("--sessions", default="1,2,4,8,16", help="并发档位，逗号分隔")
+    parser.add_argument("--duration", type=float, default=30.0, help="每档计入统计的秒数")
+    parser.add_argument("--warmup", type=float, default=5.0, help="每档开头不计入统计的秒数")
+    parser.add_argument("--think", type=float, default=1.0, help="两次操作之间的平均思考时间（秒）")
+    parser.add_argument("--steps", type=int, default=6, help="每访问一页操作的步数")
+    parser.add_argument("--slo-ms", type=float, default=1000.0, help="容量判定用的 p95 上限（毫秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", default=None, help="被测应用地址；不给则在本机启动一个")
+    parser.add_argument("--no-server", action="store_true", help="不启动应用，直接压 --url")
+    parser.add_argument("--pid", type=int, default=None, help="--no-server 时用于采样 CPU/RSS 的进程号")
+    parser.add_argument("--output", default=None, help="把结果写成 JSON 文件")
+    parser.add_argument("--compare", default=None, help="与之前保存的 JSON 结果逐档对比")
+    args = parser.parse_args(argv)
+
+    if ws_connect is None:
+        parser.error("需要安装 websockets：pip install websockets")
+    levels_n = [int(x) for x in args.sessions.split(",") if x.strip()]
+
+    proc = None
+    if args.no_server:
+        if not args.url:
+            parser.error("--no-server 需要同时给出 --url")
+        url, pid = args.url, args.pid
+    else:
+        port = free_port()
+        proc = start_server(port)
+        url, pid = args.url or f"http://127.0.0.1:{port}", proc.pid
+
+    levels = []
+    try:
+        sampler = ProcSampler(pid)
+        for n in levels_n:
+            print(f"压测 {n} 个并发会话……", file=sys.stderr)
+            result = asyncio.run(run_level(url, n, args.duration, args.warmup, args.think,
+                                           sampler, args.seed, args.steps))
+            levels.append(result.__dict__)
+    finally:
+        if proc is not None:
+            stop_server(proc)
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cpu_count": os.cpu_count(),
+        "python": sys.version.split()[0],
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "capacity": capacity(levels, args.slo_ms),
+        "levels": levels,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table(levels, baseline)
+    print(f"容量（p95 ≤ {args.slo_ms:g} ms 且无出错）：{report['capacity']} 个并发会话"
+          + (f"，基线 {baseline['revision']}：{baseline.get('capacity', 0)}" if baseline else ""))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
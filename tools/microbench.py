@@ -0,0 +1,354 @@
+"""
+microbench.py
+
+几何与绘图内核的微基准：同一个内核分别以“逐个调用”（scalar）和“整批一次调用”
+（batched）两种方式，在 1 到 10⁷ 的批量上测每个元素的耗时。整页计时
+（loadtest.py、replay.py）只能看出“变慢了”，这里能看出是哪个内核、从多大的批量起
+向量化开始划算。
+
+- 几何内核：页面 5 的直线交点（cevians.line_intersection）与面积
+  （predicates.signed_area），页面 7 的边长与内角（similarity.side_lengths、
+  angles_from_sides），页面 6 的面积比（sweep.bird_head_ratio），以及凸多边形交的
+  面积（clipping.intersection_area）；
+- 绘图内核：页面 1 的三角形图逐步拆开计时——计算并构造图纸、draw_spec 绘制、
+  encode_png 编码、base64 编码。绘图没有批量版本，只在批量 1 上测；
+- 重复次数自动控制：先把循环次数调到单次计时不短于 --min-time，再反复计时，
+  直到中位数 95% 置信区间的半宽小于 --rtol，或者达到 --max-repeats / --budget；
+- 每次运行追加一行到历史文件（默认 data/microbench.jsonl），--check 与历史中
+  最近一次运行逐项对比，中位数变慢超过 --threshold 且超出两次测量的置信区间时
+  判为退步，返回码为 1，可以直接放进 CI。
+
+逐个调用在批量大时太慢，只测到 --scalar-max 为止；批量 10⁷ 的几何内核要占用
+几 GB 内存，默认不测，需要时用 --sizes 指定。
+
+用法：
+    python tools/microbench.py                              # 全部内核，默认批量
+    python tools/microbench.py --kernels side_lengths,angles_from_sides --sizes 1,1e3,1e7
+    python tools/microbench.py --check                      # 与上一次运行对比，退步时返回 1
+    python tools/microbench.py --history ""                 # 不写历史
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+from loadtest import ROOT, git_revision
+
+sys.path.insert(0, ROOT)
+
+from utils.cevians import line_intersection  # noqa: E402
+from utils.clipping import intersection_area  # noqa: E402
+from utils.figures import draw_spec, encode_png, to_base64  # noqa: E402
+from utils.fonts import setup_custom_font  # noqa: E402
+from utils.models import get_model  # noqa: E402
+from utils.predicates import signed_area  # noqa: E402
+from utils.similarity import angles_from_sides, side_lengths  # noqa: E402
+from utils.sweep import bird_head_ratio  # noqa: E402
+
+DEFAULT_SIZES = "1,10,100,1e3,1e4,1e5,1e6"
+DEFAULT_HISTORY = os.path.join(ROOT, "data", "microbench.jsonl")
+# 置信区间用的正态分位数（95%）
+Z95 = 1.96
+
+
+@dataclass(frozen=True)
+class Kernel:
+    """一个被测内核。
+
+    setup(n, rng) 生成批量为 n 的输入；batched(data) 整批调用一次；
+    scalar(split(data)) 逐个元素调用（None 表示没有逐个调用的写法），split 事先
+    把输入拆开，拆分的时间不计入。sizes 为 None 时使用命令行给的批量，否则只在这些批量上测。
+    """
+    name: str
+    page: str
+    setup: Callable
+    batched: Callable
+    scalar: Optional[Callable] = None
+    sizes: Optional[tuple] = None
+    split: Optional[Callable] = None
+
+
+def _points(n, rng, k):
+    """k 组形状 (n, 2) 的随机点。"""
+    return tuple(rng.random((k, n, 2)))
+
+
+def _split(data) -> dict:
+    """逐个调用的输入：把形状 (n, ...) 的数组（或几个这样的数组）按元素拆开。"""
+    if isinstance(data, tuple):
+        return {"rows": list(zip(*data))}
+    return {"rows": list(data)}
+
+
+def _split_floats(data) -> dict:
+    """同 _split，但拆成 Python 浮点数（页面上标量公式的实际用法）。"""
+    return {"rows": [tuple(map(float, row)) for row in zip(*data)]}
+
+
+def _triangle_setup(n, rng):
+    model = get_model("triangle")
+    params = model.normalize({})
+    spec = model.figure(params, model.compute(**params))
+    fig = draw_spec(spec)
+    return {"model": model, "params": params, "spec": spec, "fig": fig, "png": encode_png(fig)}
+
+
+def _triangle_spec(data):
+    model, params = data["model"], data["params"]
+    return model.figure(params, model.compute(**params))
+
+
+def _shapes(n, rng):
+    # 每对：随机三角形与以它的重心为中心的随机三角形，大部分有重叠
+    subject = rng.random((n, 3, 2))
+    clip = subject.mean(axis=1, keepdims=True) + (rng.random((n, 3, 2)) - 0.5)
+    return subject, clip
+
+
+KERNELS = (
+    Kernel("line_intersection", "5_燕尾模型",
+           lambda n, rng: _points(n, rng, 4),
+           lambda d: line_intersection(*d),
+           lambda d: [line_intersection(*row) for row in d["rows"]]),
+    Kernel("signed_area", "5_燕尾模型",
+           lambda n, rng: _points(n, rng, 3),
+           lambda d: signed_area(*d),
+           lambda d: [signed_area(*row) for row in d["rows"]]),
+    Kernel("side_lengths", "7_相似模型",
+           lambda n, rng: rng.random((n, 3, 2)),
+           side_lengths,
+           lambda d: [side_lengths(v) for v in d["rows"]]),
+    Kernel("angles_from_sides", "7_相似模型",
+           lambda n, rng: 1 + rng.random((n, 3)),
+           angles_from_sides,
+           lambda d: [angles_from_sides(s) for s in d["rows"]]),
+    Kernel("bird_head_ratio", "6_鸟头模型",
+           lambda n, rng: tuple(1 + rng.random((4, n))),
+           lambda d: bird_head_ratio(*d),
+           lambda d: [bird_head_ratio(*row) for row in d["rows"]],
+           split=_split_floats),
+    Kernel("intersection_area", "6_鸟头模型",
+           _shapes,
+           lambda d: intersection_area(*d),
+           lambda d: [intersection_area(*row) for row in d["rows"]]),
+    Kernel("triangle.spec", "1_三角形分类", _triangle_setup, _triangle_spec, sizes=(1,)),
+    Kernel("triangle.draw", "1_三角形分类", _triangle_setup,
+           lambda d: draw_spec(d["spec"]), sizes=(1,)),
+    Kernel("triangle.encode_png", "1_三角形分类", _triangle_setup,
+           lambda d: encode_png(d["fig"]), sizes=(1,)),
+    Kernel("triangle.base64", "1_三角形分类", _triangle_setup,
+           lambda d: to_base64(d["png"]), sizes=(1,)),
+)
+
+
+def _time(func: Callable, data, loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        func(data)
+    return time.perf_counter() - start
+
+
+def measure(func: Callable, data, min_time: float, rtol: float, max_repeats: int,
+            budget: float) -> dict:
+    """反复计时，直到中位数足够稳定。
+
+    Args:
+        func: 被测函数，调用方式为 func(data)。
+        data: 输入。
+        min_time: 单次计时的最短时长（秒），不够时增加循环次数。
+        rtol: 中位数 95% 置信区间半宽相对中位数的目标。
+        max_repeats: 最多计时次数。
+        budget: 这一项最多花的时间（秒），至少计时 3 次。
+
+    Returns:
+        {"median", "min", "iqr", "ci", "repeats", "loops"}，时间单位为秒/次调用，
+        ci 为中位数置信区间的半宽。
+    """
+    # 和 timeit 一样在计时期间关闭垃圾回收；调循环次数的那几次兼作热身
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        loops = 1
+        while True:
+            t = _time(func, data, loops)
+            if t >= min_time:
+                break
+            loops *= 10 if t < min_time / 10 else 2
+        started = time.perf_counter()
+        times: list = []
+        while len(times) < max_repeats:
+            times.append(_time(func, data, loops) / loops)
+            if len(times) < 3:
+                continue
+            # 中位数的标准误约为均值标准误的 √(π/2) 倍
+            ci = Z95 * math.sqrt(math.pi / 2) * np.std(times, ddof=1) / math.sqrt(len(times))
+            if ci <= rtol * np.median(times) or time.perf_counter() - started > budget:
+                break
+    finally:
+        if enabled:
+            gc.enable()
+    q1, median, q3 = np.percentile(times, [25, 50, 75])
+    ci = Z95 * math.sqrt(math.pi / 2) * np.std(times, ddof=1) / math.sqrt(len(times))
+    return {"median": float(median), "min": float(min(times)), "iqr": float(q3 - q1),
+            "ci": float(ci), "repeats": len(times), "loops": loops}
+
+
+def run(kernels, sizes, scalar_max: int, seed: int, **options) -> list:
+    """测量全部内核，返回结果行列表（每行一个内核 × 批量 × 方式）。"""
+    results = []
+    for kernel in kernels:
+        for n in kernel.sizes or sizes:
+            data = kernel.setup(n, np.random.default_rng(seed))
+            modes = [("batched", kernel.batched, data)]
+            if kernel.scalar is not None and n <= scalar_max:
+                split = kernel.split or _split
+                modes.append(("scalar", kernel.scalar, split(data)))
+            for mode, func, arg in modes:
+                print(f"{kernel.name} n={n} {mode}……", file=sys.stderr)
+                stats = measure(func, arg, **options)
+                results.append({"kernel": kernel.name, "page": kernel.page, "n": n,
+                                "mode": mode, **stats,
+                                "per_item_ns": stats["median"] / n * 1e9})
+            del data
+    return results
+
+
+def crossover(results: list, kernel: str) -> Optional[int]:
+    """从这个批量起（含更大的批量）整批调用都明显比逐个调用快；测不出时返回 None。
+
+    “明显”指每个元素的耗时之差超过两边置信区间之和，避免把噪声当成交叉点。
+    """
+    rows = {(r["n"], r["mode"]): r for r in results if r["kernel"] == kernel}
+    sizes = sorted(n for n, mode in rows if mode == "batched" and (n, "scalar") in rows)
+    found = None
+    for n in reversed(sizes):
+        batched, scalar = rows[(n, "batched")], rows[(n, "scalar")]
+        if scalar["median"] - batched["median"] <= scalar["ci"] + batched["ci"]:
+            break
+        found = n
+    return found
+
+
+def regressions(results: list, baseline: list, threshold: float) -> list:
+    """与基线比较，返回 (结果行, 基线行) 的列表：变慢超过 threshold 且超出两边置信区间之和。"""
+    base = {(r["kernel"], r["n"], r["mode"]): r for r in baseline}
+    found = []
+    for r in results:
+        old = base.get((r["kernel"], r["n"], r["mode"]))
+        if old is None:
+            continue
+        slower = r["median"] - old["median"]
+        if slower > threshold * old["median"] and slower > r["ci"] + old["ci"]:
+            found.append((r, old))
+    return found
+
+
+def _format_ns(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("µs", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.3g} {unit}"
+    return f"{ns:.3g} ns"
+
+
+def print_table(results: list, baseline: Optional[list] = None) -> None:
+    base = {(r["kernel"], r["n"], r["mode"]): r for r in baseline or ()}
+    print(f"{'内核':<20} {'批量':>9} {'整批/个':>10} {'逐个/个':>10} {'加速':>7} "
+          f"{'±CI':>6} {'次数':>4}" + (f" {'Δ整批':>8}" if base else ""))
+    by_key = {(r["kernel"], r["n"], r["mode"]): r for r in results}
+    for (kernel, n, mode), r in by_key.items():
+        if mode != "batched":
+            continue
+        scalar = by_key.get((kernel, n, "scalar"))
+        speedup = f"{scalar['median'] / r['median']:.1f}×" if scalar else "—"
+        line = (f"{kernel:<20} {n:>9} {_format_ns(r['per_item_ns']):>10} "
+                f"{_format_ns(scalar['per_item_ns']) if scalar else '—':>10} {speedup:>7} "
+                f"{r['ci'] / r['median']:>6.1%} {r['repeats']:>4}")
+        old = base.get((kernel, n, mode))
+        if old:
+            line += f" {r['median'] / old['median'] - 1:>+8.1%}"
+        print(line)
+    for kernel in dict.fromkeys(r["kernel"] for r in results):
+        if any(r["mode"] == "scalar" for r in results if r["kernel"] == kernel):
+            n = crossover(results, kernel)
+            print(f"{kernel}：" + (f"批量 ≥ {n} 时整批调用更快" if n else "整批调用从未更快"))
+
+
+def load_history(path: str) -> list:
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="几何与绘图内核的微基准（逐个调用 vs 整批调用）。")
+    parser.add_argument("--kernels", default=None,
+                        help="逗号分隔的内核名，默认全部：" + ",".join(k.name for k in KERNELS))
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="批量，逗号分隔，可写成 1e6")
+    parser.add_argument("--scalar-max", type=float, default=1e4, help="逐个调用最多测到多大的批量")
+    parser.add_argument("--min-time", type=float, default=0.02, help="单次计时的最短时长（秒）")
+    parser.add_argument("--rtol", type=float, default=0.02, help="中位数置信区间半宽的目标（相对值）")
+    parser.add_argument("--max-repeats", type=int, default=30, help="每项最多计时次数")
+    parser.add_argument("--budget", type=float, default=2.0, help="每项最多花的时间（秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="历史文件（JSON Lines）；空字符串表示不写")
+    parser.add_argument("--check", action="store_true", help="与历史中最近一次运行对比，有退步时返回 1")
+    parser.add_argument("--threshold", type=float, default=0.1, help="判为退步的变慢比例")
+    parser.add_argument("--output", default=None, help="另外把本次结果写成 JSON 文件")
+    args = parser.parse_args(argv)
+
+    names = args.kernels.split(",") if args.kernels else [k.name for k in KERNELS]
+    unknown = set(names) - {k.name for k in KERNELS}
+    if unknown:
+        parser.error(f"未知的内核：{', '.join(sorted(unknown))}")
+    kernels = [k for k in KERNELS if k.name in names]
+    sizes = sorted({int(float(x)) for x in args.sizes.split(",") if x.strip()})
+
+    setup_custom_font("font/SimHei.ttf")
+    results = run(kernels, sizes, int(args.scalar_max), args.seed, min_time=args.min_time,
+                  rtol=args.rtol, max_repeats=args.max_repeats, budget=args.budget)
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cpu_count": os.cpu_count(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "config": {k: v for k, v in vars(args).items() if k not in ("history", "output", "check")},
+        "results": results,
+    }
+    history = load_history(args.history)
+    baseline = history[-1]["results"] if history else None
+    print_table(results, baseline)
+
+    status = 0
+    if args.check:
+        if baseline is None:
+            print("历史文件里还没有可对比的运行。")
+        else:
+            found = regressions(results, baseline, args.threshold)
+            for r, old in found:
+                print(f"退步：{r['kernel']} n={r['n']} {r['mode']} "
+                      f"{_format_ns(old['per_item_ns'])} → {_format_ns(r['per_item_ns'])}/个"
+                      f"（基线 {history[-1]['revision']}）")
+            status = 1 if found else 0
+    if args.history:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
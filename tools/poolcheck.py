@@ -0,0 +1,77 @@
+"""
+poolcheck.py
+
+渲染进程池的回归检查：在渲染工作进程数大于 0 的配置下用 AppTest 逐页运行页面，
+确认进程池确实用上了，并且从来没有被判为损坏、退回进程内渲染。
+
+单核机器上 default_workers() 为 0，平时的冒烟测试走不到进程池，这里显式设置
+P2J_RENDER_WORKERS（默认 2）。Streamlit 把正在运行的页面放在 sys.modules["__main__"]，
+spawn 出来的工作进程若照着它重新执行页面脚本，会在启动阶段出错，进程池随即损坏；
+页面照常显示（图改为进程内渲染），只是每次重跑慢好几倍，页面级测试发现不了。
+
+每页运行两次：第一次把图交给进程池绘制，第二次确认重跑时进程池仍然完好。
+
+用法：
+    python tools/poolcheck.py                      # 全部页面
+    python tools/poolcheck.py pages/1_三角形分类.py  # 指定页面
+返回码：全部通过为 0，否则为 1。
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+from loadtest import ROOT
+
+os.environ.setdefault("P2J_RENDER_WORKERS", "2")
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from utils.render import POOL_BROKEN, RENDER_BACKEND  # noqa: E402
+
+
+def check_page(path: str, timeout: float) -> tuple[bool, str]:
+    """运行一个页面两次；返回 (是否通过, 说明)。"""
+    broken = POOL_BROKEN.value()
+    app = AppTest.from_file(path, default_timeout=timeout)
+    seconds = []
+    for _ in range(2):
+        start = time.perf_counter()
+        app.run()
+        seconds.append(time.perf_counter() - start)
+        if app.exception:
+            return False, f"页面异常：{app.exception[0].value}"
+    times = " / ".join(f"{s:.2f}" for s in seconds)
+    if POOL_BROKEN.value() > broken:
+        return False, f"进程池损坏 {POOL_BROKEN.value() - broken:g} 次（{times} 秒）"
+    return True, f"{times} 秒"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="在渲染工作进程数大于 0 时逐页检查进程池没有损坏。")
+    parser.add_argument("pages", nargs="*", help="页面脚本，默认为 pages/ 下全部页面")
+    parser.add_argument("--timeout", type=float, default=120.0, help="单次重跑的超时（秒）")
+    args = parser.parse_args(argv)
+
+    if RENDER_BACKEND.workers <= 0:
+        parser.error("P2J_RENDER_WORKERS 必须大于 0")
+    pages = args.pages or sorted(glob.glob(os.path.join(ROOT, "pages", "*.py")))
+    failed = 0
+    for page in pages:
+        ok, note = check_page(os.path.abspath(page), args.timeout)
+        failed += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {os.path.basename(page)}  {note}")
+    used = RENDER_BACKEND._pool is not None
+    if not used:
+        print("FAIL 没有任何页面用到渲染进程池")
+    RENDER_BACKEND.shutdown()
+    print(f"{RENDER_BACKEND.workers} 个工作进程，{len(pages)} 个页面，失败 {failed}")
+    return 0 if failed == 0 and used else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+replay.py
+
+交互轨迹回放：把 utils/traces.py 录下的真实操作序列按原速或加速重放，
+报告重跑延迟与资源占用，用真实负载评估性能改动。
+
+两种回放方式：
+- 默认在本机启动应用（或用 --url 指向已经在跑的实例），每条轨迹开一个
+  websocket 会话（与 loadtest.py 相同，和浏览器收发一样的消息），
+  --concurrency 条轨迹同时回放；测的是端到端的重跑延迟，以及服务进程的 CPU 与 RSS；
+- --headless 在本进程里用 Streamlit 的 AppTest 逐条轨迹直接运行页面脚本，
+  不经过网络和前端协议，测的是脚本本身的耗时、CPU 时间与峰值 RSS，便于剖析和对比。
+
+回放时按轨迹里记录的时间间隔等待，--speed 10 表示快 10 倍，--speed 0 表示不等待、
+一次接一次地回放。轨迹中控件号匹配不上当前页面的状态（代码改过控件参数）计入“失配”，
+失配多时结果已不能代表原来的操作。
+
+用法：
+    P2J_TRACE_DIR=data/traces streamlit run streamlit_app.py       # 先录制
+    python tools/replay.py data/traces/*.jsonl --speed 10 --concurrency 4
+    python tools/replay.py data/traces/*.jsonl --headless --speed 0 --output after.json
+    python tools/replay.py data/traces/*.jsonl --output after.json --compare before.json
+
+websocket 回放需要额外安装 websockets；CPU 和 RSS 直接读 /proc，仅支持 Linux。
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from loadtest import (ROOT, ProcSampler, SimSession, free_port, git_revision, percentiles,
+                      start_server, stop_server, ws_connect)
+
+sys.path.insert(0, ROOT)
+
+from utils.traces import load_traces, widget_states  # noqa: E402
+
+
+@dataclass
+class Replayed:
+    """一次回放重跑的测量结果。"""
+    page: str
+    latency: float
+    recorded: float
+    error: str = ""
+    unmatched: int = 0
+
+
+@dataclass
+class Report:
+    """全部轨迹回放的汇总。"""
+    traces: int
+    reruns: int = 0
+    errors: int = 0
+    unmatched: int = 0
+    wall_seconds: float = 0.0
+    throughput: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_ms: float = 0.0
+    recorded_p50_ms: float = 0.0
+    recorded_p95_ms: float = 0.0
+    cpu_percent: float = 0.0
+    cpu_seconds: float = 0.0
+    rss_peak_mb: float = 0.0
+    error_kinds: dict = field(default_factory=dict)
+    pages: dict = field(default_factory=dict)
+
+
+def _apply(states: dict, event: dict) -> None:
+    """把一行轨迹的 drop/set 应用到控件状态（控件号 → 状态字典）上。"""
+    for wid in event["drop"]:
+        states.pop(wid, None)
+    for data in event["set"]:
+        states[data["id"]] = data
+
+
+async def _wait(start: float, event: dict, speed: float) -> None:
+    if speed > 0:
+        await asyncio.sleep(max(start + event["t"] / speed - time.monotonic(), 0.0))
+
+
+# --- websocket 回放 ---
+async def replay_trace(url: str, events: list, speed: float, results: list) -> None:
+    """用一个 websocket 会话回放一条轨迹。"""
+    session = SimSession(url, None, 0.0)
+    states: dict = {}
+    page_hash = None
+    try:
+        await session.connect()
+        start = time.monotonic()
+        for event in events:
+            await _wait(start, event, speed)
+            if event["page_hash"] != page_hash:
+                # 换页时浏览器清空控件状态，轨迹里的 drop 也已记下
+                page_hash = event["page_hash"]
+                session.page, session.page_hash = "", page_hash
+            _apply(states, event)
+            session.states = {wid: s for wid, s in zip(states, widget_states(states))}
+            latency, error, _ = await session.rerun()
+            unmatched = sum(data["id"] not in session.widgets for data in event["set"])
+            results.append(Replayed(event["page"], latency, event["seconds"], error, unmatched))
+    except Exception as e:  # 断线、超时等计为一次出错
+        results.append(Replayed(events[0]["page"], 0.0, 0.0, type(e).__name__))
+    finally:
+        await session.close()
+
+
+async def replay_server(url: str, traces: dict, speed: float, concurrency: int,
+                        sampler: ProcSampler) -> list:
+    results: list = []
+    limit = asyncio.Semaphore(concurrency)
+    sampler_task = asyncio.create_task(sampler.run())
+
+    async def one(events):
+        async with limit:
+            await replay_trace(url, events, speed, results)
+
+    await asyncio.gather(*(one(events) for events in traces.values()))
+    sampler_task.cancel()
+    return results
+
+
+# --- 进程内回放 ---
+def replay_headless(traces: dict, speed: float, timeout: float) -> list:
+    """用 AppTest 在本进程里逐条轨迹运行页面脚本。
+
+    先运行一次入口脚本，再像侧边栏导航一样切换页面，页面哈希（以及由它算出的
+    控件号）与真实会话一致，轨迹里的控件状态才能对上。
+    """
+    from streamlit.proto.WidgetStates_pb2 import WidgetStates
+    from streamlit.testing.v1 import AppTest
+
+    results: list = []
+    for events in traces.values():
+        states: dict = {}
+        app = AppTest.from_file(os.path.join(ROOT, "streamlit_app.py"), default_timeout=timeout)
+        app.run()
+        page = None
+        start = time.monotonic()
+        for event in events:
+            if speed > 0:
+                time.sleep(max(start + event["t"] / speed - time.monotonic(), 0.0))
+            if event["page"] != page:
+                try:
+                    app.switch_page(f"pages/{event['page']}.py")
+                except ValueError:
+                    results.append(Replayed(event["page"], 0.0, event["seconds"], "PageNotFound"))
+                    continue
+                page = event["page"]
+            _apply(states, event)
+            proto = WidgetStates()
+            proto.widgets.extend(widget_states(states))
+            t0 = time.perf_counter()
+            try:
+                app._run(proto)
+            except Exception as e:  # 超时等
+                results.append(Replayed(page, time.perf_counter() - t0, event["seconds"],
+                                        type(e).__name__))
+                continue
+            latency = time.perf_counter() - t0
+            error = app.exception[0].value if app.exception else ""
+            present = {w.id for w in app._tree.get_widget_states().widgets}
+            unmatched = sum(data["id"] not in present for data in event["set"])
+            results.append(Replayed(page, latency, event["seconds"], error and "Exception",
+                                    unmatched))
+    return results
+
+
+# --- 报告 ---
+def summarize(results: list, n_traces: int, wall: float) -> Report:
+    good = [r.latency for r in results if not r.error]
+    report = Report(traces=n_traces, reruns=len(good), wall_seconds=round(wall, 2))
+    report.errors = sum(bool(r.error) for r in results)
+    report.unmatched = sum(r.unmatched for r in results)
+    report.error_kinds = dict(Counter(f"{r.page}:{r.error}" for r in results if r.error))
+    report.throughput = round(len(good) / wall, 2) if wall > 0 else 0.0
+    report.p50_ms, report.p95_ms, report.p99_ms, report.max_ms = percentiles(good)
+    report.recorded_p50_ms, report.recorded_p95_ms, _, _ = percentiles(
+        [r.recorded for r in results if not r.error])
+    for page in sorted({r.page for r in results}):
+        mine = [r for r in results if r.page == page and not r.error]
+        p50, p95, _, _ = percentiles([r.latency for r in mine])
+        rec50, _, _, _ = percentiles([r.recorded for r in mine])
+        report.pages[page] = {"reruns": len(mine), "p50_ms": p50, "p95_ms": p95,
+                              "recorded_p50_ms": rec50,
+                              "unmatched": sum(r.unmatched for r in results if r.page == page)}
+    return report
+
+
+def print_report(report: dict, baseline: Optional[dict] = None) -> None:
+    base = (baseline or {}).get("pages", {})
+    header = f"{'页面':<14} {'重跑':>5} {'p50':>8} {'p95':>8} {'录制p50':>8} {'失配':>4}"
+    if base:
+        header += f" {'Δp50':>8} {'Δp95':>8}"
+    print(header)
+    for page, r in report["pages"].items():
+        line = (f"{page:<14} {r['reruns']:>5} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+                f"{r['recorded_p50_ms']:>8.1f} {r['unmatched']:>4}")
+        old = base.get(page)
+        if old:
+            line += f" {r['p50_ms'] - old['p50_ms']:>+8.1f} {r['p95_ms'] - old['p95_ms']:>+8.1f}"
+        print(line)
+    print(f"共 {report['traces']} 条轨迹、{report['reruns']} 次重跑，用时 {report['wall_seconds']} 秒；"
+          f"p50 {report['p50_ms']} ms，p95 {report['p95_ms']} ms，p99 {report['p99_ms']} ms；"
+          f"出错 {report['errors']}，失配 {report['unmatched']}")
+    if report["cpu_percent"] or report["cpu_seconds"]:
+        print(f"CPU {report['cpu_percent']}%（{report['cpu_seconds']} 秒），"
+              f"RSS 峰值 {report['rss_peak_mb']} MB")
+    if report["error_kinds"]:
+        print("出错：" + "，".join(f"{k} ×{n}" for k, n in report["error_kinds"].items()))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="回放录制的交互轨迹，报告重跑延迟与资源占用。")
+    parser.add_argument("paths", nargs="+", help="轨迹文件（.jsonl）")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="回放速度倍数；0 表示不等待，一次接一次地回放")
+    parser.add_argument("--concurrency", type=int, default=1, help="同时回放的轨迹数（websocket 回放）")
+    parser.add_argument("--limit", type=int, default=None, help="最多回放多少条轨迹")
+    parser.add_argument("--headless", action="store_true", help="在本进程里用 AppTest 运行页面脚本")
+    parser.add_argument("--timeout", type=float, default=60.0, help="单次重跑的超时（秒，--headless）")
+    parser.add_argument("--url", default=None, help="被测应用地址；不给则在本机启动一个")
+    parser.add_argument("--no-server", action="store_true", help="不启动应用，直接回放到 --url")
+    parser.add_argument("--pid", type=int, default=None, help="--no-server 时用于采样 CPU/RSS 的进程号")
+    parser.add_argument("--output", default=None, help="把结果写成 JSON 文件")
+    parser.add_argument("--compare", default=None, help="与之前保存的 JSON 结果逐页对比")
+    args = parser.parse_args(argv)
+
+    traces = load_traces(args.paths)
+    if args.limit is not None:
+        traces = dict(list(traces.items())[:args.limit])
+    if not traces:
+        parser.error("轨迹文件里没有任何轨迹")
+    print(f"回放 {len(traces)} 条轨迹、{sum(map(len, traces.values()))} 次重跑……", file=sys.stderr)
+
+    cpu_percent = cpu_seconds = rss_peak_mb = 0.0
+    start = time.monotonic()
+    if args.headless:
+        cpu_start = time.process_time()
+        results = replay_headless(traces, args.speed, args.timeout)
+        cpu_seconds = time.process_time() - cpu_start
+        cpu_percent = 100 * cpu_seconds / max(time.monotonic() - start, 1e-9)
+        # ru_maxrss 在 Linux 上以 KB 为单位
+        rss_peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    else:
+        if ws_connect is None:
+            parser.error("需要安装 websockets：pip install websockets；或改用 --headless")
+        proc = None
+        if args.no_server:
+            if not args.url:
+                parser.error("--no-server 需要同时给出 --url")
+            url, pid = args.url, args.pid
+        else:
+            port = free_port()
+            proc = start_server(port)
+            url, pid = args.url or f"http://127.0.0.1:{port}", proc.pid
+        sampler = ProcSampler(pid)
+        try:
+            start = time.monotonic()
+            results = asyncio.run(replay_server(url, traces, args.speed, args.concurrency, sampler))
+        finally:
+            if proc is not None:
+                stop_server(proc)
+        if sampler.cpu:
+            cpu_percent = float(np.mean(sampler.cpu))
+            cpu_seconds = cpu_percent / 100 * (time.monotonic() - start)
+        if sampler.rss:
+            rss_peak_mb = max(sampler.rss) / 2**20
+    summary = summarize(results, len(traces), time.monotonic() - start)
+    summary.cpu_percent = round(cpu_percent, 1)
+    summary.cpu_seconds = round(cpu_seconds, 2)
+    summary.rss_peak_mb = round(rss_peak_mb, 1)
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cpu_count": os.cpu_count(),
+        "python": sys.version.split()[0],
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        **summary.__dict__,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+"""
+bulk.py
+
+批量三角形分析：老师上传全班的作业（几千到上百万个三角形，每行三条边或三个顶点），
+逐个按角、按边分类，计算面积与内角，并统计相似组。
+
+- 输入按块流式读取：CSV（可 gzip 压缩）用 pandas 的 chunksize，Parquet 用 pyarrow 的
+  iter_batches，每块至多 CHUNK_ROWS 行，交给 utils.similarity 的向量化函数处理；
+- 每块的结果立即追加写入临时文件（CSV 或 Parquet），不在内存里累积；
+- 相似组只累计“形状键 → 个数”，它的大小受 1/tol² 限制，与行数无关；
+- 分析在后台线程里进行，页面脚本立即结束，进度由定时重跑的 fragment 显示，
+  处理期间页面上的其他控件照常可用。
+
+所以内存占用只取决于块大小和相似组数，与文件大小无关。上传的文件本身由 Streamlit
+保存在内存里（受 server.maxUploadSize 限制），大文件建议先 gzip 压缩再上传。
+
+环境变量：
+    P2J_BULK_CHUNK_ROWS  每块的行数，默认 100000
+    P2J_BULK_WORKERS     同时进行的分析任务数（全进程共享），默认 1，其余排队
+"""
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from utils.metrics import REGISTRY
+from utils.predicates import signed_area
+from utils.similarity import (ANGLE_CLASSES, INVALID_KEY, SIDE_CLASSES, angles_from_sides,
+                              classify_triangles, key_to_shape, shape_keys, to_sides,
+                              triangle_areas)
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = int(os.environ.get("P2J_BULK_CHUNK_ROWS", 100_000))
+WORKERS = max(1, int(os.environ.get("P2J_BULK_WORKERS", 1)))
+INVALID_LABEL = "不能构成三角形"
+# 输出格式 → 文件扩展名
+OUTPUT_FORMATS = {"CSV": ".csv", "Parquet": ".parquet"}
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="p2j-bulk")
+
+BULK_ROWS = REGISTRY.counter("p2j_bulk_rows_total", "批量分析已处理的三角形行数")
+
+
+# ---- 读取 ----
+
+def _numeric_rows(frame: pd.DataFrame) -> np.ndarray:
+    """把一块表格转成浮点数组；非数字单元格记为 nan，整行都不是数字的行（表头等）丢弃。"""
+    rows = frame.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    return rows[~np.isnan(rows).all(axis=1)]
+
+
+def read_csv_chunks(file, name: str, chunk_rows: int = CHUNK_ROWS
+                    ) -> Iterator[tuple[np.ndarray, float]]:
+    """按块读取 CSV（文件名以 .gz 结尾时按 gzip 解压）。
+
+    Args:
+        file: 可 seek 的二进制文件对象（例如 st.file_uploader 的返回值）。
+        name: 文件名，用于判断是否压缩。
+        chunk_rows: 每块的行数。
+
+    Yields:
+        (rows, progress)：rows 形状 (n, 3) 或 (n, 6)；progress 为已读字节的比例。
+    """
+    file.seek(0, os.SEEK_END)
+    size = file.tell() or 1
+    file.seek(0)
+    compression = "gzip" if name.lower().endswith(".gz") else None
+    try:
+        reader = pd.read_csv(file, header=None, chunksize=chunk_rows, compression=compression,
+                             skipinitialspace=True)
+        for frame in reader:
+            yield _numeric_rows(frame), min(file.tell() / size, 1.0)
+    except (pd.errors.ParserError, UnicodeDecodeError, EOFError, OSError) as exc:
+        raise ValueError(f"无法解析 CSV：{exc}") from exc
+
+
+def read_parquet_chunks(file, chunk_rows: int = CHUNK_ROWS
+                        ) -> Iterator[tuple[np.ndarray, float]]:
+    """按块读取 Parquet 文件中的数值列。
+
+    Yields:
+        (rows, progress)：rows 形状 (n, 3) 或 (n, 6)；progress 为已读行数的比例。
+    """
+    try:
+        parquet = pq.ParquetFile(file)
+    except Exception as exc:
+        raise ValueError(f"无法解析 Parquet：{exc}") from exc
+    total = parquet.metadata.num_rows or 1
+    done = 0
+    for batch in parquet.iter_batches(batch_size=chunk_rows):
+        frame = batch.to_pandas().select_dtypes(include="number")
+        done += batch.num_rows
+        yield _numeric_rows(frame), done / total
+
+
+def sample_chunks(n: int, families: int = 12, seed: int = 7, chunk_rows: int = CHUNK_ROWS
+                  ) -> Iterator[tuple[np.ndarray, float]]:
+    """边生成边产出的示例数据：若干“形状家族”的三角形顶点，经过随机缩放、旋转和平移。"""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0, 10, (families, 3, 2))
+    for start in range(0, n, chunk_rows):
+        m = min(chunk_rows, n - start)
+        theta = rng.uniform(0, 2 * np.pi, m)
+        rot = np.stack([np.stack([np.cos(theta), -np.sin(theta)], -1),
+                        np.stack([np.sin(theta), np.cos(theta)], -1)], -2)
+        vertices = np.einsum("nij,nkj->nki", rot, base[rng.integers(0, families, m)])
+        vertices = vertices * rng.uniform(0.2, 5, m)[:, None, None] + rng.uniform(-50, 50, (m, 1, 2))
+        yield vertices.reshape(m, 6).round(4), (start + m) / n
+
+
+# ---- 计算 ----
+
+def analyze_chunk(rows: np.ndarray, tol: float) -> dict:
+    """对一块三角形做全部计算。
+
+    Args:
+        rows: 形状 (n, 3) 的边长或 (n, 6) 的顶点坐标。
+        tol: 相似判断的容差。
+
+    Returns:
+        各列的数组：sides、areas、angles、by_angle、by_side、keys。
+
+    Raises:
+        ValueError: 列数既不是 3 也不是 6。
+    """
+    sides = to_sides(rows)
+    if rows.shape[1] == 6:
+        # 由顶点给出时直接用有向面积，比由边长反推更准确
+        v = rows.reshape(-1, 3, 2)
+        areas = np.abs(signed_area(v[:, 0], v[:, 1], v[:, 2]))
+        areas[np.isnan(sides).any(axis=1)] = np.nan
+    else:
+        areas = triangle_areas(sides)
+    by_angle, by_side = classify_triangles(sides)
+    angles = angles_from_sides(sides)
+    angles[by_angle < 0] = np.nan
+    return {"sides": sides, "areas": areas, "angles": angles, "by_angle": by_angle,
+            "by_side": by_side, "keys": shape_keys(sides, tol)}
+
+
+def _labels(codes: np.ndarray, names: tuple) -> pa.DictionaryArray:
+    return pa.DictionaryArray.from_arrays(np.where(codes < 0, len(names), codes).astype(np.int8),
+                                          list(names) + [INVALID_LABEL])
+
+
+def result_table(start: int, result: dict) -> pa.Table:
+    """一块结果的输出表格；序号从 start 开始，与输入文件中的数据行一一对应。
+
+    浮点数保留 6 位小数；分类列是字典编码的字符串。角 i 是边 i 所对的角
+    （angles_from_sides 按顶点排列，顶点 2 对边 1，这里轮换一位）。
+    """
+    sides = result["sides"].round(6)
+    angles = np.roll(result["angles"], 1, axis=1).round(6)
+    return pa.table({
+        "序号": np.arange(start, start + len(sides)),
+        "边1": sides[:, 0], "边2": sides[:, 1], "边3": sides[:, 2],
+        "面积": result["areas"].round(6),
+        "角1": angles[:, 0], "角2": angles[:, 1], "角3": angles[:, 2],
+        "按角分类": _labels(result["by_angle"], ANGLE_CLASSES),
+        "按边分类": _labels(result["by_side"], SIDE_CLASSES),
+        "形状键": result["keys"],
+    })
+
+
+class _GroupCounter:
+    """跨块累计“形状键 → 个数”，始终保持按键排序的两个数组。"""
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def add(self, keys: np.ndarray) -> None:
+        keys, counts = np.unique(keys[keys != INVALID_KEY], return_counts=True)
+        merged, inverse = np.unique(np.concatenate([self.keys, keys]), return_inverse=True)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, counts]),
+                                  minlength=len(merged)).astype(np.int64)
+        self.keys = merged
+
+    def top(self, limit: int) -> tuple[np.ndarray, np.ndarray]:
+        """数量最多的 limit 组 (keys, counts)。"""
+        order = np.argsort(-self.counts, kind="stable")[:limit]
+        return self.keys[order], self.counts[order]
+
+
+class _ResultWriter:
+    """把结果逐块追加到 CSV 或 Parquet 文件（都用 pyarrow 写，CSV 比 pandas 快一个数量级）。"""
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self._file = None
+        self._writer = None
+
+    def write(self, table: pa.Table) -> None:
+        if self.fmt == "Parquet":
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema, compression="zstd")
+        else:
+            # CSV 里分类列写成普通字符串
+            table = pa.table({name: col.cast(pa.string()) if pa.types.is_dictionary(col.type)
+                              else col for name, col in zip(table.column_names, table.columns)})
+            if self._writer is None:
+                self._file = open(self.path, "wb")
+                self._file.write("\ufeff".encode("utf-8"))  # BOM：Excel 直接打开不会乱码
+                self._writer = pa_csv.CSVWriter(self._file, table.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+# ---- 任务 ----
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@dataclass(eq=False)
+class BulkJob:
+    """一次后台批量分析任务。页面只读取它的字段，所有写入都在后台线程里。
+
+    Attributes:
+        source: 数据来源的说明（文件名或“示例数据”）。
+        fmt: 输出格式，OUTPUT_FORMATS 的键。
+        tol: 相似判断的容差。
+        path: 结果文件路径；任务对象被回收时文件随之删除。
+        state: queued、running、done、failed、cancelled 之一。
+    """
+    source: str
+    fmt: str
+    tol: float
+    path: str
+    state: str = "queued"
+    error: str = ""
+    progress: float = 0.0
+    rows: int = 0
+    invalid: int = 0
+    started: float = 0.0
+    finished: float = 0.0
+    crosstab: np.ndarray = field(default_factory=lambda: np.zeros((4, 4), dtype=np.int64))
+    area_sum: float = 0.0
+    area_min: float = float("inf")
+    area_max: float = 0.0
+    groups: _GroupCounter = field(default_factory=_GroupCounter)
+    future: Optional[Future] = None
+    _cancel: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def active(self) -> bool:
+        """是否还在排队或运行中。"""
+        return self.state in ("queued", "running")
+
+    @property
+    def seconds(self) -> float:
+        """已用时间（秒）。"""
+        if not self.started:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def cancel(self) -> None:
+        """请求停止；后台线程处理完当前这一块后退出。"""
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self.state = "cancelled"
+            _remove(self.path)
+
+    def top_groups(self, limit: int = 50) -> list[dict]:
+        """数量最多的相似组，附代表边长比和内角。"""
+        keys, counts = self.groups.top(limit)
+        shapes = key_to_shape(keys, self.tol)
+        angles = angles_from_sides(shapes)
+        return [{"组号": i, "数量": int(n), "形状键": int(k),
+                 "边长比（最短 : 中间 : 最长）": f"{r0:.3f} : {r1:.3f} : 1",
+                 "三个内角": f"{a:.1f}°, {b:.1f}°, {c:.1f}°"}
+                for i, (k, n, (r0, r1, _), (a, b, c))
+                in enumerate(zip(keys, counts, shapes, angles))]
+
+    def class_table(self) -> list[dict]:
+        """按角 × 按边的分类计数表。"""
+        sides = list(SIDE_CLASSES) + [INVALID_LABEL]
+        return [{"按角 \\ 按边": name, **{s: int(n) for s, n in zip(sides, row)}}
+                for name, row in zip(list(ANGLE_CLASSES) + [INVALID_LABEL], self.crosstab)
+                if row.any()]
+
+    def _consume(self, chunks: Iterator[tuple[np.ndarray, float]]) -> None:
+        self.state, self.started = "running", time.time()
+        writer = _ResultWriter(self.path, self.fmt)
+        try:
+            for rows, progress in chunks:
+                if self._cancel.is_set():
+                    self.state = "cancelled"
+                    break
+                if not len(rows):
+                    self.progress = progress
+                    continue
+                result = analyze_chunk(rows, self.tol)
+                writer.write(result_table(self.rows + 1, result))
+                by_angle, by_side = result["by_angle"], result["by_side"]
+                np.add.at(self.crosstab, (np.where(by_angle < 0, 3, by_angle),
+                                          np.where(by_side < 0, 3, by_side)), 1)
+                valid = result["areas"][by_angle >= 0]
+                if len(valid):
+                    self.area_sum += float(valid.sum())
+                    self.area_min = min(self.area_min, float(valid.min()))
+                    self.area_max = max(self.area_max, float(valid.max()))
+                self.groups.add(result["keys"])
+                self.invalid += int((by_angle < 0).sum())
+                self.rows += len(rows)
+                self.progress = progress
+                BULK_ROWS.inc(len(rows))
+            else:
+                self.state, self.progress = "done", 1.0
+        except ValueError as exc:  # 文件内容有问题，提示给用户即可
+            logger.warning("批量分析失败：%s：%s", self.source, exc)
+            self.state, self.error = "failed", str(exc)
+        except Exception as exc:
+            logger.exception("批量分析失败：%s", self.source)
+            self.state, self.error = "failed", f"内部错误：{exc!r}"
+        finally:
+            writer.close()
+            self.finished = time.time()
+            if self.state != "done":
+                _remove(self.path)
+
+
+_JOBS: "weakref.WeakSet[BulkJob]" = weakref.WeakSet()
+
+
+def start_job(chunks: Callable[[], Iterator[tuple[np.ndarray, float]]], source: str,
+              fmt: str = "CSV", tol: float = 1e-3) -> BulkJob:
+    """提交一个后台分析任务。
+
+    Args:
+        chunks: 无参函数，返回按块产出 (rows, progress) 的迭代器；在后台线程里调用。
+        source: 数据来源的说明。
+        fmt: 输出格式，OUTPUT_FORMATS 的键。
+        tol: 相似判断的容差。
+
+    Returns:
+        BulkJob；页面把它放进 st.session_state，之后轮询它的字段即可。
+    """
+    fd, path = tempfile.mkstemp(prefix="p2j-bulk-", suffix=OUTPUT_FORMATS[fmt])
+    os.close(fd)
+    job = BulkJob(source, fmt, tol, path)
+    # 会话结束、任务对象被回收时删除结果文件
+    weakref.finalize(job, _remove, path)
+    job.future = _EXECUTOR.submit(lambda: job._consume(chunks()))
+    _JOBS.add(job)
+    return job
+
+
+REGISTRY.gauge("p2j_bulk_jobs", "批量分析任务数（按状态）",
+               lambda: {(state,): sum(job.state == state for job in list(_JOBS))
+                        for state in ("queued", "running")}, ("state",))
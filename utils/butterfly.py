@@ -0,0 +1,251 @@
+"""
+butterfly.py
+
+蝴蝶模型计算引擎：从真实四边形出发计算对角线交点与四块“翅膀”面积。
+
+约定（与 pages/8_蝴蝶模型.py 一致）：四边形顶点按 A、B、C、D 顺序给出，
+对角线 AC 与 BD 交于 O，四块翅膀为
+    S1 = S△AOD（左）, S2 = S△AOB（上）, S3 = S△BOC（右）, S4 = S△COD（下），
+恒有 S1 × S3 = S2 × S4。
+
+所有函数都接受单个四边形 (4, 2) 或一批四边形 (N, 4, 2)，内部全部向量化，
+可以一次处理上百万个四边形。
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from utils.predicates import line_intersection, orient2d, safe_ratio
+
+# 翅膀名称，与面积数组的列顺序一致
+WING_NAMES = ("S1", "S2", "S3", "S4")
+
+
+def _as_quads(quads) -> np.ndarray:
+    """把输入整理成 (N, 4, 2) 的浮点数组。"""
+    arr = np.asarray(quads, dtype=float)
+    if arr.ndim == 2:
+        arr = arr[None]
+    if arr.shape[-2:] != (4, 2):
+        raise ValueError(f"四边形数组形状应为 (4, 2) 或 (N, 4, 2)，实际为 {arr.shape}")
+    return arr
+
+
+def _cross(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """二维叉积（逐行）。"""
+    return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+
+def diagonal_intersection(quads) -> tuple[np.ndarray, np.ndarray]:
+    """计算对角线 AC 与 BD 的交点 O。
+
+    Args:
+        quads: 四边形顶点，形状 (4, 2) 或 (N, 4, 2)，顶点顺序为 A、B、C、D。
+
+    Returns:
+        (O, valid)：O 形状为 (N, 2)；valid 为布尔数组，表示对角线确实在
+        两条线段内部相交（即四边形是凸的、非退化的）。无效行的 O 为 nan。
+    """
+    q = _as_quads(quads)
+    A, B, C, D = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    # 用精确的方向谓词判断两条对角线是否在内部交叉，近退化的四边形也不会误判
+    valid = ((orient2d(A, C, B) * orient2d(A, C, D) < 0)
+             & (orient2d(B, D, A) * orient2d(B, D, C) < 0))
+    O = line_intersection(A, C, B, D)
+    O[~valid] = np.nan
+    return O, valid
+
+
+def wing_areas(quads) -> np.ndarray:
+    """计算四块翅膀的面积。
+
+    Args:
+        quads: 四边形顶点，形状 (4, 2) 或 (N, 4, 2)。
+
+    Returns:
+        形状 (N, 4) 的数组，列依次为 S1、S2、S3、S4；非凸或退化的四边形为 nan。
+    """
+    q = _as_quads(quads)
+    O, _ = diagonal_intersection(q)
+    A, B, C, D = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    s1 = 0.5 * np.abs(_cross(A - O, D - O))
+    s2 = 0.5 * np.abs(_cross(A - O, B - O))
+    s3 = 0.5 * np.abs(_cross(B - O, C - O))
+    s4 = 0.5 * np.abs(_cross(C - O, D - O))
+    return np.stack([s1, s2, s3, s4], axis=1)
+
+
+def solve_missing_wing(areas) -> np.ndarray:
+    """已知三块翅膀求第四块（批量）。
+
+    Args:
+        areas: 形状 (4,) 或 (N, 4) 的面积数组，每行恰好有一个未知值，
+            未知值用 0 或 nan 表示（与页面“留空或设为0”的约定一致）。
+
+    Returns:
+        补全后的 (N, 4) 面积数组。无法求解的行（未知数个数不为 1，
+        或求解时需要除以 0）整行为 nan。
+    """
+    a = np.atleast_2d(np.asarray(areas, dtype=float)).copy()
+    unknown = np.isnan(a) | (a == 0)
+    solvable = unknown.sum(axis=1) == 1
+    a[unknown] = np.nan
+    s1, s2, s3, s4 = a.T
+    # 对角翅膀乘积相等：S1·S3 = S2·S4
+    candidates = np.stack([safe_ratio(s2 * s4, s3), safe_ratio(s1 * s3, s4),
+                           safe_ratio(s2 * s4, s1), safe_ratio(s1 * s3, s2)], axis=1)
+    a = np.where(unknown, candidates, a)
+    ok = solvable & np.isfinite(a).all(axis=1) & (a > 0).all(axis=1)
+    a[~ok] = np.nan
+    return a
+
+
+def check_answers(areas, answers, rtol: float = 1e-2) -> np.ndarray:
+    """批量批改：每行给出含一个未知翅膀的面积和学生答案。
+
+    Args:
+        areas: 形状 (N, 4) 的题目面积，未知翅膀为 0 或 nan。
+        answers: 形状 (N,) 的学生答案。
+        rtol: 允许的相对误差。
+
+    Returns:
+        形状 (N,) 的布尔数组，True 表示答对；题目本身无解的行为 False。
+    """
+    a = np.atleast_2d(np.asarray(areas, dtype=float))
+    unknown = np.isnan(a) | (a == 0)
+    solved = solve_missing_wing(a)
+    expected = np.where(unknown, solved, 0.0).sum(axis=1)
+    ans = np.asarray(answers, dtype=float).reshape(-1)
+    return np.isfinite(expected) & np.isclose(ans, expected, rtol=rtol, atol=0.0)
+
+
+def quad_from_wings(s1, s2, s3, s4=None, angle: float = np.pi / 2,
+                    rtol: float = 1e-6) -> np.ndarray:
+    """反问题：构造一个四边形，使其四块翅膀面积恰为给定值。
+
+    以 O 为原点，两条对角线夹角为 angle；取 OA = OB 使图形匀称，
+    再由面积公式 S = ½·OX·OY·sin(angle) 依次解出 OD、OC。
+
+    Args:
+        s1, s2, s3: 三块翅膀面积（标量或形状 (N,) 的数组，必须为正）。
+        s4: 第四块翅膀面积；为 None 时由 S1·S3/S2 推出，否则检查是否满足
+            S1·S3 = S2·S4。
+        angle: 两条对角线的夹角（弧度），取值 (0, π)。
+        rtol: 检查 S1·S3 = S2·S4 时的相对误差。
+
+    Returns:
+        形状 (N, 4, 2) 的四边形顶点数组，顶点顺序 A、B、C、D。
+
+    Raises:
+        ValueError: 面积不是正数，或给定的 S4 与另三块不相容。
+    """
+    s1, s2, s3 = (np.atleast_1d(np.asarray(v, dtype=float)) for v in (s1, s2, s3))
+    if np.any(s1 <= 0) or np.any(s2 <= 0) or np.any(s3 <= 0):
+        raise ValueError("翅膀面积必须为正数")
+    if s4 is not None:
+        s4 = np.atleast_1d(np.asarray(s4, dtype=float))
+        if not np.allclose(s1 * s3, s2 * s4, rtol=rtol):
+            raise ValueError("给定的面积不满足 S1×S3 = S2×S4，无法构成蝴蝶模型")
+    if not 0 < angle < np.pi:
+        raise ValueError("对角线夹角必须在 (0, π) 之间")
+
+    h = 0.5 * np.sin(angle)
+    oa = np.sqrt(s2 / h)
+    ob = oa
+    od = s1 / (h * oa)
+    oc = s3 / (h * ob)
+
+    # OA 指向左上、OB 指向右上，二者夹角为 angle
+    half = angle / 2
+    ua = np.array([-np.sin(half), np.cos(half)])
+    ub = np.array([np.sin(half), np.cos(half)])
+    A = oa[:, None] * ua
+    B = ob[:, None] * ub
+    C = -oc[:, None] * ua
+    D = -od[:, None] * ub
+    return np.stack([A, B, C, D], axis=1)
+
+
+def trapezoid_quads(top, bottom, height, shift=0.0) -> np.ndarray:
+    """构造上底 AB ∥ 下底 DC 的梯形（批量）。
+
+    Args:
+        top: 上底 AB 的长度。
+        bottom: 下底 DC 的长度。
+        height: 梯形的高。
+        shift: 上底左端点相对下底左端点的水平偏移。
+
+    Returns:
+        形状 (N, 4, 2) 的四边形顶点数组。
+    """
+    top, bottom, height, shift = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (top, bottom, height, shift)))
+    zeros = np.zeros_like(top)
+    A = np.stack([shift, height], axis=1)
+    B = np.stack([shift + top, height], axis=1)
+    C = np.stack([bottom, zeros], axis=1)
+    D = np.stack([zeros, zeros], axis=1)
+    return np.stack([A, B, C, D], axis=1)
+
+
+def trapezoid_wings(top, bottom, height) -> np.ndarray:
+    """梯形蝴蝶模型的闭式解（上底 AB ∥ 下底 DC）。
+
+    交点 O 把高按 top : bottom 分开，于是
+        S2 = top²·h / (2(top+bottom)),  S4 = bottom²·h / (2(top+bottom)),
+        S1 = S3 = top·bottom·h / (2(top+bottom))。
+
+    Args:
+        top: 上底长度（标量或数组）。
+        bottom: 下底长度。
+        height: 高。
+
+    Returns:
+        形状 (N, 4) 的面积数组。
+    """
+    top, bottom, height = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (top, bottom, height)))
+    k = height / (2 * (top + bottom))
+    side = top * bottom * k
+    return np.stack([side, top * top * k, side, bottom * bottom * k], axis=1)
+
+
+def trapezoid_from_wings(s2, s4, height=None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """梯形反问题：由上、下两块翅膀求上下底与两腰翅膀。
+
+    上下底之比为 √(S2/S4)，两腰翅膀 S1 = S3 = √(S2·S4)。
+
+    Args:
+        s2: 上翅膀面积。
+        s4: 下翅膀面积。
+        height: 梯形的高；为 None 时取下底长度，使图形接近正方形。
+
+    Returns:
+        (top, bottom, side)：上底、下底与两腰翅膀面积。
+    """
+    s2, s4 = (np.atleast_1d(np.asarray(v, dtype=float)) for v in (s2, s4))
+    side = np.sqrt(s2 * s4)
+    total = s2 + s4 + 2 * side          # 梯形总面积 = (top+bottom)·h/2
+    ratio = np.sqrt(s2 / s4)             # top / bottom
+    if height is None:
+        # 令 h = bottom：total = (ratio+1)·bottom²/2
+        bottom = np.sqrt(2 * total / (ratio + 1))
+    else:
+        bottom = 2 * total / ((ratio + 1) * np.asarray(height, dtype=float))
+    return ratio * bottom, bottom, side
+
+
+def wing_label_points(quads) -> np.ndarray:
+    """返回四块翅膀的重心，用于在图中标注 S1..S4。
+
+    Args:
+        quads: 四边形顶点，形状 (4, 2) 或 (N, 4, 2)。
+
+    Returns:
+        形状 (N, 4, 2) 的重心坐标。
+    """
+    q = _as_quads(quads)
+    O, _ = diagonal_intersection(q)
+    A, B, C, D = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    return np.stack([(A + D + O) / 3, (A + B + O) / 3,
+                     (B + C + O) / 3, (C + D + O) / 3], axis=1)
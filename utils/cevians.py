@@ -0,0 +1,271 @@
+"""
+cevians.py
+
+燕尾模型 / 塞瓦定理 / 劳斯定理计算引擎。
+
+在△ABC中取三条塞瓦线（从顶点连到对边的线段）：
+    AD（D∈BC，u = BD/BC）, BE（E∈CA，v = CE/CA）, CF（F∈AB，w = AF/AB），
+三条线两两相交于
+    P = BE ∩ CF,  Q = CF ∩ AD,  R = AD ∩ BE，
+把三角形分成 7 块：中间的△PQR 和沿边界的 6 块（按所含边界线段命名为
+AF、FB、BD、DC、CE、EA）。每块外侧区域视位置不同可能是三角形，也可能是
+被第三条塞瓦线截掉一角的四边形，这里用向量化的“同侧判断”统一处理。
+
+- 塞瓦定理：三线共点 ⇔ (BD/DC)·(CE/EA)·(AF/FB) = 1；
+- 劳斯定理：记 x = BD/DC, y = CE/EA, z = AF/FB，则
+      S△PQR / S△ABC = (xyz − 1)² / ((xy + x + 1)(yz + y + 1)(zx + z + 1))。
+
+所有参数都可以是标量或任意形状的数组（按 NumPy 规则广播），整张比例网格
+一次调用即可算完。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from utils.predicates import line_intersection as _robust_intersection
+from utils.predicates import safe_ratio, signed_area
+
+# 页面 5 默认三角形
+DEFAULT_TRIANGLE = ((0.5, 1.0), (0.0, 0.0), (1.0, 0.0))
+
+# 6 块外侧区域的名称（按边界线段），与 CevianResult.regions 的键一致
+OUTER_REGIONS = ("AF", "FB", "BD", "DC", "CE", "EA")
+REGION_NAMES = OUTER_REGIONS + ("PQR",)
+
+# 页面滑块网格：两线燕尾演示为 0.10~0.90、步长 0.01；三线劳斯演示步长 0.05
+SLIDER_GRID = np.round(np.arange(0.10, 0.90 + 1e-9, 0.01), 2)
+ROUTH_GRID = np.round(np.arange(0.10, 0.90 + 1e-9, 0.05), 2)
+
+
+@dataclass
+class CevianResult:
+    """三条塞瓦线的计算结果（每个字段都是与参数同形状的数组）。
+
+    Attributes:
+        bary: 点名到重心坐标 (α, β, γ) 三元组的映射（A、B、C、D、E、F、P、Q、R）。
+        triangle: 三角形顶点 (A, B, C)。
+        regions: 7 块区域名到面积数组的映射。
+        total: △ABC 的面积。
+        ceva_product: (BD/DC)·(CE/EA)·(AF/FB)。
+        concurrent: 三线是否共点（塞瓦条件在容差内成立）。
+        routh_area: 劳斯定理给出的中间三角形面积。
+    """
+    bary: dict
+    triangle: tuple
+    regions: dict
+    total: np.ndarray
+    ceva_product: np.ndarray
+    concurrent: np.ndarray
+    routh_area: np.ndarray
+
+    def point(self, name: str) -> np.ndarray:
+        """把某个点的重心坐标换算为直角坐标，形状 (..., 2)。"""
+        a, b, c = self.bary[name]
+        A, B, C = (np.asarray(P, dtype=float) for P in self.triangle)
+        return (np.asarray(a)[..., None] * A + np.asarray(b)[..., None] * B
+                + np.asarray(c)[..., None] * C)
+
+    @property
+    def points(self) -> dict:
+        """全部点的直角坐标。"""
+        return {name: self.point(name) for name in self.bary}
+
+
+def line_intersection(P1, P2, Q1, Q2) -> np.ndarray:
+    """向量化求直线 P1P2 与 Q1Q2 的交点。
+
+    Args:
+        P1, P2: 第一条直线上的两点，形状 (..., 2)。
+        Q1, Q2: 第二条直线上的两点，形状 (..., 2)。
+
+    Returns:
+        交点坐标，形状 (..., 2)；两线平行的位置为 nan（按精确判定，见 utils.predicates）。
+    """
+    return _robust_intersection(P1, P2, Q1, Q2)
+
+
+def polygon_area(*vertices) -> np.ndarray:
+    """向量化鞋带公式：多边形面积（取绝对值），退化时精确为 0。"""
+    return np.abs(signed_area(*vertices))
+
+
+def _det3(P, Q, R) -> np.ndarray:
+    """三个（归一化）重心坐标组成的行列式 = 有向面积 / S△ABC。"""
+    (a1, b1, c1), (a2, b2, c2), (a3, b3, c3) = P, Q, R
+    return (a1 * (b2 * c3 - b3 * c2) - b1 * (a2 * c3 - a3 * c2)
+            + c1 * (a2 * b3 - a3 * b2))
+
+
+def _normalize(a, b, c):
+    """把齐次重心坐标归一化，使三者之和为 1。"""
+    s = a + b + c
+    return a / s, b / s, c / s
+
+
+def _outer_region(U, V, meet, v_cut, u_cut, c1, c2) -> np.ndarray:
+    """边界线段 UV 所在区域面积占△ABC的比例。
+
+    U、V 处各有一条塞瓦线，二者交于 meet；第三条塞瓦线 c1c2 若把 meet 与 U
+    分在两侧，区域就是被截掉一角的（凸）四边形 U、V、v_cut、u_cut，
+    否则是△UV·meet。
+    """
+    same_side = np.sign(_det3(c1, c2, U)) * np.sign(_det3(c1, c2, meet)) >= 0
+    tri = np.abs(_det3(U, V, meet))
+    quad = np.abs(_det3(U, V, v_cut)) + np.abs(_det3(U, v_cut, u_cut))
+    return np.where(same_side, tri, quad)
+
+
+def routh_ratio(x, y, z) -> np.ndarray:
+    """劳斯定理：中间三角形面积占△ABC的比例。
+
+    Args:
+        x: BD/DC。
+        y: CE/EA。
+        z: AF/FB。
+
+    Returns:
+        S△PQR / S△ABC。
+    """
+    x, y, z = (np.asarray(a, dtype=float) for a in (x, y, z))
+    return (x * y * z - 1) ** 2 / ((x * y + x + 1) * (y * z + y + 1) * (z * x + z + 1))
+
+
+def solve_cevians(u, v, w, triangle=DEFAULT_TRIANGLE, rtol: float = 1e-9) -> CevianResult:
+    """计算三条塞瓦线构成的全部 7 块区域面积。
+
+    区域面积与三角形形状无关（仿射不变），因此全部在重心坐标下用闭式公式
+    计算，只在需要画图时才换算为直角坐标。
+
+    Args:
+        u: BD/BC，取值 (0, 1)，标量或数组。
+        v: CE/CA，取值 (0, 1)。
+        w: AF/AB，取值 (0, 1)。
+        triangle: 三角形顶点 (A, B, C)。
+        rtol: 判断塞瓦条件成立的相对容差。
+
+    Returns:
+        CevianResult 对象，所有字段与 u、v、w 广播后的形状一致。
+    """
+    u, v, w = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (u, v, w)))
+    # 常数坐标用广播视图表示，不额外占用内存
+    zero, one = np.broadcast_to(0.0, u.shape), np.broadcast_to(1.0, u.shape)
+    A, B, C = (one, zero, zero), (zero, one, zero), (zero, zero, one)
+    D = (zero, 1 - u, u)
+    E = (v, zero, 1 - v)
+    F = (1 - w, w, zero)
+    # 两条塞瓦线的交点：分别满足两条线上 β:γ、α:γ、α:β 的固定比例
+    P = _normalize(v * (1 - w), v * w, (1 - v) * (1 - w))      # BE ∩ CF
+    Q = _normalize((1 - w) * (1 - u), w * (1 - u), u * w)      # CF ∩ AD
+    R = _normalize(u * v, (1 - u) * (1 - v), u * (1 - v))      # AD ∩ BE
+
+    total = polygon_area(*(np.asarray(X, dtype=float) for X in triangle))
+    fractions = {
+        "AF": _outer_region(A, F, Q, P, R, B, E),
+        "FB": _outer_region(F, B, P, R, Q, A, D),
+        "BD": _outer_region(B, D, R, Q, P, C, F),
+        "DC": _outer_region(D, C, Q, P, R, B, E),
+        "CE": _outer_region(C, E, P, R, Q, A, D),
+        "EA": _outer_region(E, A, R, Q, P, C, F),
+        "PQR": np.abs(_det3(P, Q, R)),
+    }
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x, y, z = u / (1 - u), v / (1 - v), w / (1 - w)
+        product = x * y * z
+    return CevianResult(
+        bary={"A": A, "B": B, "C": C, "D": D, "E": E, "F": F, "P": P, "Q": Q, "R": R},
+        triangle=tuple(triangle),
+        regions={k: total * f for k, f in fractions.items()},
+        total=total,
+        ceva_product=product,
+        concurrent=np.isclose(product, 1.0, rtol=rtol, atol=0.0),
+        routh_area=total * routh_ratio(x, y, z),
+    )
+
+
+def ceva_partner(u, v) -> np.ndarray:
+    """给定 BD/BC 与 CE/CA，求使三线共点的 AF/AB。"""
+    u, v = np.asarray(u, dtype=float), np.asarray(v, dtype=float)
+    z = (1 - u) * (1 - v) / (u * v)     # AF/FB = 1 / (x·y)
+    return z / (1 + z)
+
+
+def swallowtail_areas(t, s, triangle=DEFAULT_TRIANGLE) -> dict:
+    """页面 5 的两线燕尾模型：F∈BC（t = BF/BC），E∈AC（s = AE/AC），O = AF ∩ BE。
+
+    Args:
+        t: BF/BC，标量或数组。
+        s: AE/AC，标量或数组。
+        triangle: 三角形顶点 (A, B, C)。
+
+    Returns:
+        字典，包含 O、E、F 坐标与 S1=S△AOB、S2=S△AOC、S3=S△BOF、S4=S△COF、
+        BF、FC 以及三个比值 ratio12、ratio34、ratioBF。
+    """
+    t, s = np.broadcast_arrays(np.asarray(t, dtype=float), np.asarray(s, dtype=float))
+    A, B, C = (np.broadcast_to(np.asarray(P, dtype=float), t.shape + (2,)) for P in triangle)
+    F = B + t[..., None] * (C - B)
+    E = A + s[..., None] * (C - A)
+    O = line_intersection(A, F, B, E)
+    S1, S2 = polygon_area(A, B, O), polygon_area(A, C, O)
+    S3, S4 = polygon_area(B, F, O), polygon_area(C, F, O)
+    BF = np.linalg.norm(F - B, axis=-1)
+    FC = np.linalg.norm(C - F, axis=-1)
+    ratios = {
+        "ratio12": safe_ratio(S1, S2),
+        "ratio34": safe_ratio(S3, S4),
+        "ratioBF": safe_ratio(BF, FC),
+    }
+    return {"O": O, "E": E, "F": F, "S1": S1, "S2": S2, "S3": S3, "S4": S4,
+            "BF": BF, "FC": FC, **ratios}
+
+
+def grid_index(value: float, grid: np.ndarray) -> int:
+    """把滑块取值映射为网格下标。"""
+    return int(np.abs(grid - value).argmin())
+
+
+@lru_cache(maxsize=1)
+def swallowtail_table() -> dict:
+    """预计算页面 5 两线演示的整张滑块网格（81×81），进程内只算一次。
+
+    Returns:
+        与 swallowtail_areas 相同的字典，每个数组的前两维为 (t 下标, s 下标)。
+    """
+    t, s = np.meshgrid(SLIDER_GRID, SLIDER_GRID, indexing="ij")
+    return swallowtail_areas(t, s)
+
+
+@lru_cache(maxsize=1)
+def routh_table() -> CevianResult:
+    """预计算三线劳斯演示的滑块网格（17×17×17），进程内只算一次。"""
+    u, v, w = np.meshgrid(ROUTH_GRID, ROUTH_GRID, ROUTH_GRID, indexing="ij")
+    return solve_cevians(u, v, w)
+
+
+def lookup(table, *values, grid: np.ndarray = SLIDER_GRID):
+    """从预计算网格中取出某个滑块状态对应的结果。
+
+    Args:
+        table: swallowtail_table() 或 routh_table() 的返回值。
+        *values: 各滑块当前值。
+        grid: 滑块网格。
+
+    Returns:
+        与 table 结构相同、但去掉网格维度的结果。
+    """
+    idx = tuple(grid_index(v, grid) for v in values)
+    if isinstance(table, CevianResult):
+        return CevianResult(
+            bary={k: tuple(c[idx] for c in p) for k, p in table.bary.items()},
+            triangle=table.triangle,
+            regions={k: a[idx] for k, a in table.regions.items()},
+            total=table.total,
+            ceva_product=table.ceva_product[idx],
+            concurrent=table.concurrent[idx],
+            routh_area=table.routh_area[idx],
+        )
+    return {k: a[idx] for k, a in table.items()}
@@ -0,0 +1,232 @@
+"""
+figures.py
+
+声明式图形描述（FigureSpec）及其绘制/编码。
+
+模型只负责产出一份由不可变数据类组成的“图纸”：多边形、折线、文字、坐标轴设置，
+真正调用 Matplotlib 的只有这里的 draw_spec。这样做的好处是：
+
+- 图纸可以哈希、比较和序列化，能直接作为渲染缓存的键；
+- 绘制与编码集中在一处，换后端、加并发、做统计都只需要改这一个文件；
+- 模型的计算与绘图可以分别测试和计时。
+
+所有坐标在构造时都转换成 Python float 元组，避免 NumPy 标量混入导致哈希不稳定。
+
+图像用面向对象的 Figure API 创建，不经过 pyplot 的全局图像管理器。
+但 Matplotlib 的文字排版（mathtext 解析器、FreeType 字体对象）仍是进程内共享的，
+多个脚本线程同时排版会相互踩踏，所以同一进程内的绘制与编码都要持有 MPL_LOCK；
+真正的并行出图交给 utils.render 的工作进程。
+"""
+from __future__ import annotations
+
+import base64
+import io
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# 进程内 Matplotlib 绘制/排版的全局锁（可重入）
+MPL_LOCK = threading.RLock()
+
+
+def points(seq: Iterable) -> tuple:
+    """把任意点序列规范化为 ((x, y), ...) 形式的 float 元组。"""
+    return tuple((float(p[0]), float(p[1])) for p in seq)
+
+
+@dataclass(frozen=True)
+class Shape:
+    """填充多边形（facecolor 为 None 时只画边框）。"""
+    points: tuple
+    facecolor: Optional[str] = None
+    edgecolor: Optional[str] = None
+    alpha: float = 1.0
+    linewidth: float = 1.0
+    linestyle: str = "-"
+    label: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Line:
+    """折线或散点（linestyle 为 "none" 时只画标记）。"""
+    xs: tuple
+    ys: tuple
+    color: str = "black"
+    linestyle: str = "-"
+    linewidth: float = 1.5
+    marker: Optional[str] = None
+    markersize: float = 6.0
+    alpha: float = 1.0
+    label: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Text:
+    """文字标注；box 给出背景框颜色时加圆角底框。"""
+    x: float
+    y: float
+    text: str
+    fontsize: float = 12
+    color: str = "black"
+    ha: str = "left"
+    va: str = "baseline"
+    rotation: float = 0.0
+    weight: str = "normal"
+    box: Optional[str] = None
+    box_alpha: float = 0.8
+    box_pad: float = 0.3
+
+
+@dataclass(frozen=True)
+class AxesSpec:
+    """一个坐标系中的全部图元与坐标轴设置。
+
+    Attributes:
+        items: Shape/Line/Text 组成的元组，按顺序绘制。
+        title: 子图标题。
+        title_size: 标题字号。
+        xlim: 横轴范围；None 表示自动。
+        ylim: 纵轴范围；None 表示自动。
+        equal: 是否等比例显示。
+        grid: 网格线型；None 表示不画网格。
+        grid_alpha: 网格透明度。
+        legend: 图例位置；None 表示不画图例。
+        frameless: 是否隐藏刻度与边框（示意图常用）。
+    """
+    items: tuple = ()
+    title: str = ""
+    title_size: float = 14
+    xlim: Optional[tuple] = None
+    ylim: Optional[tuple] = None
+    equal: bool = True
+    grid: Optional[str] = "--"
+    grid_alpha: float = 0.3
+    legend: Optional[str] = None
+    frameless: bool = False
+
+
+@dataclass(frozen=True)
+class FigureSpec:
+    """整张图的描述：一行若干个子图。"""
+    axes: tuple = field(default_factory=tuple)
+    figsize: tuple = (6, 6)
+    dpi: int = 100
+
+
+def line(P, Q, **style) -> Line:
+    """连接两点的线段。"""
+    return Line((float(P[0]), float(Q[0])), (float(P[1]), float(Q[1])), **style)
+
+
+def polyline(pts, closed: bool = False, **style) -> Line:
+    """依次连接若干点的折线；closed 为 True 时首尾相连。"""
+    pts = points(pts)
+    if closed:
+        pts = pts + pts[:1]
+    return Line(tuple(p[0] for p in pts), tuple(p[1] for p in pts), **style)
+
+
+def marker(P, **style) -> Line:
+    """单个点标记。"""
+    style.setdefault("marker", "o")
+    style.setdefault("linestyle", "none")
+    return Line((float(P[0]),), (float(P[1]),), **style)
+
+
+def _draw_axes(ax, spec: AxesSpec) -> None:
+    """把一个 AxesSpec 画到 Matplotlib 坐标系上。"""
+    from matplotlib.patches import Polygon
+
+    for item in spec.items:
+        if isinstance(item, Shape):
+            ax.add_patch(Polygon(
+                item.points, closed=True, fill=item.facecolor is not None,
+                facecolor=item.facecolor or "none", edgecolor=item.edgecolor or "none",
+                alpha=item.alpha, linewidth=item.linewidth, linestyle=item.linestyle,
+                label=item.label))
+        elif isinstance(item, Line):
+            ax.plot(item.xs, item.ys, color=item.color, linestyle=item.linestyle,
+                    linewidth=item.linewidth, marker=item.marker, markersize=item.markersize,
+                    alpha=item.alpha, label=item.label)
+        elif isinstance(item, Text):
+            bbox = None
+            if item.box is not None:
+                bbox = dict(boxstyle=f"round,pad={item.box_pad}", facecolor=item.box,
+                            alpha=item.box_alpha)
+            ax.text(item.x, item.y, item.text, fontsize=item.fontsize, color=item.color,
+                    ha=item.ha, va=item.va, rotation=item.rotation, weight=item.weight,
+                    bbox=bbox)
+        else:
+            raise TypeError(f"未知的图元类型：{type(item).__name__}")
+
+    if spec.xlim is not None:
+        ax.set_xlim(*spec.xlim)
+    if spec.ylim is not None:
+        ax.set_ylim(*spec.ylim)
+    if spec.equal:
+        ax.set_aspect("equal")
+    if spec.grid is not None:
+        ax.grid(True, linestyle=spec.grid, alpha=spec.grid_alpha)
+    if spec.title:
+        ax.set_title(spec.title, fontsize=spec.title_size, pad=10)
+    if spec.legend is not None:
+        ax.legend(loc=spec.legend)
+    if spec.frameless:
+        ax.set_xticks([])
+        ax.set_yticks([])
+        for side in ax.spines.values():
+            side.set_visible(False)
+
+
+def new_figure(nrows: int = 1, ncols: int = 1, figsize=None, **subplot_kw):
+    """创建不受 pyplot 管理的图像，参数与返回值同 plt.subplots。
+
+    Returns:
+        (fig, axes)：axes 的形状规则与 plt.subplots 相同。
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots(nrows, ncols, **subplot_kw)
+
+
+def draw_spec(spec: FigureSpec) -> Figure:
+    """按图纸绘制 Matplotlib 图像。
+
+    Args:
+        spec: 图形描述。
+
+    Returns:
+        Matplotlib 图像对象（不经过 pyplot，无需关闭）。
+    """
+    fig, axes = new_figure(1, len(spec.axes), figsize=spec.figsize, squeeze=False)
+    for ax, ax_spec in zip(axes[0], spec.axes):
+        _draw_axes(ax, ax_spec)
+    if len(spec.axes) > 1:
+        with MPL_LOCK:
+            fig.tight_layout()
+    return fig
+
+
+def encode_png(fig, dpi: int = 100) -> bytes:
+    """把图像编码为 PNG 字节串；由 pyplot 创建的图像会被关闭。"""
+    buf = io.BytesIO()
+    with MPL_LOCK:
+        fig.savefig(buf, format="png", bbox_inches="tight", dpi=dpi)
+    if getattr(fig.canvas, "manager", None) is not None:
+        import matplotlib.pyplot as plt
+        plt.close(fig)
+    return buf.getvalue()
+
+
+def spec_to_png(spec: FigureSpec) -> bytes:
+    """图纸 → PNG 字节串（不经过缓存）。"""
+    with MPL_LOCK:
+        return encode_png(draw_spec(spec), dpi=spec.dpi)
+
+
+def to_base64(png: bytes) -> str:
+    """PNG 字节串的 base64 编码，可拼成 data URI 交给 st.image。"""
+    return base64.b64encode(png).decode("utf-8")
@@ -15,6 +15,11 @@ from typing import Optional
 import matplotlib
 from matplotlib.font_manager import FontProperties
 
+from utils.metrics import FONT_RESOLUTION
+
+# 最近一次 setup_custom_font 的参数；渲染工作进程启动时据此重放字体设置
+_ACTIVE_SETUP: Optional[tuple] = None
+
 
 def setup_custom_font(font_path: str | Path,
                       fallback_families: Optional[list[str]] = None) -> str:
@@ -33,6 +38,8 @@ def setup_custom_font(font_path: str | Path,
     Returns:
       The font family name that Matplotlib will use.
     """
+    global _ACTIVE_SETUP
+    _ACTIVE_SETUP = (str(font_path), fallback_families)
     try:
         path = Path(font_path)
         if path.exists():
@@ -41,6 +48,7 @@ def setup_custom_font(font_path: str | Path,
             prop = FontProperties(fname=str(path))
             family = prop.get_name()
             matplotlib.rcParams["font.sans-serif"] = [family]
+            FONT_RESOLUTION.inc(outcome="custom")
         else:
             # Fall back to caller-provided families, then to generic sans-serif
             families = fallback_families or [
@@ -58,6 +66,7 @@ def setup_custom_font(font_path: str | Path,
                 except Exception:
                     continue
             matplotlib.rcParams["font.sans-serif"] = [chosen or "sans-serif"]
+            FONT_RESOLUTION.inc(outcome="fallback" if chosen else "generic")
         # Proper display for minus sign
         matplotlib.rcParams["axes.unicode_minus"] = False
         return matplotlib.rcParams["font.sans-serif"][0]
@@ -65,4 +74,14 @@ def setup_custom_font(font_path: str | Path,
         # Hard fallback: generic sans-serif, keep UI working even if font init fails
         matplotlib.rcParams["font.sans-serif"] = ["sans-serif"]
         matplotlib.rcParams["axes.unicode_minus"] = False
-        return "sans-serif"
\ No newline at end of file
+        FONT_RESOLUTION.inc(outcome="error")
+        return "sans-serif"
+
+
+def active_font_setup() -> Optional[tuple]:
+    """Return the arguments of the last setup_custom_font call, or None.
+
+    Fresh processes (e.g. render workers) start from Matplotlib defaults; they
+    replay these arguments to get the same font as the page that spawned them.
+    """
+    return _ACTIVE_SETUP
@@ -0,0 +1,688 @@
+"""
+illustrations.py
+
+各页面的静态与半静态插图（证明示意、应用示例等）。
+
+这些图原先写在页面脚本里，用 pyplot 画完立即编码成 base64；现在统一改成
+模块级函数，只负责画图并返回不经过 pyplot 的 Figure，编码与缓存交给
+utils.render。模块级函数可以被 pickle，因此能整批送到渲染工作进程里并发执行，
+页面里同时出现的几张图不必再一张接一张地串行绘制。
+"""
+from __future__ import annotations
+
+import numpy as np
+from matplotlib.patches import Polygon, Rectangle
+
+from utils.figures import new_figure
+
+
+def triple_distribution(stats, limit):
+    """绘制斜边分布直方图与本原勾股数 (a, b) 散点图。"""
+    fig, (ax1, ax2) = new_figure(1, 2, figsize=(14, 6))
+
+    edges = stats["edges"]
+    width = edges[1] - edges[0]
+    ax1.bar(edges[:-1], stats["counts"], width=width, align='edge',
+            color='skyblue', edgecolor='white', label='全部勾股数')
+    ax1.bar(edges[:-1], stats["prim_counts"], width=width, align='edge',
+            color='orange', alpha=0.8, edgecolor='white', label='本原勾股数')
+    ax1.set_xlabel('斜边 c')
+    ax1.set_ylabel('个数')
+    ax1.set_title(f"斜边 c ≤ {limit:,} 的勾股数分布", fontsize=14, pad=10)
+    ax1.legend()
+    ax1.grid(True, linestyle='--', alpha=0.3)
+
+    legs = stats["legs"]
+    ax2.scatter(legs[:, 0], legs[:, 1], s=0.5, color='green', alpha=0.5)
+    ax2.scatter(legs[:, 1], legs[:, 0], s=0.5, color='green', alpha=0.5)
+    ax2.set_xlim(0, limit)
+    ax2.set_ylim(0, limit)
+    ax2.set_aspect('equal')
+    ax2.set_xlabel('直角边 a')
+    ax2.set_ylabel('直角边 b')
+    ax2.set_title("本原勾股数 (a, b) 的分布", fontsize=14, pad=10)
+
+    fig.tight_layout()
+
+    return fig
+
+
+def pythagorean_proof(a, b):
+    """
+    绘制勾股定理证明图
+
+    参数:
+        a: 第一条直角边的长度
+        b: 第二条直角边的长度
+
+    返回:
+        Matplotlib 图像（不经过 pyplot，由调用方编码）
+    """
+    # 计算斜边长度
+    c = np.sqrt(a**2 + b**2)
+
+    fig, (ax1, ax2) = new_figure(1, 2, figsize=(14, 7))
+
+    # 第一个图：四个三角形围成的大正方形
+    ax1.set_xlim(-0.5, a+b+0.5)
+    ax1.set_ylim(-0.5, a+b+0.5)
+
+    # 绘制外部正方形
+    square = Rectangle((0, 0), a+b, a+b, fill=False, color='black', linewidth=2)
+    ax1.add_patch(square)
+
+    # 绘制四个全等的直角三角形（正确的顶点坐标）
+    triangle1 = Polygon([(0, 0), (a, 0), (0, b)], fill=True, color='skyblue', alpha=0.7, edgecolor='blue')
+    triangle2 = Polygon([(a, 0), (a+b, 0), (a+b, a)], fill=True, color='skyblue', alpha=0.7, edgecolor='blue')
+    triangle3 = Polygon([(a+b, a), (a+b, a+b), (b, a+b)], fill=True, color='skyblue', alpha=0.7, edgecolor='blue')
+    triangle4 = Polygon([(b, a+b), (0, a+b), (0, b)], fill=True, color='skyblue', alpha=0.7, edgecolor='blue')
+
+    ax1.add_patch(triangle1)
+    ax1.add_patch(triangle2)
+    ax1.add_patch(triangle3)
+    ax1.add_patch(triangle4)
+
+    # 绘制中间的正方形（边长为c的正方形）
+    inner_square = Polygon([(a, 0), (a+b, a), (b, a+b), (0, b)], fill=True, color='lightgreen', alpha=0.7, edgecolor='green')
+    ax1.add_patch(inner_square)
+
+    # 添加边长标签
+    ax1.text(a/2, -0.3, f'a = {a}', ha='center', fontsize=12, weight='bold')
+    ax1.text(-0.3, b/2, f'b = {b}', va='center', rotation=90, fontsize=12, weight='bold')
+    ax1.text(a+b+0.3, a/2, f'a = {a}', va='center', rotation=90, fontsize=12, weight='bold')
+    ax1.text((a+b)/2, a+b+0.3, f'b = {b}', ha='center', fontsize=12, weight='bold')
+
+    # 添加斜边标签
+    ax1.text((a+b/2)/2, (0+a/2)/2, f'c = {c:.1f}', ha='center', va='center', rotation=np.degrees(np.arctan(a/b)), fontsize=10, color='green', weight='bold')
+
+    # 添加面积标签
+    ax1.text((a+b/2)/2, (a+b+b/2)/2, f'$c^2$', ha='center', va='center', fontsize=14, color='green', weight='bold')
+
+    # 设置标题（统一使用全局字体设置）
+    ax1.set_title("勾股定理证明：四个三角形 + 中间正方形", fontsize=14, pad=10)
+
+    ax1.set_aspect('equal')
+    ax1.grid(True, linestyle='--', alpha=0.3)
+
+    # 第二个图：重新排列的面积分解
+    ax2.set_xlim(-0.5, a+b+0.5)
+    ax2.set_ylim(-0.5, a+b+0.5)
+
+    # 绘制外部正方形
+    square = Rectangle((0, 0), a+b, a+b, fill=False, color='black', linewidth=2)
+    ax2.add_patch(square)
+
+    # 绘制重新排列的区域：两个正方形和两个矩形
+    square_a = Rectangle((0, 0), a, a, fill=True, color='lightcoral', alpha=0.7, edgecolor='red')
+    square_b = Rectangle((a, a), b, b, fill=True, color='lightblue', alpha=0.7, edgecolor='blue')
+    rect1 = Rectangle((a, 0), b, a, fill=True, color='lightyellow', alpha=0.7, edgecolor='orange')
+    rect2 = Rectangle((0, a), a, b, fill=True, color='lightyellow', alpha=0.7, edgecolor='orange')
+
+    ax2.add_patch(square_a)
+    ax2.add_patch(square_b)
+    ax2.add_patch(rect1)
+    ax2.add_patch(rect2)
+
+    # 添加面积标签
+    ax2.text(a/2, a/2, f'$a^2$\n$= {a**2}$', ha='center', va='center', fontsize=12, weight='bold')
+    ax2.text(a+b/2, a+b/2, f'$b^2$\n$= {b**2}$', ha='center', va='center', fontsize=12, weight='bold')
+    ax2.text(a+b/2, a/2, f'$ab$\n$= {a*b}$', ha='center', va='center', fontsize=11, weight='bold')
+    ax2.text(a/2, a+b/2, f'$ab$\n$= {a*b}$', ha='center', va='center', fontsize=11, weight='bold')
+
+    # 添加边长标签
+    ax2.text(a/2, -0.3, f'a = {a}', ha='center', fontsize=12, weight='bold')
+    ax2.text(a+b/2, -0.3, f'b = {b}', ha='center', fontsize=12, weight='bold')
+    ax2.text(-0.3, a/2, f'a = {a}', va='center', rotation=90, fontsize=12, weight='bold')
+    ax2.text(-0.3, a+b/2, f'b = {b}', va='center', rotation=90, fontsize=12, weight='bold')
+
+    # 设置标题（统一使用全局字体设置）
+    ax2.set_title(f"面积重新排列：$(a+b)^2 = a^2 + 2ab + b^2 = {(a+b)**2}$", fontsize=14, pad=10)
+
+    ax2.set_aspect('equal')
+    ax2.grid(True, linestyle='--', alpha=0.3)
+
+    fig.tight_layout()
+
+    return fig
+
+
+def ladder_example():
+    """
+    绘制梯子示例图
+    """
+    fig, ax = new_figure(figsize=(8, 6))
+
+    # 绘制墙壁和地面
+    ax.plot([0, 0], [0, 5], 'k-', linewidth=3)  # 墙壁
+    ax.plot([0, 5], [0, 0], 'k-', linewidth=3)  # 地面
+
+    # 绘制梯子
+    ax.plot([0, 3], [4, 0], 'r-', linewidth=4)  # 梯子
+
+    # 添加标签
+    ax.text(1.5, -0.3, '3米', ha='center', fontsize=12)
+    ax.text(-0.3, 2, '4米', va='center', rotation=90, fontsize=12)
+    ax.text(1.8, 2.2, '5米', ha='center', rotation=-53, fontsize=12)
+
+    # 设置坐标轴范围和标题
+    ax.set_xlim(-0.5, 5)
+    ax.set_ylim(-0.5, 5)
+
+    # 设置标题（统一使用全局字体设置）
+    ax.set_title("梯子靠墙问题", fontsize=14, pad=10)
+
+    ax.set_aspect('equal')
+    ax.grid(True, linestyle='--', alpha=0.7)
+
+    return fig
+
+
+def triangle_area_formula():
+    """
+    绘制三角形面积公式示意图
+
+    返回:
+        Matplotlib 图像（不经过 pyplot，由调用方编码）
+    """
+    fig, ax = new_figure(figsize=(8, 6))
+
+    # 定义三角形顶点
+    base = 6
+    height = 4
+    vertices = [(0, 0), (base, 0), (base/2, height)]
+
+    # 绘制三角形
+    triangle = Polygon(vertices, fill=True, color='lightblue', alpha=0.7, edgecolor='blue', linewidth=2)
+    ax.add_patch(triangle)
+
+    # 绘制高线
+    ax.plot([base/2, base/2], [0, height], 'r--', linewidth=2, label='高')
+    ax.plot([0, base], [0, 0], 'g-', linewidth=3, label='底')
+
+    # 添加标注
+    ax.text(base/2, -0.3, f'底 = {base}', ha='center', fontsize=12, weight='bold')
+    ax.text(base/2 + 0.3, height/2, f'高 = {height}', va='center', fontsize=12, weight='bold', color='red')
+    ax.text(base/2, height + 0.3, f'面积 = {base} × {height} ÷ 2 = {base*height//2}', ha='center', fontsize=12, weight='bold', 
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.7))
+
+    # 添加顶点标签
+    ax.text(-0.3, -0.3, 'A', fontsize=12, weight='bold')
+    ax.text(base + 0.2, -0.3, 'B', fontsize=12, weight='bold')
+    ax.text(base/2 - 0.3, height + 0.1, 'C', fontsize=12, weight='bold')
+
+    # 设置坐标轴
+    ax.set_xlim(-1, base + 1)
+    ax.set_ylim(-1, height + 1)
+    ax.set_aspect('equal')
+
+    # 设置标题
+    ax.set_title("三角形面积公式示意图", fontsize=14, pad=10)
+    ax.grid(True, linestyle='--', alpha=0.3)
+    ax.legend()
+
+    return fig
+
+
+def equal_height_application():
+    """
+    绘制等高模型应用示例图
+
+    返回:
+        Matplotlib 图像（不经过 pyplot，由调用方编码）
+    """
+    fig, ax = new_figure(figsize=(10, 6))
+
+    # 定义三角形顶点
+    A = (4, 5)
+    B = (0, 0)
+    C = (8, 0)
+    D = (3.2, 0)  # BD:DC = 2:3，所以D点位置为 B + 2/5 * (C - B)
+
+    # 绘制三角形ABC
+    triangle_ABC = Polygon([A, B, C], fill=False, edgecolor='black', linewidth=2)
+    ax.add_patch(triangle_ABC)
+
+    # 绘制三角形ABD（蓝色）
+    triangle_ABD = Polygon([A, B, D], fill=True, color='lightblue', alpha=0.6, 
+                          edgecolor='blue', linewidth=2)
+    ax.add_patch(triangle_ABD)
+
+    # 绘制三角形ACD（红色）
+    triangle_ACD = Polygon([A, D, C], fill=True, color='lightcoral', alpha=0.6, 
+                          edgecolor='red', linewidth=2)
+    ax.add_patch(triangle_ACD)
+
+    # 绘制高线
+    ax.plot([A[0], A[0]], [A[1], 0], 'g--', linewidth=2, label='共同高')
+
+    # 标记点
+    ax.plot(*A, 'ko', markersize=8)
+    ax.plot(*B, 'ko', markersize=8)
+    ax.plot(*C, 'ko', markersize=8)
+    ax.plot(*D, 'ro', markersize=8)
+
+    # 添加标签
+    ax.text(A[0] - 0.2, A[1] + 0.2, 'A', fontsize=14, weight='bold')
+    ax.text(B[0] - 0.3, B[1] - 0.3, 'B', fontsize=14, weight='bold')
+    ax.text(C[0] + 0.2, C[1] - 0.3, 'C', fontsize=14, weight='bold')
+    ax.text(D[0], D[1] - 0.3, 'D', fontsize=14, weight='bold', color='red')
+
+    # 标注线段长度
+    ax.text((B[0] + D[0])/2, -0.5, 'BD = 2', ha='center', fontsize=12, weight='bold', color='blue')
+    ax.text((D[0] + C[0])/2, -0.5, 'DC = 3', ha='center', fontsize=12, weight='bold', color='red')
+
+    # 标注面积
+    ax.text((A[0] + B[0] + D[0])/3, (A[1] + B[1] + D[1])/3, '$S_1$', 
+            ha='center', va='center', fontsize=14, weight='bold', color='blue')
+    ax.text((A[0] + D[0] + C[0])/3, (A[1] + D[1] + C[1])/3, '$S_2$', 
+            ha='center', va='center', fontsize=14, weight='bold', color='red')
+
+    # 添加结论
+    ax.text(4, -1.5, '$S_1 : S_2 = BD : DC = 2 : 3$', ha='center', fontsize=14, weight='bold',
+            bbox=dict(boxstyle="round,pad=0.5", facecolor="yellow", alpha=0.8))
+
+    # 设置坐标轴
+    ax.set_xlim(-1, 9)
+    ax.set_ylim(-2, 6)
+    ax.set_aspect('equal')
+
+    # 设置标题（统一使用全局字体设置）
+    ax.set_title("等高模型应用示例：求三角形面积比", fontsize=14, pad=10)
+
+    ax.grid(True, linestyle='--', alpha=0.3)
+    ax.legend()
+
+    return fig
+
+
+def half_model_concept():
+    """
+    绘制一半模型基本概念示意图
+
+    返回:
+        Matplotlib 图像（不经过 pyplot，由调用方编码）
+    """
+    fig, (ax1, ax2) = new_figure(1, 2, figsize=(14, 6))
+
+    # 左图：等底等高的平行四边形
+    base = 6
+    height = 4
+
+    # 第一个平行四边形（长方形）
+    rect1 = Rectangle((0, 0), base, height, fill=True, color='lightblue', 
+                     alpha=0.7, edgecolor='blue', linewidth=2)
+    ax1.add_patch(rect1)
+
+    # 第二个平行四边形（斜平行四边形）
+    offset = 8
+    parallelogram = Polygon([(offset, 0), (offset + base, 0), 
+                           (offset + base + 1.5, height), (offset + 1.5, height)], 
+                          fill=True, color='lightcoral', alpha=0.7, 
+                          edgecolor='red', linewidth=2)
+    ax1.add_patch(parallelogram)
+
+    # 添加标注
+    ax1.text(base/2, -0.5, f'底 = {base}', ha='center', fontsize=12, weight='bold', color='blue')
+    ax1.text(-0.5, height/2, f'高 = {height}', va='center', fontsize=12, weight='bold', color='blue', rotation=90)
+
+    ax1.text(offset + base/2 + 0.75, -0.5, f'底 = {base}', ha='center', fontsize=12, weight='bold', color='red')
+    ax1.text(offset - 0.5, height/2, f'高 = {height}', va='center', fontsize=12, weight='bold', color='red', rotation=90)
+
+    # 面积标注
+    area = base * height
+    ax1.text(base/2, height/2, f'面积 = {area}', ha='center', va='center', 
+            fontsize=12, weight='bold', color='blue',
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8))
+    ax1.text(offset + base/2 + 0.75, height/2, f'面积 = {area}', ha='center', va='center', 
+            fontsize=12, weight='bold', color='red',
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8))
+
+    ax1.set_xlim(-1, offset + base + 3)
+    ax1.set_ylim(-1, height + 1)
+    ax1.set_aspect('equal')
+    ax1.set_title("性质1：等底等高的平行四边形面积相等", fontsize=14, pad=10)
+    ax1.grid(True, linestyle='--', alpha=0.3)
+
+    # 右图：三角形与平行四边形的关系
+    # 平行四边形
+    rect2 = Rectangle((0, 0), base, height, fill=True, color='lightyellow', 
+                     alpha=0.5, edgecolor='orange', linewidth=2)
+    ax2.add_patch(rect2)
+
+    # 三角形
+    triangle = Polygon([(0, 0), (base, 0), (base/2, height)], 
+                      fill=True, color='lightgreen', alpha=0.8, 
+                      edgecolor='green', linewidth=3)
+    ax2.add_patch(triangle)
+
+    # 添加标注
+    ax2.text(base/2, -0.5, f'底 = {base}', ha='center', fontsize=12, weight='bold')
+    ax2.text(-0.5, height/2, f'高 = {height}', va='center', fontsize=12, weight='bold', rotation=90)
+
+    # 面积标注
+    triangle_area = base * height / 2
+    parallelogram_area = base * height
+
+    ax2.text(base/4, height/3, f'三角形\n面积 = {triangle_area}', ha='center', va='center', 
+            fontsize=11, weight='bold', color='green',
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.9))
+    ax2.text(3*base/4, height/3, f'平行四边形\n面积 = {parallelogram_area}', ha='center', va='center', 
+            fontsize=11, weight='bold', color='orange',
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.9))
+
+    # 关系说明
+    ax2.text(base/2, height + 0.5, f'{triangle_area} = {parallelogram_area} ÷ 2', 
+            ha='center', fontsize=12, weight='bold', color='purple',
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.8))
+
+    ax2.set_xlim(-1, base + 1)
+    ax2.set_ylim(-1, height + 1.5)
+    ax2.set_aspect('equal')
+    ax2.set_title("性质2：三角形面积 = 平行四边形面积 ÷ 2", fontsize=14, pad=10)
+    ax2.grid(True, linestyle='--', alpha=0.3)
+    ax2.legend()
+    ax2.set_title("性质2：三角形面积 = 平行四边形面积 ÷ 2", fontsize=14, pad=10)
+    ax2.grid(True, linestyle='--', alpha=0.3)
+
+    fig.tight_layout()
+
+    return fig
+
+
+def half_model_application():
+    """
+    绘制一半模型应用示例图
+
+    返回:
+        Matplotlib 图像（不经过 pyplot，由调用方编码）
+    """
+    fig, ax = new_figure(figsize=(12, 8))
+
+    # 定义平行四边形顶点
+    A = (0, 0)
+    B = (6, 0)
+    C = (8, 4)
+    D = (2, 4)
+
+    # E是BC中点，F是AD中点
+    E = ((B[0] + C[0])/2, (B[1] + C[1])/2)
+    F = ((A[0] + D[0])/2, (A[1] + D[1])/2)
+
+    # 绘制平行四边形ABCD
+    parallelogram = Polygon([A, B, C, D], fill=True, color='lightblue', 
+                           alpha=0.3, edgecolor='blue', linewidth=2)
+    ax.add_patch(parallelogram)
+
+    # 绘制三角形AEF
+    triangle_AEF = Polygon([A, E, F], fill=True, color='lightcoral', 
+                          alpha=0.7, edgecolor='red', linewidth=3)
+    ax.add_patch(triangle_AEF)
+
+    # 标记点
+    points = {'A': A, 'B': B, 'C': C, 'D': D, 'E': E, 'F': F}
+    for name, point in points.items():
+        ax.plot(*point, 'ko', markersize=8)
+        if name in ['E', 'F']:
+            ax.text(point[0], point[1] + 0.3, name, ha='center', fontsize=14, 
+                   weight='bold', color='red')
+        else:
+            ax.text(point[0] - 0.3, point[1] - 0.3, name, ha='center', fontsize=14, 
+                   weight='bold', color='blue')
+
+    # 绘制辅助线
+    ax.plot([A[0], E[0]], [A[1], E[1]], 'r-', linewidth=2, alpha=0.8)
+    ax.plot([E[0], F[0]], [E[1], F[1]], 'r-', linewidth=2, alpha=0.8)
+    ax.plot([F[0], A[0]], [F[1], A[1]], 'r-', linewidth=2, alpha=0.8)
+
+    # 标注中点
+    ax.text((B[0] + E[0])/2, (B[1] + E[1])/2 - 0.3, 'BE = EC', ha='center', 
+           fontsize=10, color='green', weight='bold')
+    ax.text((A[0] + F[0])/2, (A[1] + F[1])/2 + 0.3, 'AF = FD', ha='center', 
+           fontsize=10, color='green', weight='bold')
+
+    # 面积标注
+    # 平行四边形面积
+    para_center_x = (A[0] + B[0] + C[0] + D[0]) / 4
+    para_center_y = (A[1] + B[1] + C[1] + D[1]) / 4
+    ax.text(para_center_x + 1, para_center_y, '平行四边形ABCD', ha='center', va='center', 
+           fontsize=12, weight='bold', color='blue',
+           bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue", alpha=0.8))
+
+    # 三角形面积
+    tri_center_x = (A[0] + E[0] + F[0]) / 3
+    tri_center_y = (A[1] + E[1] + F[1]) / 3
+    ax.text(tri_center_x, tri_center_y, '△AEF', ha='center', va='center', 
+           fontsize=12, weight='bold', color='red',
+           bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.9))
+
+    # 设置坐标轴
+    ax.set_xlim(-1, 9)
+    ax.set_ylim(-1, 5)
+    ax.set_aspect('equal')
+    ax.set_title("应用示例：利用一半模型求面积比", fontsize=16, pad=15)
+    ax.grid(True, linestyle='--', alpha=0.3)
+
+    # 添加解题步骤
+    solution_text = """
+解题步骤：
+1. 设平行四边形ABCD的面积为S
+2. 由于E、F分别是中点，可以利用一半模型
+3. 通过面积分割和组合计算得出结果
+4. △AEF的面积 = S/4
+    """
+
+    ax.text(9.5, 2, solution_text, fontsize=11, va='center',
+           bbox=dict(boxstyle="round,pad=0.5", facecolor="lightyellow", alpha=0.9))
+
+    return fig
+
+
+def half_model_proof(base, height, method):
+    """
+    绘制一半模型的动态证明图
+
+    参数:
+        base: 底边长度
+        height: 高度
+        method: 证明方法
+
+    返回:
+        Matplotlib 图像（不经过 pyplot，由调用方编码）
+    """
+    fig, ax = new_figure(figsize=(10, 8))
+
+    if method == "拼接法证明":
+        # 绘制两个相同的三角形拼接成平行四边形
+        triangle1 = Polygon([(0, 0), (base, 0), (base/2, height)], 
+                           fill=True, color='lightgreen', alpha=0.7, 
+                           edgecolor='green', linewidth=2)
+        triangle2 = Polygon([(base/2, height), (base, 0), (base + base/2, height)], 
+                           fill=True, color='lightcoral', alpha=0.7, 
+                           edgecolor='red', linewidth=2)
+
+        ax.add_patch(triangle1)
+        ax.add_patch(triangle2)
+
+        # 标注
+        ax.text(base/4, height/3, '三角形1', ha='center', va='center', 
+               fontsize=11, weight='bold', color='green')
+        ax.text(3*base/4 + base/4, height/3, '三角形2', ha='center', va='center', 
+               fontsize=11, weight='bold', color='red')
+
+        ax.text(base/2 + base/4, height + 0.3, 
+               f'两个相同三角形拼成平行四边形\n面积 = 2 × {base*height/2} = {base*height}', 
+               ha='center', fontsize=12, weight='bold',
+               bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.8))
+
+        ax.set_xlim(-0.5, base + base/2 + 0.5)
+
+    elif method == "分割法证明":
+        # 绘制平行四边形，用对角线分割
+        rect = Rectangle((0, 0), base, height, fill=True, color='lightyellow', 
+                       alpha=0.5, edgecolor='orange', linewidth=2)
+        ax.add_patch(rect)
+
+        # 绘制对角线
+        ax.plot([0, base], [0, height], 'k--', linewidth=2, label='对角线')
+
+        # 标注两个三角形
+        ax.text(base/3, height/3, '△1', ha='center', va='center', 
+               fontsize=14, weight='bold', color='blue')
+        ax.text(2*base/3, 2*height/3, '△2', ha='center', va='center', 
+               fontsize=14, weight='bold', color='red')
+
+        ax.text(base/2, height + 0.3, 
+               f'对角线将平行四边形分成两个相等的三角形\n每个三角形面积 = {base*height} ÷ 2 = {base*height/2}', 
+               ha='center', fontsize=12, weight='bold',
+               bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.8))
+
+        ax.set_xlim(-0.5, base + 0.5)
+
+    else:  # 平移法证明
+        # 绘制三角形和通过平移得到的平行四边形
+        triangle = Polygon([(0, 0), (base, 0), (base/3, height)], 
+                          fill=True, color='lightgreen', alpha=0.7, 
+                          edgecolor='green', linewidth=2)
+        ax.add_patch(triangle)
+
+        # 平移后的三角形（虚线）
+        triangle_moved = Polygon([(base/3, height), (base + base/3, height), (2*base/3, 0)], 
+                               fill=False, edgecolor='red', linewidth=2, linestyle='--')
+        ax.add_patch(triangle_moved)
+
+        # 形成的平行四边形轮廓
+        parallelogram_outline = Polygon([(0, 0), (base, 0), (base + base/3, height), (base/3, height)], 
+                                      fill=False, edgecolor='blue', linewidth=3)
+        ax.add_patch(parallelogram_outline)
+
+        # 箭头表示平移
+        ax.annotate('', xy=(2*base/3, height/2), xytext=(base/6, height/2),
+                   arrowprops=dict(arrowstyle='->', lw=2, color='purple'))
+        ax.text(base/2, height/2 + 0.3, '平移', ha='center', fontsize=12, 
+               weight='bold', color='purple')
+
+        ax.text(base/2 + base/6, height + 0.3, 
+               f'通过平移构造平行四边形\n三角形面积 = 平行四边形面积 ÷ 2', 
+               ha='center', fontsize=12, weight='bold',
+               bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.8))
+
+        ax.set_xlim(-0.5, base + base/3 + 0.5)
+
+    ax.set_ylim(-0.5, height + 1)
+    ax.set_aspect('equal')
+    ax.set_title(f"{method}演示", fontsize=14, pad=10)
+    ax.grid(True, linestyle='--', alpha=0.3)
+
+    if method == "分割法证明":
+        ax.legend()
+
+    return fig
+
+
+def routh_division(points):
+    """燕尾模型页：三条线段把三角形分成 7 块，中间的三角形涂色。
+
+    Args:
+        points: 引擎给出的 (点名, (x, y)) 对组成的元组（可哈希，直接作缓存键），
+            含 A、B、C、D、E、F 与中间三角形的 P、Q、R。
+    """
+    points = dict(points)
+    fig, ax = new_figure(figsize=(6, 5))
+    ax.add_patch(Polygon([points["A"], points["B"], points["C"]], fill=False, ec='k', lw=2))
+    # 用三条线段把三角形切开，再用颜色标出中间的三角形
+    for p_name, q_name in (("A", "D"), ("B", "E"), ("C", "F")):
+        P, Q = points[p_name], points[q_name]
+        ax.plot([P[0], Q[0]], [P[1], Q[1]], 'k-', lw=1.2)
+    ax.add_patch(Polygon([points["P"], points["Q"], points["R"]], fc='#FDE68A', ec='orange',
+                         alpha=0.9))
+    # 引擎内部的点名：D∈BC、E∈CA、F∈AB；页面上分别称为 F、E、G
+    for name, label in (("A", "A"), ("B", "B"), ("C", "C"), ("D", "F"), ("E", "E"), ("F", "G")):
+        P = points[name]
+        ax.plot(P[0], P[1], 'ko', ms=5)
+        ax.text(P[0] + 0.02, P[1] + 0.02, label, fontsize=10)
+    ax.set_aspect('equal')
+    ax.set_xlim(-0.05, 1.05)
+    ax.set_ylim(-0.05, 1.05)
+    ax.set_title("三条线把三角形分成 7 块")
+    return fig
+
+
+def bird_head_proof():
+    """鸟头模型推导示意图：共用顶点 A 的 △ABC 与 △ADE，以及两条高 h₁、h₂。"""
+    fig, ax = new_figure(figsize=(10, 7))
+
+    A, B, C = np.array([0, 0]), np.array([10, 0]), np.array([4, 6])
+    D, E = np.array([6, 0]), np.array([2, 3])  # D 在 AB 上，E 在 AC 上
+
+    ax.add_patch(Polygon([A, B, C], facecolor='skyblue', alpha=0.5, label='△ABC (大鸟)'))
+    ax.plot(*zip(A, B, C, A), color='blue', marker='o')
+    ax.add_patch(Polygon([A, D, E], facecolor='salmon', alpha=0.7, label='△ADE (小鸟)'))
+    ax.plot(*zip(A, D, E, A), color='red', marker='o')
+
+    # 标注顶点
+    ax.text(A[0] - 0.5, A[1] - 0.5, 'A (鸟嘴)', fontsize=12)
+    ax.text(B[0] + 0.2, B[1], 'B', fontsize=12)
+    ax.text(C[0], C[1] + 0.3, 'C', fontsize=12)
+    ax.text(D[0] - 0.5, D[1] - 0.5, 'D', fontsize=12)
+    ax.text(E[0] - 0.5, E[1] + 0.3, 'E', fontsize=12)
+
+    # h₁：从 E 到 AB 的垂线；h₂：从 C 到 AB 的垂线
+    F = np.array([E[0], 0])
+    ax.plot([E[0], F[0]], [E[1], F[1]], 'g--', label='高 h₁')
+    ax.text(F[0] + 0.1, F[1] + 1.5, 'h₁', color='green', fontsize=12)
+    ax.text(F[0], F[1] - 0.5, 'F', fontsize=12)
+    G = np.array([C[0], 0])
+    ax.plot([C[0], G[0]], [C[1], G[1]], 'm--', label='高 h₂')
+    ax.text(G[0] + 0.1, G[1] + 3, 'h₂', color='purple', fontsize=12)
+    ax.text(G[0], G[1] - 0.5, 'G', fontsize=12)
+
+    ax.set_aspect('equal', adjustable='box')
+    ax.set_xlim(-1, 11)
+    ax.set_ylim(-1, 7)
+    ax.grid(True, linestyle=':', alpha=0.6)
+    ax.set_title("鸟头模型推导示意图", fontsize=16)
+    ax.legend()
+    return fig
+
+
+def bird_head_challenge(a, b, c, d):
+    """鸟头模型挑战题的图：夹角 60° 的大三角形（两边 a、b）与小三角形（两边 c、d）。"""
+    fig, ax = new_figure(figsize=(8, 6))
+
+    angle = np.radians(60)
+    x = [0, a, b * np.cos(angle), 0]
+    y = [0, 0, b * np.sin(angle), 0]
+    ax.fill(x, y, alpha=0.3, color='lightblue')
+    ax.fill([0, c, d * np.cos(angle), 0], [0, 0, d * np.sin(angle), 0], alpha=0.7,
+            color='lightcoral')
+
+    ax.set_xlim(-0.5, max(x) + 0.5)
+    ax.set_ylim(-0.5, max(y) + 0.5)
+    ax.set_aspect('equal')
+    ax.grid(True, alpha=0.3)
+    ax.set_title("🔍 观察这个图形")
+    return fig
+
+
+def similar_group_shapes(shapes, counts, limit=9):
+    """相似三角形分组页：把每组的代表形状画在一张图里（统一缩放到最长边为 1）。"""
+    n = min(len(shapes), limit)
+    cols = 3
+    rows = max((n + cols - 1) // cols, 1)
+    fig, axes = new_figure(rows, cols, figsize=(9, 3 * rows), squeeze=False)
+    for i, ax in enumerate(axes.flat):
+        ax.axis('off')
+        if i >= n:
+            continue
+        r0, r1, r2 = shapes[i]
+        # 最长边放在 x 轴上，用余弦定理求第三个顶点
+        x = (r2 ** 2 + r1 ** 2 - r0 ** 2) / (2 * r2)
+        y = np.sqrt(max(r1 ** 2 - x ** 2, 0.0))
+        ax.add_patch(Polygon([(0, 0), (r2, 0), (x, y)], facecolor='skyblue', edgecolor='blue',
+                             alpha=0.7))
+        ax.set_xlim(-0.1, 1.1)
+        ax.set_ylim(-0.1, 1.0)
+        ax.set_aspect('equal')
+        ax.set_title(f"第 {i} 组：{counts[i]} 个", fontsize=11)
+    fig.tight_layout()
+    return fig
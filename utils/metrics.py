@@ -0,0 +1,260 @@
+"""
+metrics.py
+
+进程级运行指标，按 Prometheus 文本格式在本机端口上暴露，供监控抓取。
+
+- 计数器（Counter）与直方图（Histogram）在业务代码里直接累加：一次字典查找加一次
+  加法，持有一把很短的锁，不抓取时几乎没有开销；
+- 读数类指标（缓存命中数、会话数、未关闭的图像数等）用 gauge() 注册回调，
+  只在被抓取时才计算。
+
+指标名统一以 p2j_ 开头，计数器以 _total 结尾、耗时以 _seconds 结尾、大小以 _bytes
+结尾；名称和标签一经发布就不再改动，告警规则和容量看板都依赖它们。
+
+环境变量：
+    P2J_METRICS_PORT  指标端口，默认 9464；设为 0 关闭
+    P2J_METRICS_ADDR  监听地址，默认 127.0.0.1（只对本机开放）
+
+HTTP 服务在第一次重跑时（track_rerun 调用 start_metrics_server）以守护线程启动，
+同一进程只启动一次；端口被占用时记录警告后放弃，不影响页面。
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 9464
+
+# 耗时直方图的默认分桶（秒），覆盖从几毫秒的缓存命中到数秒的重型重跑
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 字节数直方图的默认分桶：4 KB 到 4 MB，每档 ×4
+SIZE_BUCKETS = tuple(4096 * 4 ** i for i in range(6))
+
+GaugeValue = Union[float, dict]
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """只增不减的计数器，可带标签。"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """累加 amount；标签必须与 labelnames 一一对应。"""
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        """当前值（主要用于页面内展示和调试）。"""
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}"
+                for k, v in items]
+
+
+class Histogram:
+    """累计分桶直方图，附带 _sum 与 _count。"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 buckets: tuple = TIME_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 标签 → [各桶计数..., 总和]；最后一个桶是 +Inf
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        """记录一个观测值。"""
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[index] += 1
+            row[-1] += value
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = []
+        for key, row in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), row[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} "
+                             f"{cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(row[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """抓取时才计算的读数。
+
+    回调返回一个数，或 {标签值元组: 数} 的字典（标签名由 labelnames 给出）。
+    """
+
+    def __init__(self, name: str, documentation: str, func: Callable[[], GaugeValue],
+                 labelnames: tuple = (), kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.func = func
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+
+    def collect(self) -> list[str]:
+        try:
+            result = self.func()
+        except Exception:  # 读数失败不影响其他指标
+            logger.exception("指标 %s 读数失败", self.name)
+            return []
+        if not isinstance(result, dict):
+            result = {(): result}
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}"
+                for k, v in sorted(result.items())]
+
+
+class MetricsRegistry:
+    """指标登记处；同名指标只登记一次，重复登记返回已有对象。"""
+
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (),
+                  buckets: tuple = TIME_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, func: Callable[[], GaugeValue],
+              labelnames: tuple = (), kind: str = "gauge") -> Gauge:
+        """登记回调读数。kind 可设为 "counter"，用于暴露别处维护的累计值。"""
+        return self._register(Gauge(name, documentation, func, labelnames, kind))
+
+    def render(self) -> str:
+        """全部指标的 Prometheus 文本格式。"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# 业务代码直接使用的指标
+RERUNS = REGISTRY.counter("p2j_reruns_total", "页面重跑次数", ("page",))
+RERUN_SECONDS = REGISTRY.histogram("p2j_rerun_seconds", "页面一次重跑的耗时", ("page",))
+RENDER_SECONDS = REGISTRY.histogram("p2j_render_seconds", "单张图的绘制与编码耗时（不含排队）",
+                                    ("figure",))
+ENCODE_BYTES = REGISTRY.histogram("p2j_encode_bytes", "编码后的 PNG 字节数", ("figure",),
+                                  buckets=SIZE_BUCKETS)
+RENDER_ERRORS = REGISTRY.counter("p2j_render_errors_total", "渲染失败次数", ("figure",))
+FONT_RESOLUTION = REGISTRY.counter("p2j_font_resolution_total",
+                                   "字体初始化结果：custom 项目字体、fallback 候选字体、"
+                                   "generic 通用无衬线、error 初始化异常", ("outcome",))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802 (BaseHTTPRequestHandler 的约定)
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 抓取很频繁，不写访问日志
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+_server_attempted = False
+
+
+def start_metrics_server(port: Optional[int] = None, addr: Optional[str] = None
+                         ) -> Optional[ThreadingHTTPServer]:
+    """启动指标 HTTP 服务（幂等，进程内只尝试一次）。
+
+    Args:
+        port: 端口，缺省读 P2J_METRICS_PORT；为 0 时不启动。
+        addr: 监听地址，缺省读 P2J_METRICS_ADDR。
+
+    Returns:
+        正在运行的服务；未启动或启动失败时为 None。
+    """
+    global _server, _server_attempted
+    if _server_attempted:
+        return _server
+    with _server_lock:
+        if _server_attempted:
+            return _server
+        _server_attempted = True
+        port = int(os.environ.get("P2J_METRICS_PORT", DEFAULT_PORT)) if port is None else port
+        addr = os.environ.get("P2J_METRICS_ADDR", "127.0.0.1") if addr is None else addr
+        if not port:
+            return None
+        try:
+            server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+        except OSError as exc:
+            logger.warning("指标端口 %s:%s 无法监听（%s），不暴露指标", addr, port, exc)
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="p2j-metrics", daemon=True).start()
+        _server = server
+        return server
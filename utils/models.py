@@ -0,0 +1,661 @@
+"""
+models.py
+
+模型注册表：每个专题声明自己的参数表、纯计算函数和图纸（FigureSpec）构造函数。
+
+    参数 ──normalize──▶ 规范化参数 ──compute──▶ 结果字典 ──figure──▶ FigureSpec
+
+页面只负责读取控件、调用模型、展示结果；缓存、预渲染、参数扫描和基准测试
+都可以通过 get_model(name) 用同一条路径作用于任意模型：
+
+    model = get_model("equal_height")
+    result = model.evaluate(base1=4, base2=6, height=3)
+    spec = model.figure_spec(base1=4, base2=6, height=3)
+
+计算函数只接受规范化后的关键字参数、返回字典，不读写任何全局状态；
+图纸构造函数接受 (参数, 结果) 两个字典，返回可哈希的 FigureSpec。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping, Optional
+
+import numpy as np
+
+from utils.butterfly import WING_NAMES, diagonal_intersection, quad_from_wings, \
+    solve_missing_wing, wing_label_points
+from utils.cevians import DEFAULT_TRIANGLE, swallowtail_areas
+from utils.clipping import intersection, intersection_area
+from utils.figures import AxesSpec, FigureSpec, Line, Shape, Text, line, marker, \
+    points, polyline
+from utils.pythagorean import integer_hypotenuse
+from utils.similarity import (ANGLE_CLASSES, SIDE_CLASSES, angles_from_sides, classify_triangles,
+                              side_lengths)
+
+
+@dataclass(frozen=True)
+class ParamSpec:
+    """一个模型参数的声明。
+
+    Attributes:
+        name: 参数名（即计算函数的关键字参数名）。
+        label: 控件上显示的文字。
+        default: 默认值，其类型决定参数类型（bool/int/float/str）。
+        min: 最小值；超出范围的输入会被截断。
+        max: 最大值。
+        step: 滑块步长。
+        options: 可选值；非空时参数为枚举类型。
+        widget: 控件类型，"auto" 表示按参数类型自动选择，
+            也可指定为 "slider"、"number"、"select"、"checkbox"。
+    """
+    name: str
+    label: str
+    default: Any
+    min: Optional[float] = None
+    max: Optional[float] = None
+    step: Optional[float] = None
+    options: tuple = ()
+    widget: str = "auto"
+
+    @property
+    def kind(self) -> str:
+        """参数类型："choice"、"bool"、"int"、"float" 或 "text"。"""
+        if self.options:
+            return "choice"
+        if isinstance(self.default, bool):
+            return "bool"
+        if isinstance(self.default, int):
+            return "int"
+        if isinstance(self.default, float):
+            return "float"
+        return "text"
+
+    def coerce(self, value):
+        """把输入值转换为参数类型并截断到取值范围。
+
+        Raises:
+            ValueError: 枚举参数的取值不在 options 中，或数值无法转换。
+        """
+        kind = self.kind
+        if kind == "choice":
+            if value not in self.options:
+                raise ValueError(f"参数 {self.name} 的取值 {value!r} 不在 {self.options} 中")
+            return value
+        if kind == "bool":
+            return bool(value)
+        if kind == "text":
+            return str(value)
+        value = float(value)
+        if self.min is not None:
+            value = max(value, self.min)
+        if self.max is not None:
+            value = min(value, self.max)
+        # 滑块步长带来的 0.41000000000000003 之类的尾差会让缓存键各不相同
+        return int(round(value)) if kind == "int" else round(value, 10)
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """一个专题模型。
+
+    Attributes:
+        name: 注册名（英文，作为缓存键的一部分）。
+        title: 中文标题。
+        page: 所在页面文件名。
+        params: 参数表，顺序即页面控件的顺序。
+        compute: 纯计算函数，关键字参数 → 结果字典。
+        figure: 图纸构造函数，(参数, 结果) → FigureSpec。
+        description: 一句话说明。
+    """
+    name: str
+    title: str
+    page: str
+    params: tuple
+    compute: Callable[..., dict]
+    figure: Callable[[dict, dict], FigureSpec]
+    description: str = ""
+
+    def param(self, name: str) -> ParamSpec:
+        """按名字取参数声明。"""
+        for p in self.params:
+            if p.name == name:
+                return p
+        raise KeyError(f"模型 {self.name} 没有参数 {name}")
+
+    def defaults(self) -> dict:
+        """全部参数的默认值。"""
+        return {p.name: p.default for p in self.params}
+
+    def normalize(self, params: Mapping) -> dict:
+        """补全缺省参数并逐个规范化。
+
+        Raises:
+            ValueError: 出现了参数表中没有的参数。
+        """
+        unknown = set(params) - {p.name for p in self.params}
+        if unknown:
+            raise ValueError(f"模型 {self.name} 不接受参数：{', '.join(sorted(unknown))}")
+        return {p.name: p.coerce(params.get(p.name, p.default)) for p in self.params}
+
+    def evaluate(self, **params) -> dict:
+        """规范化参数后调用计算函数。"""
+        return self.compute(**self.normalize(params))
+
+    def figure_spec(self, **params) -> FigureSpec:
+        """规范化参数、计算并构造图纸。"""
+        params = self.normalize(params)
+        return self.figure(params, self.compute(**params))
+
+
+_REGISTRY: dict[str, ModelSpec] = {}
+
+
+def register(model: ModelSpec) -> ModelSpec:
+    """注册一个模型；重名时报错。"""
+    if model.name in _REGISTRY:
+        raise ValueError(f"模型 {model.name} 已注册")
+    _REGISTRY[model.name] = model
+    return model
+
+
+def get_model(name: str) -> ModelSpec:
+    """按注册名取模型。"""
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"未注册的模型：{name}（可用：{', '.join(_REGISTRY)}）") from None
+
+
+def list_models(page: Optional[str] = None) -> list[ModelSpec]:
+    """列出全部模型，或某个页面上的模型（按注册顺序）。"""
+    return [m for m in _REGISTRY.values() if page is None or m.page == page]
+
+
+# --- 三角形分类 ---
+
+def _triangle_compute(x1, y1, x2, y2, x3, y3, color, title) -> dict:
+    vertices = np.array([[x1, y1], [x2, y2], [x3, y3]])
+    sides = side_lengths(vertices)
+    by_angle, by_side = classify_triangles(sides)
+    return {"vertices": vertices, "sides": sides[0], "angles": angles_from_sides(sides)[0],
+            "by_angle": ANGLE_CLASSES[by_angle[0]] if by_angle[0] >= 0 else "不能构成三角形",
+            "by_side": SIDE_CLASSES[by_side[0]] if by_side[0] >= 0 else "不能构成三角形"}
+
+
+def _triangle_figure(params: dict, result: dict) -> FigureSpec:
+    v = points(result["vertices"])
+    items = [Shape(v, facecolor=params["color"], edgecolor=params["color"], alpha=0.6),
+             polyline(v, closed=True, color="black", linewidth=2)]
+    items += [Text(x, y, f"P{i + 1}") for i, (x, y) in enumerate(v)]
+    xs, ys = [p[0] for p in v], [p[1] for p in v]
+    return FigureSpec(figsize=(4, 4), axes=(AxesSpec(
+        items=tuple(items), title=params["title"],
+        xlim=(min(xs) - 0.5, max(xs) + 0.5), ylim=(min(ys) - 0.5, max(ys) + 0.5),
+        grid_alpha=0.7),))
+
+
+register(ModelSpec(
+    name="triangle", title="三角形分类", page="1_三角形分类.py",
+    params=(
+        ParamSpec("x1", "P1 横坐标", 0.0, -10.0, 10.0, 0.1),
+        ParamSpec("y1", "P1 纵坐标", 0.0, -10.0, 10.0, 0.1),
+        ParamSpec("x2", "P2 横坐标", 2.0, -10.0, 10.0, 0.1),
+        ParamSpec("y2", "P2 纵坐标", 3.0, -10.0, 10.0, 0.1),
+        ParamSpec("x3", "P3 横坐标", 4.0, -10.0, 10.0, 0.1),
+        ParamSpec("y3", "P3 纵坐标", 1.0, -10.0, 10.0, 0.1),
+        ParamSpec("color", "填充颜色", "skyblue",
+                  options=("skyblue", "lightgreen", "lightsalmon", "lightpink")),
+        ParamSpec("title", "标题", "三角形"),
+    ),
+    compute=_triangle_compute, figure=_triangle_figure,
+    description="给定三个顶点，按角和按边给三角形分类。",
+))
+
+
+# --- 勾股定理 ---
+
+def _pythagorean_compute(a, b) -> dict:
+    return {"c": float(np.hypot(a, b)), "c_int": integer_hypotenuse(a, b)}
+
+
+def _pythagorean_figure(params: dict, result: dict) -> FigureSpec:
+    a, b, c = params["a"], params["b"], result["c"]
+    items = (
+        Shape(points([(0, 0), (a, 0), (0, b)]), facecolor="skyblue", edgecolor="skyblue",
+              alpha=0.6),
+        line((0, 0), (a, 0), linewidth=2),
+        line((0, 0), (0, b), linewidth=2),
+        line((a, 0), (0, b), linewidth=2),
+        line((0, 0), (0.2, 0), linewidth=2),
+        line((0, 0), (0, 0.2), linewidth=2),
+        Text(a / 2, -0.3, f"a = {a}", ha="center"),
+        Text(-0.3, b / 2, f"b = {b}", va="center", rotation=90),
+        Text(a / 2 - 0.5, b / 2 + 0.3, f"c = {c:.2f}", ha="center"),
+        Text(-0.2, -0.2, "C"),
+        Text(a + 0.2, -0.2, "A"),
+        Text(-0.2, b + 0.2, "B"),
+    )
+    return FigureSpec(figsize=(6, 6), axes=(AxesSpec(
+        items=items, title=f"直角三角形 (a={a}, b={b}, c={c:.2f})",
+        xlim=(-1, a + 1), ylim=(-1, b + 1), grid_alpha=0.7),))
+
+
+register(ModelSpec(
+    name="pythagorean", title="勾股定理", page="2_勾股定理.py",
+    params=(
+        ParamSpec("a", "直角边a的长度", 3, 1, 10),
+        ParamSpec("b", "直角边b的长度", 4, 1, 10),
+    ),
+    compute=_pythagorean_compute, figure=_pythagorean_figure,
+    description="由两条直角边求斜边，并判断斜边是否为整数。",
+))
+
+
+# --- 等高模型 ---
+
+def _equal_height_compute(base1, height, base2) -> dict:
+    area1, area2 = base1 * height / 2, base2 * height / 2
+    return {"area1": area1, "area2": area2,
+            "base_ratio": base1 / base2, "area_ratio": area1 / area2}
+
+
+def _equal_height_figure(params: dict, result: dict) -> FigureSpec:
+    b1, b2, h = params["base1"], params["base2"], params["height"]
+    area1, area2 = result["area1"], result["area2"]
+    offset = b1 + 2
+    items = (
+        Shape(points([(0, 0), (b1, 0), (b1 / 2, h)]), facecolor="lightblue",
+              edgecolor="blue", alpha=0.7, linewidth=2),
+        Shape(points([(offset, 0), (offset + b2, 0), (offset + b2 / 2, h)]),
+              facecolor="lightcoral", edgecolor="red", alpha=0.7, linewidth=2),
+        line((b1 / 2, 0), (b1 / 2, h), color="blue", linestyle="--", linewidth=2),
+        line((offset + b2 / 2, 0), (offset + b2 / 2, h), color="red", linestyle="--",
+             linewidth=2),
+        line((0, 0), (b1, 0), color="blue", linewidth=3),
+        line((offset, 0), (offset + b2, 0), color="red", linewidth=3),
+        Text(b1 / 2, -0.3, f"a = {b1}", ha="center", weight="bold", color="blue"),
+        Text(offset + b2 / 2, -0.3, f"b = {b2}", ha="center", weight="bold", color="red"),
+        Text(b1 / 2 + 0.3, h / 2, f"h = {h}", va="center", fontsize=11, weight="bold",
+             color="blue"),
+        Text(offset + b2 / 2 + 0.3, h / 2, f"h = {h}", va="center", fontsize=11,
+             weight="bold", color="red"),
+        Text(b1 / 2, h / 3, f"$S_1 = {area1}$", ha="center", va="center", weight="bold",
+             color="blue", box="white", box_pad=0.2),
+        Text(offset + b2 / 2, h / 3, f"$S_2 = {area2}$", ha="center", va="center",
+             weight="bold", color="red", box="white", box_pad=0.2),
+    )
+    return FigureSpec(figsize=(10, 6), axes=(AxesSpec(
+        items=items,
+        title=f"等高三角形面积比较：$S_1 : S_2 = {b1} : {b2} = {area1} : {area2}$",
+        xlim=(-0.5, offset + b2 + 0.5), ylim=(-0.5, h + 0.5)),))
+
+
+register(ModelSpec(
+    name="equal_height", title="等高模型", page="3_等高模型.py",
+    params=(
+        ParamSpec("base1", "三角形1的底边长度", 4, 2, 8),
+        ParamSpec("height", "共同高度", 3, 2, 6),
+        ParamSpec("base2", "三角形2的底边长度", 6, 2, 8),
+    ),
+    compute=_equal_height_compute, figure=_equal_height_figure,
+    description="两个等高三角形的面积比等于底边比。",
+))
+
+
+def _moving_point_compute(base_length, height, point_x) -> dict:
+    return {"area": base_length * height / 2}
+
+
+def _moving_point_figure(params: dict, result: dict) -> FigureSpec:
+    base, h, px = params["base_length"], params["height"], params["point_x"]
+    items = [
+        line((0, 0), (base, 0), linewidth=4, label="固定底边"),
+        line((-1, h), (base + 1, h), color="green", linestyle="--", linewidth=2, alpha=0.7,
+             label="动点轨迹线"),
+        Shape(points([(0, 0), (base, 0), (px, h)]), facecolor="lightgreen",
+              edgecolor="green", alpha=0.6, linewidth=2),
+        line((px, 0), (px, h), color="red", linestyle="--", linewidth=2, label="高"),
+        marker((px, h), color="red", markersize=10, label="动点"),
+    ]
+    # 其他可能位置的三角形（虚线）
+    for x_pos in (2, 6):
+        if x_pos != px:
+            items.append(Shape(points([(0, 0), (base, 0), (x_pos, h)]), edgecolor="gray",
+                               linestyle="--", alpha=0.5))
+            items.append(marker((x_pos, h), color="gray", alpha=0.5))
+    items += [
+        Text(base / 2, -0.3, f"底边 = {base}", ha="center", weight="bold"),
+        Text(px + 0.3, h / 2, f"高 = {h}", va="center", weight="bold", color="red"),
+        Text(px, h + 0.3, f"动点({px}, {h})", ha="center", fontsize=11, weight="bold",
+             color="red"),
+        Text(base / 2, h / 3, f"面积 = {result['area']}\n(保持不变)", ha="center",
+             va="center", weight="bold", color="green", box="yellow"),
+        Text(-0.3, -0.2, "A", weight="bold"),
+        Text(base + 0.2, -0.2, "B", weight="bold"),
+        Text(px - 0.3, h + 0.1, "C", weight="bold", color="red"),
+    ]
+    return FigureSpec(figsize=(10, 7), axes=(AxesSpec(
+        items=tuple(items), title="动点原理演示：动点在平行线上移动时三角形面积不变",
+        xlim=(-1, base + 1), ylim=(-0.5, h + 1), legend="upper right"),))
+
+
+register(ModelSpec(
+    name="moving_point", title="等高模型：动点原理", page="3_等高模型.py",
+    params=(
+        ParamSpec("base_length", "底边长度", 8, 4, 12),
+        ParamSpec("height", "高度", 4, 2, 6),
+        ParamSpec("point_x", "动点的水平位置", 4, 1, 7),
+    ),
+    compute=_moving_point_compute, figure=_moving_point_figure,
+    description="顶点在底边的平行线上移动时，三角形面积不变。",
+))
+
+
+# --- 一半模型 ---
+
+def _parallelogram_compute(base, height, angle) -> dict:
+    return {"area": base * height, "skew": float(height * np.tan(np.radians(angle)))}
+
+
+def _parallelogram_figure(params: dict, result: dict) -> FigureSpec:
+    base, h, angle = params["base"], params["height"], params["angle"]
+    skew, area = result["skew"], result["area"]
+    offset = base + 2
+    items = (
+        Shape(points([(0, 0), (base, 0), (base, h), (0, h)]), facecolor="lightblue",
+              edgecolor="blue", alpha=0.7, linewidth=2),
+        Shape(points([(offset, 0), (offset + base, 0), (offset + base + skew, h),
+                      (offset + skew, h)]),
+              facecolor="lightcoral", edgecolor="red", alpha=0.7, linewidth=2),
+        line((0, 0), (0, h), color="blue", linestyle="--", linewidth=2, alpha=0.7),
+        line((offset + skew, 0), (offset + skew, h), color="red", linestyle="--",
+             linewidth=2, alpha=0.7),
+        Text(base / 2, -0.3, f"底 = {base}", ha="center", weight="bold", color="blue"),
+        Text(-0.3, h / 2, f"高 = {h}", va="center", weight="bold", color="blue",
+             rotation=90),
+        Text(offset + base / 2 + skew / 2, -0.3, f"底 = {base}", ha="center", weight="bold",
+             color="red"),
+        Text(offset + skew - 0.3, h / 2, f"高 = {h}", va="center", weight="bold",
+             color="red", rotation=90),
+        Text(base / 2, h / 2, f"面积 = {area}", ha="center", va="center", weight="bold",
+             color="blue", box="white", box_pad=0.2),
+        Text(offset + base / 2 + skew / 2, h / 2, f"面积 = {area}", ha="center",
+             va="center", weight="bold", color="red", box="white", box_pad=0.2),
+    )
+    return FigureSpec(figsize=(10, 6), axes=(AxesSpec(
+        items=items, title=f"等底等高平行四边形面积比较（倾斜角度：{angle}°）",
+        xlim=(-0.5, offset + base + skew + 0.5), ylim=(-0.5, h + 0.5)),))
+
+
+register(ModelSpec(
+    name="parallelogram", title="一半模型：等底等高平行四边形", page="4_一半模型.py",
+    params=(
+        ParamSpec("base", "底边长度", 6, 3, 10),
+        ParamSpec("height", "高度", 4, 2, 8),
+        ParamSpec("angle", "倾斜角度 (度)", 30, 0, 60),
+    ),
+    compute=_parallelogram_compute, figure=_parallelogram_figure,
+    description="等底等高的平行四边形面积相等，与倾斜角度无关。",
+))
+
+# 三种三角形的顶点横坐标（占底边的比例）
+_APEX_RATIO = {"等腰三角形": 0.5, "直角三角形": 0.0, "一般三角形": 0.3}
+
+
+def _half_triangle_compute(base, height, tri_type) -> dict:
+    return {"triangle_area": base * height / 2, "parallelogram_area": base * height,
+            "apex_x": base * _APEX_RATIO[tri_type]}
+
+
+def _half_triangle_figure(params: dict, result: dict) -> FigureSpec:
+    base, h, tri_type = params["base"], params["height"], params["tri_type"]
+    apex_x = result["apex_x"]
+    tri_area, para_area = result["triangle_area"], result["parallelogram_area"]
+    if tri_type == "直角三角形":
+        tri_label, para_label = (base / 3, h / 3), (2 * base / 3, h / 2)
+    else:
+        tri_label, para_label = (apex_x / 2 + base / 4, h / 3), (3 * base / 4, h / 2)
+    items = (
+        Shape(points([(0, 0), (base, 0), (base, h), (0, h)]), facecolor="lightyellow",
+              edgecolor="orange", alpha=0.4, linewidth=2, linestyle="--"),
+        Shape(points([(0, 0), (base, 0), (apex_x, h)]), facecolor="lightgreen",
+              edgecolor="green", alpha=0.8, linewidth=3),
+        line((apex_x, 0), (apex_x, h), color="green", linestyle="--", linewidth=2,
+             label="高"),
+        Text(base / 2, -0.3, f"底 = {base}", ha="center", weight="bold"),
+        Text(-0.3, h / 2, f"高 = {h}", va="center", weight="bold", rotation=90),
+        Text(*tri_label, f"三角形\n面积 = {tri_area}", ha="center", va="center",
+             fontsize=11, weight="bold", color="green", box="white", box_alpha=0.9),
+        Text(*para_label, f"平行四边形\n面积 = {para_area}", ha="center", va="center",
+             fontsize=11, weight="bold", color="orange", box="white", box_alpha=0.9),
+        Text(base / 2, h + 0.5, f"关系：{tri_area} = {para_area} ÷ 2", ha="center",
+             weight="bold", color="purple", box="yellow"),
+    )
+    return FigureSpec(figsize=(10, 7), axes=(AxesSpec(
+        items=items, title=f"{tri_type}与平行四边形面积关系",
+        xlim=(-0.5, base + 0.5), ylim=(-0.5, h + 1), legend="best"),))
+
+
+register(ModelSpec(
+    name="half_triangle", title="一半模型：三角形与平行四边形", page="4_一半模型.py",
+    params=(
+        ParamSpec("base", "底边长度", 6, 3, 10),
+        ParamSpec("height", "高度", 4, 2, 8),
+        ParamSpec("tri_type", "三角形类型", "等腰三角形", options=tuple(_APEX_RATIO)),
+    ),
+    compute=_half_triangle_compute, figure=_half_triangle_figure,
+    description="三角形面积是等底等高平行四边形面积的一半。",
+))
+
+
+# --- 燕尾模型 ---
+
+def _swallowtail_compute(t, s) -> dict:
+    state = swallowtail_areas(t, s)
+    return {k: (tuple(float(c) for c in v) if np.ndim(v) else float(v))
+            for k, v in state.items()}
+
+
+def _swallowtail_figure(params: dict, result: dict) -> FigureSpec:
+    A, B, C = DEFAULT_TRIANGLE
+    F, E, O = result["F"], result["E"], result["O"]
+    items = [
+        Shape(points([A, B, C]), edgecolor="black", linewidth=2),
+        Shape(points([A, B, O]), facecolor="#FFE08A", edgecolor="orange", alpha=0.8),
+        Shape(points([A, C, O]), facecolor="#F9A8D4", edgecolor="crimson", alpha=0.8),
+        Shape(points([B, F, O]), facecolor="#93C5FD", edgecolor="navy", alpha=0.85),
+        Shape(points([C, F, O]), facecolor="#86EFAC", edgecolor="green", alpha=0.85),
+        line(A, F, linestyle="--", linewidth=1.2),
+        line(B, E, linestyle="--", linewidth=1.2),
+    ]
+    for name, P in {"A": A, "B": B, "C": C, "E": E, "F": F, "O": O}.items():
+        items.append(marker(P, color="black"))
+        items.append(Text(P[0] + 0.02, P[1] + 0.02, name, fontsize=10))
+    return FigureSpec(figsize=(6, 5), axes=(AxesSpec(
+        items=tuple(items), title="燕尾模型示意图", title_size=12,
+        xlim=(-0.05, 1.05), ylim=(-0.05, 1.05), grid=None),))
+
+
+register(ModelSpec(
+    name="swallowtail", title="燕尾模型", page="5_燕尾模型.py",
+    params=(
+        ParamSpec("t", "F在BC上的位置 (BF/BC)", 0.4, 0.1, 0.9, 0.01),
+        ParamSpec("s", "E在AC上的位置 (AE/AC)", 0.6, 0.1, 0.9, 0.01),
+    ),
+    compute=_swallowtail_compute, figure=_swallowtail_figure,
+    description="左右燕尾面积比等于对应底边比。",
+))
+
+
+# --- 鸟头模型 ---
+
+_BIRD_ANGLE, _BIRD_SCALE = np.pi / 4, 0.6  # 两条翅膀夹角 45°，小鸟整体缩小到 0.6 倍
+
+
+def _bird_head_triangles(big_wing1, big_wing2, small_wing1, small_wing2) -> tuple:
+    """图中大鸟、小鸟两个三角形的顶点（共用原点处的鸟嘴）。"""
+    cos, sin = np.cos(_BIRD_ANGLE), np.sin(_BIRD_ANGLE)
+    big = [(0, 0), (big_wing1 * cos, big_wing1 * sin), (big_wing2, 0)]
+    small = [(0, 0), (small_wing1 * cos * _BIRD_SCALE, small_wing1 * sin * _BIRD_SCALE),
+             (small_wing2 * _BIRD_SCALE, 0)]
+    return big, small
+
+
+def _bird_head_compute(big_wing1, big_wing2, small_wing1, small_wing2, show_labels) -> dict:
+    big_product = big_wing1 * big_wing2
+    small_product = small_wing1 * small_wing2
+    big, small = _bird_head_triangles(big_wing1, big_wing2, small_wing1, small_wing2)
+    return {"big_product": big_product, "small_product": small_product,
+            "ratio": big_product / small_product,
+            "overlap": intersection(big, small),
+            "overlap_area": float(intersection_area(big, small))}
+
+
+def _bird_head_figure(params: dict, result: dict) -> FigureSpec:
+    bw1, bw2 = params["big_wing1"], params["big_wing2"]
+    sw1, sw2 = params["small_wing1"], params["small_wing2"]
+    big, small = _bird_head_triangles(bw1, bw2, sw1, sw2)
+    items = [
+        Shape(points(big), facecolor="lightblue", edgecolor="blue", alpha=0.7, linewidth=2,
+              label="大鸟"),
+        Shape(points(small), facecolor="lightcoral", edgecolor="red", alpha=0.7,
+              linewidth=2, label="小鸟"),
+    ]
+    if len(result["overlap"]):
+        items.append(Shape(points(result["overlap"]), facecolor="mediumpurple",
+                           edgecolor="purple", alpha=0.6, linestyle="--",
+                           label=f"重叠部分（面积 {result['overlap_area']:.2f}）"))
+    if params["show_labels"]:
+        for (x, y), text in ((big[1], f"大翅膀1: {bw1}"), (big[2], f"大翅膀2: {bw2}"),
+                             (small[1], f"小翅膀1: {sw1}"), (small[2], f"小翅膀2: {sw2}")):
+            items.append(Text(x / 2, y / 2, text, fontsize=10, ha="center", va="center"))
+    return FigureSpec(figsize=(10, 8), axes=(AxesSpec(
+        items=tuple(items), title="🐦 鸟头模型可视化", title_size=12,
+        xlim=(-1, max(big[1][0], big[2][0], small[2][0]) + 1),
+        ylim=(-1, max(big[1][1], small[1][1]) + 1), grid="-", legend="upper right"),))
+
+
+register(ModelSpec(
+    name="bird_head", title="鸟头模型", page="6_鸟头模型.py",
+    params=(
+        ParamSpec("big_wing1", "大翅膀1长度", 5.0, 1.0, 10.0, 0.5),
+        ParamSpec("big_wing2", "大翅膀2长度", 6.0, 1.0, 10.0, 0.5),
+        ParamSpec("small_wing1", "小翅膀1长度", 2.0, 0.5, 5.0, 0.5),
+        ParamSpec("small_wing2", "小翅膀2长度", 3.0, 0.5, 5.0, 0.5),
+        ParamSpec("show_labels", "显示标签", True),
+    ),
+    compute=_bird_head_compute, figure=_bird_head_figure,
+    description="共角三角形的面积比等于夹角两边乘积之比。",
+))
+
+
+# --- 相似模型 ---
+
+def _reference_triangle(a: float = 2, b: float = 3, c: float = 4) -> np.ndarray:
+    """边长为 a、b、c 的三角形，边 c 放在 x 轴上。"""
+    x3 = (c ** 2 + a ** 2 - b ** 2) / (2 * c)
+    return np.array([[0.0, 0.0], [c, 0.0], [x3, np.sqrt(a ** 2 - x3 ** 2)]])
+
+
+def _similar_compute(scale_factor) -> dict:
+    original = _reference_triangle()
+    scaled = original * scale_factor
+    original_sides, scaled_sides = side_lengths(original)[0], side_lengths(scaled)[0]
+    return {"original": original, "scaled": scaled,
+            "original_sides": original_sides, "scaled_sides": scaled_sides,
+            "original_angles": angles_from_sides(original_sides)[0],
+            "scaled_angles": angles_from_sides(scaled_sides)[0]}
+
+
+def _similar_figure(params: dict, result: dict) -> FigureSpec:
+    original, scaled = result["original"], result["scaled"]
+    items = [
+        Shape(points(original), facecolor="skyblue", alpha=0.7, label="原始三角形"),
+        polyline(original, closed=True, color="blue", marker="o"),
+        Shape(points(scaled), facecolor="salmon", alpha=0.7,
+              label=f"魔法三角形 (缩放 {params['scale_factor']:.2f} 倍)"),
+        polyline(scaled, closed=True, color="red", marker="o"),
+    ]
+    for i, label in enumerate("ABC"):
+        items.append(Text(original[i, 0] - 0.5, original[i, 1], label, fontsize=14,
+                          color="blue"))
+        items.append(Text(scaled[i, 0] + 0.3, scaled[i, 1], f"{label}'", fontsize=14,
+                          color="red"))
+    both = np.vstack([original, scaled])
+    (x_min, y_min), (x_max, y_max) = both.min(axis=0), both.max(axis=0)
+    return FigureSpec(figsize=(10, 6), axes=(AxesSpec(
+        items=tuple(items), title="原始三角形 vs. 魔法三角形", title_size=16,
+        xlim=(float(x_min) - 2, float(x_max) + 2), ylim=(float(y_min) - 2, float(y_max) + 2),
+        grid=":", grid_alpha=0.6, legend="best"),))
+
+
+register(ModelSpec(
+    name="similar", title="相似模型", page="7_相似模型.py",
+    params=(ParamSpec("scale_factor", "魔法缩放尺", 1.5, 0.5, 5.0, 0.1),),
+    compute=_similar_compute, figure=_similar_figure,
+    description="缩放不改变角度，边长按同一比例变化。",
+))
+
+
+# --- 蝴蝶模型 ---
+
+def butterfly_figure(quad, areas=None) -> FigureSpec:
+    """根据真实四边形构造蝴蝶模型的图纸。
+
+    Args:
+        quad: 四边形顶点 A、B、C、D，形如 [(x, y), ...]。
+        areas: 可选的四块翅膀面积，给出时在标签中显示数值。
+
+    Returns:
+        图纸。
+    """
+    A, B, C, D = np.asarray(quad, dtype=float)
+    O = diagonal_intersection(quad)[0][0]
+    items = [
+        polyline([A, B, C, D], closed=True),
+        line(A, C, linestyle="--"),
+        line(B, D, linestyle="--"),
+    ]
+    # 填充区域并在各翅膀重心处标注 S1, S2, S3, S4
+    wings = [(A, D), (A, B), (B, C), (D, C)]
+    colors = ["#FFB6C1", "#ADD8E6", "#FFB6C1", "#ADD8E6"]
+    centers = wing_label_points(quad)[0]
+    for i, ((P, Q), color) in enumerate(zip(wings, colors)):
+        items.append(Shape(points([P, Q, O]), facecolor=color, alpha=0.7))
+        label = WING_NAMES[i] if areas is None else f"{WING_NAMES[i]}\n{areas[i]:.2f}"
+        items.append(Text(centers[i][0], centers[i][1], label,
+                          fontsize=16 if areas is None else 13, ha="center", va="center"))
+    for name, P in zip("ABCD", (A, B, C, D)):
+        items.append(Text(P[0], P[1], f" {name}", ha="left", va="bottom"))
+    items.append(marker(O, color="black", markersize=4))
+    items.append(Text(O[0], O[1], " O", ha="left", va="top"))
+    return FigureSpec(figsize=(6, 6), axes=(AxesSpec(
+        items=tuple(items), grid=None, frameless=True),))
+
+
+def _butterfly_compute(s1, s2, s3, s4) -> dict:
+    areas = solve_missing_wing([s1, s2, s3, s4])[0]
+    solved = bool(np.isfinite(areas).all())
+    quad = quad_from_wings(*areas)[0] if solved else None
+    return {"areas": areas, "solved": solved, "quad": quad}
+
+
+def _butterfly_figure(params: dict, result: dict) -> FigureSpec:
+    if not result["solved"]:
+        return FigureSpec(figsize=(6, 6), axes=(AxesSpec(
+            items=(Text(0.5, 0.5, "请让恰好一块翅膀为 0", ha="center", va="center"),),
+            xlim=(0, 1), ylim=(0, 1), grid=None, frameless=True),))
+    return butterfly_figure(result["quad"], areas=tuple(float(a) for a in result["areas"]))
+
+
+register(ModelSpec(
+    name="butterfly", title="蝴蝶模型", page="8_蝴蝶模型.py",
+    params=(
+        ParamSpec("s1", "S1 (左翅膀) 的面积:", 10.0, 0.0, widget="number"),
+        ParamSpec("s2", "S2 (上翅膀) 的面积:", 20.0, 0.0, widget="number"),
+        ParamSpec("s3", "S3 (右翅膀) 的面积:", 30.0, 0.0, widget="number"),
+        ParamSpec("s4", "S4 (下翅膀) 的面积:", 0.0, 0.0, widget="number"),
+    ),
+    compute=_butterfly_compute, figure=_butterfly_figure,
+    description="已知三块翅膀求第四块，并画出对应的真实四边形。",
+))
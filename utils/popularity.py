@@ -0,0 +1,273 @@
+"""
+popularity.py
+
+模型图的热度统计与缓存预热：记下学生实际拨到了哪些参数组合，重启后先把
+最热门的那些画进 RENDER_CACHE，空闲时再补上被淘汰的热门图。
+
+- 计数用 Space-Saving 算法：每个页面一张容量固定（P2J_POPULARITY_TOPK）的表，
+  出现次数足够多的键一定留在表里，新键挤掉计数最小的键并继承它的计数，
+  内存与请求量无关；
+- 计数随时间按半衰期衰减，热度跟着最近的使用走，上学期的热门组合会慢慢让位；
+- 只记 (模型名, 规范化参数) 和计数：不记会话、学生、时间；持久化时只写出
+  至少出现过 PERSIST_MIN_COUNT 次的键，单个学生独有的组合不会落盘；
+- 定期（以及进程退出时）写入 JSON 文件；启动后第一次重跑时读回并预热，
+  之后每隔 P2J_WARM_INTERVAL 秒在空闲时检查一次，把缓存里缺的热门图补上。
+  预热经 PREFETCHER 排队，与相邻取值的预取共用同一个低优先级线程和渲染预算；
+  和预取一样，没有渲染工作进程（P2J_RENDER_WORKERS 为 0）时不预热。
+
+环境变量：
+    P2J_POPULARITY_PATH    热度文件路径，默认为项目根目录下的 data/popularity.json；
+                           设为空字符串时只在内存中统计、不落盘
+    P2J_POPULARITY_TOPK    每个页面最多跟踪的参数组合数，默认 256
+    P2J_WARM_KEYS          每次预热的最热门组合数，默认 32；0 表示不预热
+    P2J_WARM_INTERVAL      空闲预热的检查间隔（秒），默认 300
+"""
+from __future__ import annotations
+
+import atexit
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Hashable, Optional
+
+from utils.metrics import REGISTRY
+from utils.models import get_model
+from utils.prefetch import PREFETCHER
+from utils.render import RENDER_BACKEND, RENDER_CACHE, RENDER_FLIGHTS, cache_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / "popularity.json"
+DEFAULT_TOPK = 256
+DEFAULT_WARM_KEYS = 32
+DEFAULT_WARM_INTERVAL = 300.0
+# 计数的半衰期（秒）：一周前的一次请求只算半次
+HALF_LIFE = 7 * 86400
+# 至少出现过这么多次的键才写入文件
+PERSIST_MIN_COUNT = 2
+# 两次写文件之间的间隔（秒）
+SAVE_INTERVAL = 60.0
+# 预热在 PREFETCHER 中使用的队列名
+WARM_QUEUE = "warmer"
+
+RECORDED = REGISTRY.counter("p2j_popularity_recorded_total", "计入热度统计的模型图请求数",
+                            ("page",))
+WARM_RUNS = REGISTRY.counter("p2j_warm_runs_total", "缓存预热次数，按时机分：startup 启动、idle 空闲",
+                             ("reason",))
+WARM_QUEUED = REGISTRY.counter("p2j_warm_queued_total", "预热时发现缓存里缺失、排入渲染的热门图数")
+
+
+class TopK:
+    """Space-Saving 近似计数：最多保留 capacity 个键。
+
+    真实出现次数超过总数 / capacity 的键一定在表里；表里每个键的计数最多
+    高估被它挤掉的那个键的计数。
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: dict[Hashable, float] = {}
+
+    def add(self, key: Hashable, weight: float = 1.0) -> None:
+        counts = self.counts
+        if key in counts:
+            counts[key] += weight
+        elif len(counts) < self.capacity:
+            counts[key] = weight
+        else:
+            victim = min(counts, key=counts.__getitem__)
+            counts[key] = counts.pop(victim) + weight
+
+    def scale(self, factor: float) -> None:
+        """所有计数乘以 factor（衰减）。"""
+        for key in self.counts:
+            self.counts[key] *= factor
+
+    def most_common(self, n: int) -> list[tuple[Hashable, float]]:
+        return heapq.nlargest(n, self.counts.items(), key=lambda item: item[1])
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+class Popularity:
+    """按页面统计模型图缓存键的热度，并负责读写热度文件。"""
+
+    def __init__(self, path: Optional[Path], capacity: int = DEFAULT_TOPK,
+                 half_life: float = HALF_LIFE):
+        self.path = path
+        self.capacity = capacity
+        self.half_life = half_life
+        self._pages: dict[str, TopK] = {}
+        self._lock = threading.Lock()
+        self._decayed = time.time()
+        self._dirty = False
+
+    @classmethod
+    def from_env(cls) -> "Popularity":
+        path = os.environ.get("P2J_POPULARITY_PATH", str(DEFAULT_PATH))
+        return cls(Path(path) if path else None,
+                   int(os.environ.get("P2J_POPULARITY_TOPK", DEFAULT_TOPK)))
+
+    def record(self, page: str, used: list[tuple[str, dict]]) -> None:
+        """计入一次重跑用到的模型图（同一次重跑里重复的图只算一次）。
+
+        Args:
+            page: 页面名。
+            used: (模型名, 规范化参数) 列表。
+        """
+        keys = {cache_key(name, params) for name, params in used}
+        if not keys:
+            return
+        with self._lock:
+            table = self._pages.get(page)
+            if table is None:
+                table = self._pages[page] = TopK(self.capacity)
+            for key in keys:
+                table.add(key)
+            self._dirty = True
+        RECORDED.inc(len(keys), page=page)
+
+    def _decay(self, now: float) -> None:
+        # 调用方持有 self._lock
+        factor = 0.5 ** ((now - self._decayed) / self.half_life)
+        for table in self._pages.values():
+            table.scale(factor)
+        self._decayed = now
+
+    def hottest(self, n: int) -> list[tuple[str, dict]]:
+        """全部页面中最热门的 n 个 (模型名, 规范化参数)。
+
+        先按经过的时间衰减：不落盘（没有 snapshot/save 调用）时计数也照样衰减。
+        """
+        with self._lock:
+            self._decay(time.time())
+            items = [item for table in self._pages.values() for item in table.counts.items()]
+        top = heapq.nlargest(n, items, key=lambda item: item[1])
+        return [(name, dict(params)) for (name, params), _ in top]
+
+    def snapshot(self, min_count: float = 0.0) -> dict:
+        """可写成 JSON 的快照：页面 → [[模型名, 参数, 计数], …]（按计数从高到低）。"""
+        with self._lock:
+            self._decay(time.time())
+            return {"version": 1, "saved": self._decayed, "pages": {
+                page: [[name, dict(params), count]
+                       for (name, params), count in
+                       ((key, round(count, 3)) for key, count in table.most_common(len(table)))
+                       if count >= min_count]
+                for page, table in self._pages.items()}}
+
+    def save(self) -> bool:
+        """有新计数时写入热度文件（先写临时文件再替换）。返回是否写了文件。"""
+        if self.path is None or not self._dirty:
+            return False
+        self._dirty = False
+        data = self.snapshot(PERSIST_MIN_COUNT)
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            logger.warning("热度文件 %s 写入失败：%s", self.path, exc)
+            return False
+        return True
+
+    def load(self) -> int:
+        """读回热度文件，按保存以来经过的时间衰减；返回读入的键数。
+
+        文件不存在、损坏，或其中的模型与参数已不再有效时跳过对应内容。
+        """
+        if self.path is None or not self.path.exists():
+            return 0
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            pages, saved = data["pages"], float(data["saved"])
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("热度文件 %s 无法读取，从零开始统计：%s", self.path, exc)
+            return 0
+        factor = 0.5 ** (max(time.time() - saved, 0.0) / self.half_life)
+        loaded = 0
+        with self._lock:
+            for page, rows in pages.items():
+                table = self._pages.get(page)
+                if table is None:
+                    table = self._pages[page] = TopK(self.capacity)
+                for row in rows:
+                    try:
+                        name, params, count = row
+                        params = get_model(name).normalize(params)
+                    except (KeyError, ValueError, TypeError):
+                        continue
+                    table.add(cache_key(name, params), float(count) * factor)
+                    loaded += 1
+        return loaded
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(table) for table in self._pages.values())
+
+
+class Warmer:
+    """后台线程：启动时预热一次，之后定期写热度文件，并在空闲时补热门图。"""
+
+    def __init__(self, popularity: Popularity, keys: int = DEFAULT_WARM_KEYS,
+                 interval: float = DEFAULT_WARM_INTERVAL):
+        self.popularity = popularity
+        # 预热的图不超过缓存容量的一半，给学生当下的请求留出位置
+        self.keys = min(keys, RENDER_CACHE.maxsize // 2)
+        self.interval = interval
+        self._started = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, popularity: Popularity) -> "Warmer":
+        return cls(popularity, int(os.environ.get("P2J_WARM_KEYS", DEFAULT_WARM_KEYS)),
+                   float(os.environ.get("P2J_WARM_INTERVAL", DEFAULT_WARM_INTERVAL)))
+
+    def start(self) -> None:
+        """读回热度文件并启动后台线程（幂等）。"""
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        loaded = self.popularity.load()
+        if loaded:
+            logger.info("读入 %d 个参数组合的热度", loaded)
+        atexit.register(self.popularity.save)
+        threading.Thread(target=self._run, name="p2j-warmer", daemon=True).start()
+
+    def warm(self, reason: str) -> int:
+        """把缓存里缺的热门图排入预热队列，返回排入的张数。"""
+        if self.keys <= 0 or RENDER_BACKEND.workers <= 0:
+            return 0
+        missing = [(name, params) for name, params in self.popularity.hottest(self.keys)
+                   if cache_key(name, params) not in RENDER_CACHE]
+        WARM_RUNS.inc(reason=reason)
+        if missing:
+            WARM_QUEUED.inc(len(missing))
+            PREFETCHER.enqueue(WARM_QUEUE, missing)
+        return len(missing)
+
+    def _run(self) -> None:
+        self.warm("startup")
+        last_warm = time.monotonic()
+        while True:
+            time.sleep(SAVE_INTERVAL)
+            self.popularity.save()
+            idle = not len(RENDER_FLIGHTS) and not len(PREFETCHER)
+            if idle and time.monotonic() - last_warm >= self.interval:
+                self.warm("idle")
+                last_warm = time.monotonic()
+
+
+POPULARITY = Popularity.from_env()
+WARMER = Warmer.from_env(POPULARITY)
+
+REGISTRY.gauge("p2j_popularity_keys", "热度表中跟踪的参数组合数", POPULARITY.__len__)
@@ -0,0 +1,235 @@
+"""
+predicates.py
+
+稳健的几何谓词：方向（左转/右转/共线）、线段相交、多边形面积符号。
+
+浮点数直接算行列式再看符号，在“几乎共线”“几乎平行”的配置下可能给出
+错误的符号——三点明明共线却判成左转，两条平行线却解出一个极远的交点。
+这里采用“浮点过滤 + 精确回退”的做法（Shewchuk 的自适应谓词思路）：
+
+1. 先用 NumPy 向量化地按浮点数计算行列式，同时算出它的舍入误差上界；
+2. |行列式| 大于误差上界的元素，符号一定正确，直接采用；
+3. 只有落在误差带内的少数元素，才用 fractions.Fraction 做精确有理数运算。
+
+普通输入几乎全部在第 2 步就确定了，整体仍保持 NumPy 的速度；
+批量扫描、随机验证遇到退化或近退化的配置时，也不会崩溃或悄悄给出错误结果。
+
+所有函数的坐标都放在最后一维（形状 (..., 2)），其余维度按 NumPy 规则广播。
+"""
+from __future__ import annotations
+
+from fractions import Fraction
+
+import numpy as np
+
+# 单位舍入误差 2^-53
+EPS = np.finfo(float).eps / 2
+# 形如 (b−a)×(d−c) 的 2×2 行列式的相对误差界（Shewchuk, ccwerrboundA）
+CROSS_ERRBOUND = (3 + 16 * EPS) * EPS
+
+# segment_intersection 返回的相交类型
+DISJOINT, PROPER, TOUCHING, PARALLEL, COLLINEAR = 0, 1, 2, 3, 4
+
+
+def _exact_cross(p0, p1, q0, q1) -> Fraction:
+    """精确计算 (p1 − p0) × (q1 − q0)。浮点数到 Fraction 的转换是无损的。"""
+    ux, uy = Fraction(p1[0]) - Fraction(p0[0]), Fraction(p1[1]) - Fraction(p0[1])
+    vx, vy = Fraction(q1[0]) - Fraction(q0[0]), Fraction(q1[1]) - Fraction(q0[1])
+    return ux * vy - uy * vx
+
+
+def _indices(mask: np.ndarray) -> list:
+    """布尔数组中为 True 的位置（0 维数组也适用）。"""
+    return [tuple(i) for i in np.argwhere(mask)]
+
+
+def _broadcast_points(*pts) -> list:
+    arrays = [np.asarray(p, dtype=float) for p in pts]
+    return np.broadcast_arrays(*arrays)
+
+
+def cross_filtered(p0, p1, q0, q1) -> tuple[np.ndarray, np.ndarray]:
+    """向量化计算 (p1 − p0) × (q1 − q0)，并标出浮点符号不可信的元素。
+
+    Args:
+        p0, p1, q0, q1: 点坐标，形状 (..., 2)，可互相广播。
+
+    Returns:
+        (det, ambiguous)：det 为浮点行列式；ambiguous 为布尔数组，
+        True 表示 |det| 不超过误差上界（或输入含 nan/inf），符号需要精确判定。
+    """
+    p0, p1, q0, q1 = _broadcast_points(p0, p1, q0, q1)
+    left = (p1[..., 0] - p0[..., 0]) * (q1[..., 1] - q0[..., 1])
+    right = (p1[..., 1] - p0[..., 1]) * (q1[..., 0] - q0[..., 0])
+    det = left - right
+    bound = CROSS_ERRBOUND * (np.abs(left) + np.abs(right))
+    ambiguous = ~(np.abs(det) > bound)
+    return np.array(det, dtype=float), np.asarray(ambiguous)
+
+
+def cross_sign(p0, p1, q0, q1) -> np.ndarray:
+    """(p1 − p0) × (q1 − q0) 的精确符号。
+
+    Args:
+        p0, p1, q0, q1: 点坐标，形状 (..., 2)，可互相广播。
+
+    Returns:
+        int8 数组，取值 −1、0、1；含 nan/inf 的元素记为 0（视为退化）。
+    """
+    p0, p1, q0, q1 = _broadcast_points(p0, p1, q0, q1)
+    det, ambiguous = cross_filtered(p0, p1, q0, q1)
+    sign = np.asarray(np.where(ambiguous, 0, np.sign(det)), dtype=np.int8)
+    for idx in _indices(ambiguous):
+        pts = (p0[idx], p1[idx], q0[idx], q1[idx])
+        if not all(np.isfinite(p).all() for p in pts):
+            sign[idx] = 0
+            continue
+        exact = _exact_cross(*pts)
+        sign[idx] = (exact > 0) - (exact < 0)
+    return sign
+
+
+def orient2d(a, b, c) -> np.ndarray:
+    """三点的方向：1 为逆时针（c 在有向直线 ab 左侧），−1 为顺时针，0 为共线。
+
+    Args:
+        a, b, c: 点坐标，形状 (..., 2)。
+
+    Returns:
+        int8 数组，结果是精确的。
+    """
+    return cross_sign(a, b, a, c)
+
+
+def cross_value(p0, p1, q0, q1) -> np.ndarray:
+    """(p1 − p0) × (q1 − q0) 的数值：误差带内的元素改用精确值再舍入。
+
+    与直接用浮点数计算相比，精确为 0 的地方一定返回 0，
+    接近 0 的地方也有完整的相对精度。
+    """
+    p0, p1, q0, q1 = _broadcast_points(p0, p1, q0, q1)
+    det, ambiguous = cross_filtered(p0, p1, q0, q1)
+    for idx in _indices(ambiguous):
+        pts = (p0[idx], p1[idx], q0[idx], q1[idx])
+        if all(np.isfinite(p).all() for p in pts):
+            det[idx] = float(_exact_cross(*pts))
+    return det
+
+
+def signed_area(*vertices) -> np.ndarray:
+    """多边形有向面积（逆时针为正），退化时精确为 0。
+
+    以第一个顶点为原点做扇形剖分，把 n 个顶点的鞋带公式写成 n − 2 个
+    2×2 行列式之和；误差带内的元素整体改用精确有理数求和。
+
+    Args:
+        *vertices: 依次给出的顶点，每个形状 (..., 2)。
+
+    Returns:
+        有向面积数组。
+    """
+    pts = _broadcast_points(*vertices)
+    origin = pts[0]
+    dets, bound = 0.0, 0.0
+    for P, Q in zip(pts[1:-1], pts[2:]):
+        left = (P[..., 0] - origin[..., 0]) * (Q[..., 1] - origin[..., 1])
+        right = (P[..., 1] - origin[..., 1]) * (Q[..., 0] - origin[..., 0])
+        dets = dets + (left - right)
+        bound = bound + np.abs(left) + np.abs(right)
+    n = len(pts)
+    # 每项误差同 CROSS_ERRBOUND，n − 3 次加法再各引入至多一个 EPS
+    bound = (CROSS_ERRBOUND + n * EPS) * (1 + n * EPS) * bound
+    total = np.asarray(dets, dtype=float).copy()
+    for idx in _indices(~(np.abs(total) > bound)):
+        ring = [p[idx] for p in pts]
+        if not all(np.isfinite(p).all() for p in ring):
+            continue
+        exact = sum((_exact_cross(ring[0], P, ring[0], Q) for P, Q in zip(ring[1:-1], ring[2:])),
+                    Fraction(0))
+        total[idx] = float(exact)
+    return 0.5 * total
+
+
+def area_sign(*vertices) -> np.ndarray:
+    """多边形有向面积的精确符号（1 逆时针、−1 顺时针、0 退化）。"""
+    return np.asarray(np.sign(np.nan_to_num(signed_area(*vertices))), dtype=np.int8)
+
+
+def line_intersection(P1, P2, Q1, Q2) -> np.ndarray:
+    """直线 P1P2 与 Q1Q2 的交点。
+
+    平行（含重合）按精确判定返回 nan，不会因为舍入解出一个极远的假交点；
+    接近平行、浮点分母不可靠的元素改用精确有理数求解。
+
+    Args:
+        P1, P2: 第一条直线上的两点，形状 (..., 2)。
+        Q1, Q2: 第二条直线上的两点，形状 (..., 2)。
+
+    Returns:
+        交点坐标，形状 (..., 2)；平行的位置为 nan。
+    """
+    P1, P2, Q1, Q2 = _broadcast_points(P1, P2, Q1, Q2)
+    denom, ambiguous = cross_filtered(P1, P2, Q1, Q2)
+    u = P2 - P1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(ambiguous, np.nan, cross_value(P1, Q1, Q1, Q2) / denom)
+    point = P1 + t[..., None] * u
+    for idx in _indices(ambiguous):
+        pts = (P1[idx], P2[idx], Q1[idx], Q2[idx])
+        if not all(np.isfinite(p).all() for p in pts):
+            continue
+        d = _exact_cross(*pts)
+        if d == 0:
+            continue
+        s = _exact_cross(pts[0], pts[2], pts[2], pts[3]) / d
+        point[idx] = [float(Fraction(pts[0][k]) + s * (Fraction(pts[1][k]) - Fraction(pts[0][k])))
+                      for k in range(2)]
+    return point
+
+
+def segment_intersection(P1, P2, Q1, Q2) -> np.ndarray:
+    """判定线段 P1P2 与 Q1Q2 的相交类型（精确）。
+
+    Args:
+        P1, P2: 第一条线段的端点，形状 (..., 2)。
+        Q1, Q2: 第二条线段的端点，形状 (..., 2)。
+
+    Returns:
+        int8 数组：PROPER（在两条线段内部交叉）、TOUCHING（交点是某条线段的端点）、
+        COLLINEAR（共线且有重叠）、PARALLEL（平行或共线但不重叠）、DISJOINT（不相交）。
+    """
+    P1, P2, Q1, Q2 = _broadcast_points(P1, P2, Q1, Q2)
+    o1, o2 = orient2d(P1, P2, Q1), orient2d(P1, P2, Q2)
+    o3, o4 = orient2d(Q1, Q2, P1), orient2d(Q1, Q2, P2)
+    kind = np.full(o1.shape, DISJOINT, dtype=np.int8)
+    kind[(o1 * o2 < 0) & (o3 * o4 < 0)] = PROPER
+    touching = (o1 * o2 <= 0) & (o3 * o4 <= 0) & ((o1 == 0) | (o2 == 0) | (o3 == 0) | (o4 == 0))
+    kind[touching] = TOUCHING
+    collinear = (o1 == 0) & (o2 == 0)
+    if collinear.any():
+        # 共线时把四个端点投影到主方向上比较区间是否重叠
+        axis = (np.abs(P2[..., 0] - P1[..., 0]) < np.abs(P2[..., 1] - P1[..., 1])).astype(int)
+        p = np.take_along_axis(np.stack([P1, P2], -1), axis[..., None, None], -2)[..., 0, :]
+        q = np.take_along_axis(np.stack([Q1, Q2], -1), axis[..., None, None], -2)[..., 0, :]
+        overlap = (np.maximum(p.min(-1), q.min(-1)) <= np.minimum(p.max(-1), q.max(-1)))
+        kind[collinear] = np.where(overlap[collinear], COLLINEAR, PARALLEL)
+    parallel = (cross_sign(P1, P2, Q1, Q2) == 0) & ~collinear
+    kind[parallel] = PARALLEL
+    return kind
+
+
+def safe_ratio(num, den) -> np.ndarray:
+    """num / den，分母为 0 或非有限值的位置返回 nan，且不产生除零警告。
+
+    代替“先除、再检查 nan/inf”的写法：先决定哪些位置有意义，再只在这些位置做除法。
+    """
+    num, den = np.broadcast_arrays(np.asarray(num, dtype=float), np.asarray(den, dtype=float))
+    ok = (den != 0) & np.isfinite(den) & np.isfinite(num)
+    out = np.full(num.shape, np.nan)
+    np.divide(num, den, out=out, where=ok)
+    return out
+
+
+def safe_arccos(x) -> np.ndarray:
+    """arccos，先把输入截断到 [−1, 1]，防止舍入误差导致 nan；nan 输入仍返回 nan。"""
+    return np.arccos(np.clip(np.asarray(x, dtype=float), -1.0, 1.0))
@@ -0,0 +1,242 @@
+"""
+prefetch.py
+
+相邻滑块取值的预取：一次重跑结束后，在后台低优先级地把“往左、往右拨一格”的
+参数组合提前渲染进 RENDER_CACHE，学生下一次拨动滑块时图已经在缓存里了。
+
+- 重跑期间 model_job 记下用到了哪些模型图（见 render.capture_model_jobs），
+  finish_rerun 把它们交给 PREFETCHER.schedule，按每个数值参数的步长生成相邻取值；
+  刚刚被拨动的那个参数排在最前，并优先沿拨动的方向往前多预取一格；
+- 全进程只有一个预取线程，一次只渲染一张。有真实的渲染在进行时先让路（等
+  RENDER_FLIGHTS 的进行中表变空），每渲染 s 秒就歇 s·(1 − 预算)/预算 秒，
+  占用的渲染时间不超过预算比例；
+- 只在有渲染工作进程时预取：P2J_RENDER_WORKERS 为 0 时渲染在当前进程里持有
+  MPL_LOCK 进行，预取会直接挡住前台重跑，预算也救不回来；
+- 同一个会话再次重跑时，它还没轮到的预取全部作废，换成新位置的相邻取值；
+  已经取出、正在等前台让路的那一项在开始渲染前也会核对一次，过时就放弃。
+  各会话的预取轮流进行，一个会话拨得再快也不会占满队列；
+- 预取经 RENDER_FLIGHTS 提交：真实请求恰好要同一张图时直接等这次预取的结果。
+
+环境变量：
+    P2J_PREFETCH_BUDGET     预取最多占用的渲染时间比例，默认 0.25；0 表示关闭预取
+    P2J_PREFETCH_NEIGHBORS  每次重跑每张模型图最多预取的相邻取值数，默认 6
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from utils.metrics import REGISTRY
+from utils.models import ModelSpec, get_model
+from utils.render import RENDER_BACKEND, RENDER_CACHE, RENDER_FLIGHTS, cache_key, model_job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET = 0.25
+DEFAULT_NEIGHBORS = 6
+# 记住最近预取过的多少个缓存键，用来统计预取命中
+REMEMBER_KEYS = 1024
+# 记住最近多少个会话上一次用到的参数（用来判断拨动方向）
+REMEMBER_SESSIONS = 1024
+
+PREFETCH_JOBS = REGISTRY.counter(
+    "p2j_prefetch_jobs_total",
+    "预取任务数，按结果分：rendered 渲染、cached 已在缓存、cancelled 作废、failed 失败",
+    ("figure", "outcome"))
+PREFETCH_USED = REGISTRY.counter("p2j_prefetch_used_total",
+                                 "重跑用到的模型图恰好是之前预取的次数", ("figure",))
+
+
+def _step(param) -> Optional[float]:
+    """数值参数拨一格的步长；不是数值滑块（或输入框）时返回 None。"""
+    if param.kind not in ("int", "float") or param.widget == "select":
+        return None
+    if param.step is not None:
+        return param.step
+    return 1 if param.kind == "int" else None
+
+
+def neighbor_params(model: ModelSpec, params: dict, previous: Optional[dict] = None,
+                    limit: int = DEFAULT_NEIGHBORS) -> list[dict]:
+    """相邻的参数组合：每次只把一个数值参数拨动一格。
+
+    Args:
+        model: 模型。
+        params: 当前的规范化参数。
+        previous: 同一会话上一次用到的参数；有参数变了时，沿变化方向再拨一格、
+            两格排在最前，接着是反方向一格，然后才是其余参数。
+        limit: 最多返回几组。
+
+    Returns:
+        规范化参数字典的列表，越可能被用到的越靠前，不含当前参数本身。
+    """
+    moves = []
+    changed = [p for p in model.params if previous is not None and _step(p) is not None
+               and previous.get(p.name) != params[p.name]]
+    for p in changed:
+        direction = 1 if params[p.name] > previous[p.name] else -1
+        moves += [(p, direction), (p, 2 * direction), (p, -direction)]
+    for p in model.params:
+        if _step(p) is not None and p not in changed:
+            moves += [(p, 1), (p, -1)]
+
+    result, seen = [], {cache_key(model.name, params)}
+    for p, steps in moves:
+        candidate = dict(params, **{p.name: p.coerce(params[p.name] + steps * _step(p))})
+        key = cache_key(model.name, candidate)
+        if key not in seen:
+            seen.add(key)
+            result.append(candidate)
+            if len(result) >= limit:
+                break
+    return result
+
+
+class Prefetcher:
+    """全进程共用的低优先级预取队列与后台线程。
+
+    队列按会话分开存放，后台线程每次从排在最前的会话取一项、再把它排到队尾。
+    """
+
+    def __init__(self, budget: float = DEFAULT_BUDGET, neighbors: int = DEFAULT_NEIGHBORS):
+        self.budget = budget
+        self.neighbors = neighbors
+        # 会话 → 待预取的 [(模型名, 规范化参数)]
+        self._queues: OrderedDict = OrderedDict()
+        # 队列 → 最近一次替换时的代号；取出的项开始渲染前核对代号是否还是最新的
+        self._generations: OrderedDict = OrderedDict()
+        self._serial = 0
+        # 会话 → {模型名: 上次用到的参数}，按最近活跃排序
+        self._last: OrderedDict = OrderedDict()
+        # 最近预取完成的缓存键，重跑用到它们时计一次预取命中
+        self._recent: OrderedDict = OrderedDict()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls) -> "Prefetcher":
+        return cls(float(os.environ.get("P2J_PREFETCH_BUDGET", DEFAULT_BUDGET)),
+                   int(os.environ.get("P2J_PREFETCH_NEIGHBORS", DEFAULT_NEIGHBORS)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget > 0 and self.neighbors > 0 and RENDER_BACKEND.workers > 0
+
+    def schedule(self, session_id: str, used: list[tuple[str, dict]]) -> None:
+        """登记一次重跑用到的模型图，用它们的相邻取值替换该会话原有的预取队列。
+
+        Args:
+            session_id: 会话标识。
+            used: 本次重跑的 (模型名, 规范化参数) 列表。
+        """
+        if not self.enabled:
+            return
+        with self._cond:
+            last = self._last.pop(session_id, {})
+            self._last[session_id] = last
+            while len(self._last) > REMEMBER_SESSIONS:
+                self._last.popitem(last=False)
+            wanted, seen = [], set()
+            for name, params in used:
+                key = cache_key(name, params)
+                if key in seen:
+                    continue
+                seen.add(key)
+                if self._recent.pop(key, None) is not None:
+                    PREFETCH_USED.inc(figure=f"model:{name}")
+                for candidate in neighbor_params(get_model(name), params, last.get(name),
+                                                 self.neighbors):
+                    wanted.append((name, candidate))
+                last[name] = params
+            self._replace(session_id, wanted)
+
+    def enqueue(self, queue_id: str, items: list[tuple[str, dict]]) -> None:
+        """直接排入一组 (模型名, 规范化参数)，替换该队列原有的待预取项。
+
+        与会话的预取共用同一个后台线程和预算，例如缓存预热（见 utils.popularity）。
+        """
+        if self.budget <= 0 or RENDER_BACKEND.workers <= 0:
+            return
+        with self._cond:
+            self._replace(queue_id, items)
+
+    def _replace(self, queue_id: str, items: list) -> None:
+        # 调用方持有 self._cond
+        for name, _ in self._queues.pop(queue_id, ()):
+            PREFETCH_JOBS.inc(figure=f"model:{name}", outcome="cancelled")
+        self._serial += 1
+        self._generations.pop(queue_id, None)
+        self._generations[queue_id] = self._serial
+        while len(self._generations) > REMEMBER_SESSIONS:
+            self._generations.popitem(last=False)
+        if items:
+            self._queues[queue_id] = list(items)
+            self._ensure_thread()
+            self._cond.notify()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="p2j-prefetch", daemon=True)
+            self._thread.start()
+
+    def _next(self) -> tuple[str, int, tuple[str, dict]]:
+        """等待并取出下一项（各会话轮流），返回 (队列, 代号, 项)。"""
+        with self._cond:
+            while not self._queues:
+                self._cond.wait()
+            queue_id, queue = next(iter(self._queues.items()))
+            item = queue.pop(0)
+            if queue:
+                self._queues.move_to_end(queue_id)
+            else:
+                del self._queues[queue_id]
+            return queue_id, self._generations.get(queue_id, 0), item
+
+    def _current(self, queue_id: str, generation: int) -> bool:
+        """取出这一项之后，它所在的队列是否没有再被替换过。"""
+        with self._cond:
+            return self._generations.get(queue_id) == generation
+
+    def _run(self) -> None:
+        while True:
+            queue_id, generation, (name, params) = self._next()
+            label = f"model:{name}"
+            key = cache_key(name, params)
+            if key in RENDER_CACHE:
+                PREFETCH_JOBS.inc(figure=label, outcome="cached")
+                continue
+            # 真实请求优先：有渲染在进行时等它们结束
+            RENDER_FLIGHTS.wait_idle()
+            # 等待期间会话可能已经重跑、换了位置，这一项随之过时
+            if not self._current(queue_id, generation):
+                PREFETCH_JOBS.inc(figure=label, outcome="cancelled")
+                continue
+            start = time.perf_counter()
+            try:
+                RENDER_FLIGHTS.submit(model_job(name, **params)).result()
+            except Exception:
+                logger.warning("预取 %s %s 失败", name, params, exc_info=True)
+                PREFETCH_JOBS.inc(figure=label, outcome="failed")
+                continue
+            seconds = time.perf_counter() - start
+            PREFETCH_JOBS.inc(figure=label, outcome="rendered")
+            with self._cond:
+                self._recent[key] = True
+                while len(self._recent) > REMEMBER_KEYS:
+                    self._recent.popitem(last=False)
+            # 按预算歇一会儿，长期看预取只占 budget 比例的渲染时间
+            if self.budget < 1:
+                time.sleep(seconds * (1 - self.budget) / self.budget)
+
+    def __len__(self) -> int:
+        with self._cond:
+            return sum(len(queue) for queue in self._queues.values())
+
+
+PREFETCHER = Prefetcher.from_env()
+
+REGISTRY.gauge("p2j_prefetch_queued", "等待预取的相邻参数组合数", PREFETCHER.__len__)
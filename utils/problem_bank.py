@@ -0,0 +1,311 @@
+"""
+problem_bank.py
+
+参数化题库生成器：为鸟头、蝴蝶、燕尾、等高四类模型批量生成“答案好看”的练习题。
+
+设计要点：
+- 生成过程完全向量化：一次性随机采样大量候选参数，用 NumPy 掩码过滤掉
+  病态题目（比例过大、答案分母过大等），再用 np.unique 去重；
+- 使用固定随机种子，保证同一份题库在不同进程、不同机器上完全一致；
+- 题库以紧凑的整数数组存储（参数 int16，答案分子/分母 int32），
+  按题型索引，抽题只是一次数组下标访问，时间复杂度 O(1)；
+- get_default_bank() 用 functools.lru_cache 在进程内只构建一次，之后所有会话共享。
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# 题型名称（用作索引键）
+KIND_BIRD_HEAD = "bird_head"
+KIND_BUTTERFLY = "butterfly"
+KIND_SWALLOWTAIL = "swallowtail"
+KIND_EQUAL_HEIGHT = "equal_height"
+KINDS = (KIND_BIRD_HEAD, KIND_BUTTERFLY, KIND_SWALLOWTAIL, KIND_EQUAL_HEIGHT)
+
+# 每种题型的参数列名，与 ProblemBank 中参数数组的列一一对应
+PARAM_NAMES = {
+    # 大翅膀 a、b，小翅膀 c、d（共用鸟嘴角）
+    KIND_BIRD_HEAD: ("a", "b", "c", "d"),
+    # 四块翅膀面积 S1..S4 与未知翅膀下标 unknown（0..3）
+    KIND_BUTTERFLY: ("s1", "s2", "s3", "s4", "unknown"),
+    # BF:FC = m:n，已知 S1=S△AOB，求 S2=S△AOC
+    KIND_SWALLOWTAIL: ("m", "n", "s1"),
+    # BD:DC = m:n，已知 S△ABC，求 S△ABD
+    KIND_EQUAL_HEIGHT: ("m", "n", "total"),
+}
+
+# 答案允许的最大分母（“简单分数”）
+MAX_DENOMINATOR = 4
+# draw() 换一题时下标前进的基准步长（一个大质数），实际步长见 _draw_step
+DRAW_STEP = 7919
+
+
+@dataclass(frozen=True)
+class Problem:
+    """从题库中取出的一道题。
+
+    Attributes:
+        kind: 题型名称，取值见 KINDS。
+        index: 题目在该题型中的下标。
+        params: 参数名到整数值的映射。
+        answer: 精确答案（分数形式）。
+    """
+    kind: str
+    index: int
+    params: dict
+    answer: Fraction
+
+    @property
+    def key(self) -> str:
+        """题目的稳定标识，例如 "bird_head#1234"（用于记录答题进度）。"""
+        return f"{self.kind}#{self.index}"
+
+    @property
+    def answer_text(self) -> str:
+        """答案的展示文本，例如 "4" 或 "15/2"。"""
+        if self.answer.denominator == 1:
+            return str(self.answer.numerator)
+        return f"{self.answer.numerator}/{self.answer.denominator}"
+
+    def check(self, value: float, tol: float = 0.01) -> bool:
+        """判断学生输入的数值答案是否正确。
+
+        Args:
+            value: 学生输入的答案（小数形式）。
+            tol: 允许的绝对误差。
+
+        Returns:
+            答案正确返回 True。
+        """
+        return abs(value - float(self.answer)) < tol
+
+
+def _reduce(num: np.ndarray, den: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """将分数数组约分为最简形式。"""
+    g = np.gcd(num, den)
+    g[g == 0] = 1
+    return num // g, den // g
+
+
+def _finalize(params: np.ndarray, num: np.ndarray, den: np.ndarray,
+              keep: np.ndarray, size: int, rng: np.random.Generator):
+    """按掩码过滤、去重并截取指定数量的题目。"""
+    params, num, den = params[keep], num[keep], den[keep]
+    _, first = np.unique(params, axis=0, return_index=True)
+    # np.unique 会按字典序排序，这里再随机打乱，保证相邻题目难度分布均匀
+    first = rng.permutation(first)[:size]
+    return (params[first].astype(np.int16),
+            num[first].astype(np.int32),
+            den[first].astype(np.int32))
+
+
+def _gen_bird_head(rng: np.random.Generator, size: int):
+    """鸟头模型：求大三角形面积是小三角形的几倍。"""
+    n = size * 12
+    a = rng.integers(2, 31, n)
+    b = rng.integers(2, 31, n)
+    c = rng.integers(1, 31, n)
+    d = rng.integers(1, 31, n)
+    num, den = _reduce(a * b, c * d)
+    keep = ((c <= a) & (d <= b) & ((c < a) | (d < b))
+            & (den <= MAX_DENOMINATOR) & (num <= 50 * den))
+    return _finalize(np.stack([a, b, c, d], axis=1), num, den, keep, size, rng)
+
+
+def _gen_butterfly(rng: np.random.Generator, size: int):
+    """蝴蝶模型：已知三块翅膀面积，求第四块。
+
+    以对角线被交点分成的四段 p、q、r、s 构造面积（去掉公共因子 sinθ/2），
+    这样 S1×S3 = S2×S4 自动成立，且面积都是整数。
+    """
+    n = size * 4
+    k = rng.integers(1, 6, n)
+    p, q, r, s = (rng.integers(1, 10, n) for _ in range(4))
+    s1, s2, s3, s4 = k * p * s, k * p * r, k * q * r, k * q * s
+    unknown = rng.integers(0, 4, n)
+    areas = np.stack([s1, s2, s3, s4], axis=1)
+    num = areas[np.arange(n), unknown]
+    den = np.ones_like(num)
+    keep = (areas.max(axis=1) <= 200) & (areas.min(axis=1) >= 2)
+    params = np.concatenate([areas, unknown[:, None]], axis=1)
+    return _finalize(params, num, den, keep, size, rng)
+
+
+def _gen_swallowtail(rng: np.random.Generator, size: int):
+    """燕尾模型：S△AOB : S△AOC = BF : FC，已知 S1 求 S2。"""
+    n = size * 8
+    m = rng.integers(1, 13, n)
+    nn = rng.integers(1, 13, n)
+    s1 = rng.integers(2, 401, n)
+    num, den = _reduce(s1 * nn, m)
+    keep = (np.gcd(m, nn) == 1) & (den <= MAX_DENOMINATOR) & (num <= 600 * den)
+    return _finalize(np.stack([m, nn, s1], axis=1), num, den, keep, size, rng)
+
+
+def _gen_equal_height(rng: np.random.Generator, size: int):
+    """等高模型：BD : DC = m : n，已知 S△ABC，求 S△ABD。"""
+    n = size * 8
+    m = rng.integers(1, 13, n)
+    nn = rng.integers(1, 13, n)
+    total = rng.integers(6, 601, n)
+    num, den = _reduce(total * m, m + nn)
+    keep = (np.gcd(m, nn) == 1) & (den <= MAX_DENOMINATOR)
+    return _finalize(np.stack([m, nn, total], axis=1), num, den, keep, size, rng)
+
+
+_GENERATORS = {
+    KIND_BIRD_HEAD: _gen_bird_head,
+    KIND_BUTTERFLY: _gen_butterfly,
+    KIND_SWALLOWTAIL: _gen_swallowtail,
+    KIND_EQUAL_HEIGHT: _gen_equal_height,
+}
+
+
+class ProblemBank:
+    """按题型索引的紧凑题库。
+
+    每种题型保存三个数组：参数 params (N, P) int16、答案分子 num (N,) int32、
+    答案分母 den (N,) int32。取题只做数组下标访问。
+    """
+
+    def __init__(self, tables: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]],
+                 seed: int):
+        self._tables = tables
+        self.seed = seed
+
+    def __len__(self) -> int:
+        return sum(len(t[0]) for t in self._tables.values())
+
+    def count(self, kind: str) -> int:
+        """返回某一题型的题目数量。"""
+        return len(self._tables[kind][0])
+
+    def nbytes(self) -> int:
+        """题库占用的内存字节数。"""
+        return sum(arr.nbytes for t in self._tables.values() for arr in t)
+
+    def get(self, kind: str, index: int) -> Problem:
+        """按下标取题（下标会对题量取模，因此任意整数都合法）。
+
+        Args:
+            kind: 题型名称。
+            index: 题目下标。
+
+        Returns:
+            Problem 对象。
+        """
+        params, num, den = self._tables[kind]
+        i = int(index) % len(params)
+        values = dict(zip(PARAM_NAMES[kind], (int(v) for v in params[i])))
+        return Problem(kind, i, values, Fraction(int(num[i]), int(den[i])))
+
+    def draw(self, kind: str, session_key: str, round_no: int = 0) -> Problem:
+        """为某个会话抽题，O(1)。
+
+        同一会话、同一轮次总是得到同一道题；不同会话通过稳定哈希错开起点，
+        全班同学拿到的题目互不相同（直到题量用完才会重复）。
+
+        Args:
+            kind: 题型名称。
+            session_key: 会话标识（例如 Streamlit 会话 ID 或学生编号）。
+            round_no: 第几轮（“换一题”时加一）。
+
+        Returns:
+            Problem 对象。
+        """
+        offset = _stable_hash(f"{self.seed}:{kind}:{session_key}")
+        # 步长与题量互素，轮次递增时才会走遍整个题库
+        return self.get(kind, offset + round_no * _draw_step(self.count(kind)))
+
+    def save(self, path: str | Path) -> None:
+        """以压缩 npz 格式保存题库。"""
+        arrays = {}
+        for kind, (params, num, den) in self._tables.items():
+            arrays[f"{kind}__params"] = params
+            arrays[f"{kind}__num"] = num
+            arrays[f"{kind}__den"] = den
+        np.savez_compressed(path, seed=np.int64(self.seed), **arrays)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ProblemBank":
+        """从 npz 文件加载题库。"""
+        with np.load(path) as data:
+            tables = {
+                kind: (data[f"{kind}__params"], data[f"{kind}__num"], data[f"{kind}__den"])
+                for kind in KINDS if f"{kind}__params" in data
+            }
+            return cls(tables, int(data["seed"]))
+
+
+def _stable_hash(text: str) -> int:
+    """跨进程稳定的字符串哈希（内置 hash() 每次启动会随机化）。"""
+    h = 1469598103934665603
+    for byte in text.encode("utf-8"):
+        h = ((h ^ byte) * 1099511628211) & 0xFFFFFFFFFFFFFFFF
+    return h
+
+
+def build_problem_bank(seed: int = 20240901, size: int = 20000,
+                       kinds: Optional[tuple[str, ...]] = None) -> ProblemBank:
+    """向量化生成题库。
+
+    Args:
+        seed: 随机种子，相同种子得到完全相同的题库。
+        size: 每种题型的目标题量（若去重后不足则取实际数量）。
+        kinds: 需要生成的题型，默认全部。
+
+    Returns:
+        ProblemBank 对象。
+    """
+    rng = np.random.default_rng(seed)
+    tables = {}
+    for kind in kinds or KINDS:
+        tables[kind] = _GENERATORS[kind](rng, size)
+    return ProblemBank(tables, seed)
+
+
+def describe(problem: Problem) -> str:
+    """生成题目的中文题干。"""
+    p = problem.params
+    if problem.kind == KIND_BIRD_HEAD:
+        return (f"两个三角形共用一个角（鸟嘴）。大三角形夹这个角的两条边是 {p['a']} 和 {p['b']}，"
+                f"小三角形夹这个角的两条边是 {p['c']} 和 {p['d']}。大三角形的面积是小三角形的几倍？")
+    if problem.kind == KIND_BUTTERFLY:
+        names = ["S1", "S2", "S3", "S4"]
+        values = [p["s1"], p["s2"], p["s3"], p["s4"]]
+        known = "，".join(f"{n} = {v}" for i, (n, v) in enumerate(zip(names, values))
+                         if i != p["unknown"])
+        return f"四边形被两条对角线分成四块翅膀，已知 {known}。求 {names[p['unknown']]} 的面积。"
+    if problem.kind == KIND_SWALLOWTAIL:
+        return (f"在△ABC中，F在BC上，E在AC上，AF与BE交于O，且 BF : FC = {p['m']} : {p['n']}。"
+                f"已知 S△AOB = {p['s1']}，求 S△AOC。")
+    if problem.kind == KIND_EQUAL_HEIGHT:
+        return (f"在△ABC中，D是BC边上的一点，BD : DC = {p['m']} : {p['n']}，"
+                f"△ABC的面积是 {p['total']}。求△ABD的面积。")
+    raise ValueError(f"未知题型：{problem.kind}")
+
+
+@lru_cache(maxsize=None)
+def _draw_step(n: int) -> int:
+    """不小于 DRAW_STEP、且与题量 n 互素的最小步长。
+
+    题量由去重结果决定，事先无法保证与 DRAW_STEP 互素；不互素时轮次递增只会在
+    n / gcd 道题里打转，提前出现重复。
+    """
+    step = DRAW_STEP
+    while math.gcd(step, n) != 1:
+        step += 1
+    return step
+
+
+@lru_cache(maxsize=1)
+def get_default_bank() -> ProblemBank:
+    """进程内共享的默认题库（首次调用时生成，之后直接复用）。"""
+    return build_problem_bank()
@@ -0,0 +1,227 @@
+"""
+profiling.py
+
+按需剖析单次重跑：线上某一页变慢时，不用重新部署就能看到时间花在哪里。
+
+启用方式：部署时设置环境变量 P2J_PROFILE_TOKEN，然后在页面地址后加上
+``?profile=<令牌>``。令牌正确时，本次重跑从 track_rerun 到 finish_rerun 之间会被
+
+- cProfile（确定性剖析）完整记录，可下载为 .prof 文件，用 snakeviz、
+  ``python -m pstats`` 等工具查看；
+- 一个采样线程每隔 SAMPLE_INTERVAL 秒记录一次脚本线程的调用栈，导出为
+  flamegraph.pl / speedscope 可直接读取的折叠栈（folded stacks）文本。
+  连续的 Matplotlib、NumPy、Streamlit 内部栈帧合并成一个 [matplotlib] 之类的帧，
+  火焰图里只留下本项目代码的细节。
+
+剖析结束后查询参数会被移除，所以只会剖析恰好一次重跑；报告显示在页面底部，
+最近几次的结果也保存在 PROFILES 里。Python 3.12 起整个进程同时只能有一个 cProfile，
+另一个会话正在剖析时本次重跑不剖析，页面上给出提示并保留查询参数，下次重跑再试。
+两种剖析同时进行，cProfile 本身会让耗时变长，采样得到的是相对比例，不是精确耗时。
+交给渲染工作进程的图不在本进程内执行，不会出现在剖析结果里。
+
+未设置 P2J_PROFILE_TOKEN 时，整个功能关闭：track_rerun 里只多一次 None 判断，
+不读取查询参数，也不创建任何对象。
+"""
+from __future__ import annotations
+
+import cProfile
+import hmac
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+PROFILE_TOKEN = os.environ.get("P2J_PROFILE_TOKEN") or None
+QUERY_PARAM = "profile"
+# 采样间隔（秒）
+SAMPLE_INTERVAL = 0.005
+# 单次剖析的最长时间；页面中途出错、没有走到 finish_rerun 时，采样线程到时自行退出
+MAX_SECONDS = 120.0
+# 合并显示的第三方库（按模块名的顶层包判断）
+GROUPED_PACKAGES = ("matplotlib", "numpy", "streamlit")
+# 进程内保留的最近剖析结果个数
+KEEP = 5
+
+
+@dataclass
+class ProfileCapture:
+    """一次重跑的剖析结果。"""
+    page: str
+    started: float
+    wall_seconds: float = 0.0
+    stats: bytes = b""
+    folded: Counter = field(default_factory=Counter)
+    samples: int = 0
+
+    @property
+    def folded_text(self) -> str:
+        """折叠栈文本：每行“帧;帧;…;帧 次数”，从最外层到最内层。"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.folded.most_common())
+
+    def pstats(self, stream=None) -> pstats.Stats:
+        """把 cProfile 结果还原成 pstats.Stats。"""
+        stats = pstats.Stats(stream=stream)
+        stats.stats = marshal.loads(self.stats)
+        stats.get_top_level_stats()
+        return stats
+
+
+PROFILES: deque = deque(maxlen=KEEP)
+# 脚本线程 → (剖析结果, cProfile, 采样线程的停止事件, 开始时刻)
+_ACTIVE: dict = {}
+_lock = threading.Lock()
+
+
+def _package(module_name: str) -> str:
+    return module_name.split(".", 1)[0]
+
+
+def _frame_label(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    package = _package(module)
+    if package in GROUPED_PACKAGES:
+        return f"[{package}]"
+    code = frame.f_code
+    if module == "__main__":
+        module = os.path.basename(code.co_filename)
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def fold_stack(frame) -> str:
+    """把一个调用栈折叠成一行：外层在前，相邻的同组库帧合并。"""
+    labels = []
+    while frame is not None:
+        label = _frame_label(frame)
+        if not (labels and label.startswith("[") and labels[-1] == label):
+            labels.append(label)
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _sample(thread_id: int, capture: ProfileCapture, stop: threading.Event) -> None:
+    deadline = time.perf_counter() + MAX_SECONDS
+    while not stop.wait(SAMPLE_INTERVAL) and time.perf_counter() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:  # 脚本线程已经结束（页面中途出错，没有走到 finish_rerun）
+            with _lock:
+                if _ACTIVE.get(thread_id, (None,))[0] is capture:
+                    del _ACTIVE[thread_id]
+            break
+        capture.folded[fold_stack(frame)] += 1
+        capture.samples += 1
+
+
+def profile_requested() -> bool:
+    """当前请求是否带着正确的剖析令牌。"""
+    if PROFILE_TOKEN is None:
+        return False
+    import streamlit as st
+
+    given = st.query_params.get(QUERY_PARAM)
+    return given is not None and hmac.compare_digest(given.encode(), PROFILE_TOKEN.encode())
+
+
+def start_profile(page: str) -> bool:
+    """令牌正确时开始剖析当前脚本线程（在 track_rerun 的末尾调用）。
+
+    Returns:
+        是否开始了剖析。
+    """
+    if PROFILE_TOKEN is None or not profile_requested():
+        return False
+    thread_id = threading.get_ident()
+    capture = ProfileCapture(page, time.time())
+    stop = threading.Event()
+    profile = cProfile.Profile()
+    with _lock:
+        if thread_id in _ACTIVE:
+            return False
+        _ACTIVE[thread_id] = (capture, profile, stop, time.perf_counter())
+    try:
+        profile.enable()
+    except ValueError:
+        # Python 3.12 起一个进程同时只能有一个剖析器，另一个会话正在剖析
+        with _lock:
+            del _ACTIVE[thread_id]
+        import streamlit as st
+
+        st.warning("另一个会话正在剖析，本次重跑没有剖析；稍后刷新页面再试。", icon="⏱️")
+        return False
+    threading.Thread(target=_sample, args=(thread_id, capture, stop),
+                     name="p2j-profile-sampler", daemon=True).start()
+    return True
+
+
+def stop_profile() -> Optional[ProfileCapture]:
+    """结束当前脚本线程的剖析并保存结果；没有进行中的剖析时返回 None。"""
+    if not _ACTIVE:
+        return None
+    with _lock:
+        entry = _ACTIVE.pop(threading.get_ident(), None)
+    if entry is None:
+        return None
+    capture, profile, stop, started = entry
+    profile.disable()
+    stop.set()
+    capture.wall_seconds = time.perf_counter() - started
+    profile.create_stats()
+    capture.stats = marshal.dumps(profile.stats)
+    PROFILES.append(capture)
+    return capture
+
+
+def group_summary(capture: ProfileCapture) -> list[dict]:
+    """按来源汇总 cProfile 的自身耗时：三个合并的库、本项目代码、其他（内置函数与标准库）。"""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    totals: Counter = Counter()
+    calls: Counter = Counter()
+    for (filename, _, _), (_, ncalls, tottime, _, _) in capture.pstats().stats.items():
+        group = "其他（内置函数、标准库）"
+        for package in GROUPED_PACKAGES:
+            if f"{os.sep}{package}{os.sep}" in filename:
+                group = package
+                break
+        else:
+            if filename.startswith(project_root) and "site-packages" not in filename:
+                group = "本项目"
+        totals[group] += tottime
+        calls[group] += ncalls
+    return [{"来源": group, "自身耗时(s)": round(seconds, 4), "调用次数": calls[group]}
+            for group, seconds in totals.most_common()]
+
+
+def top_functions(capture: ProfileCapture, limit: int = 15) -> str:
+    """按累计耗时排序的前 limit 个函数（pstats 文本）。"""
+    buf = io.StringIO()
+    capture.pstats(stream=buf).sort_stats("cumulative").print_stats(limit)
+    return buf.getvalue()
+
+
+def show_profile(capture: ProfileCapture) -> None:
+    """在页面底部显示剖析报告和下载按钮，并移除查询参数，保证只剖析一次。"""
+    import streamlit as st
+
+    if QUERY_PARAM in st.query_params:
+        del st.query_params[QUERY_PARAM]
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(capture.started))
+    with st.expander(f"⏱️ 本次重跑的性能剖析（{capture.page}）", expanded=True):
+        st.write(f"重跑耗时 {capture.wall_seconds:.3f} 秒（含剖析开销），"
+                 f"采样 {capture.samples} 次。")
+        st.dataframe(group_summary(capture), hide_index=True)
+        st.code(top_functions(capture), language="text")
+        col1, col2 = st.columns(2)
+        with col1:
+            # marshal 序列化的统计字典正是 .prof 文件的格式
+            st.download_button("下载 .prof（cProfile）", capture.stats,
+                               file_name=f"{capture.page}-{stamp}.prof",
+                               mime="application/octet-stream", on_click="ignore")
+        with col2:
+            st.download_button("下载折叠栈（火焰图）", capture.folded_text,
+                               file_name=f"{capture.page}-{stamp}.folded",
+                               mime="text/plain", on_click="ignore")
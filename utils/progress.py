@@ -0,0 +1,331 @@
+"""
+progress.py
+
+学习进度存储：记录每一次答题（谁、哪道题、答了什么、对不对、用了多久）。
+
+数据写入本地 SQLite（WAL 模式）。答题发生在脚本线程里，不能让一次点击去等磁盘：
+
+- record() 只把一条记录追加到内存缓冲区，立即返回；
+- 后台写线程每隔 FLUSH_INTERVAL 秒（或缓冲区攒满 BATCH_SIZE 条时提前）把缓冲区
+  整批写入，一个事务一次 executemany；
+- 缓冲区有上限 MAX_BUFFER，磁盘长时间不可写时丢弃最旧的记录并计数，不会无限占内存；
+- 进程退出时（atexit）把剩余记录写完。
+
+读取（看板）走独立的只读连接，WAL 模式下读写互不阻塞；按学生、按题目、按时间
+的查询都有索引。刚提交的答案最多延迟 FLUSH_INTERVAL 秒出现在看板上。
+
+学生身份：地址里的 ``?learner=<学号>`` 优先，可以跨会话、跨设备累计；没有时用本会话
+的随机标识，只在本次打开期间有效。
+
+环境变量：
+    P2J_PROGRESS_DB  数据库文件路径，默认为项目根目录下的 data/progress.db；
+                     设为空字符串时关闭记录
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import closing
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import Optional
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# 两次批量写入之间的最长间隔（秒）
+FLUSH_INTERVAL = 1.0
+# 缓冲区攒到这么多条时提前写入
+BATCH_SIZE = 200
+# 缓冲区上限，超出时丢弃最旧的记录
+MAX_BUFFER = 20_000
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / "progress.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id       INTEGER PRIMARY KEY,
+    created  REAL NOT NULL,     -- 提交时间（Unix 秒）
+    learner  TEXT NOT NULL,
+    page     TEXT NOT NULL,
+    slot     TEXT NOT NULL,     -- 页面上的答题位置，例如 practice1、challenge
+    question TEXT NOT NULL,     -- 题目标识，例如 bird_head#1234
+    answer   REAL,
+    expected TEXT,
+    correct  INTEGER,           -- 1 对、0 错；NULL 表示不判对错（如计算器）
+    seconds  REAL               -- 从题目首次出现到提交的秒数
+);
+CREATE INDEX IF NOT EXISTS attempts_learner ON attempts (learner, created);
+CREATE INDEX IF NOT EXISTS attempts_question ON attempts (page, question, created);
+CREATE INDEX IF NOT EXISTS attempts_created ON attempts (created);
+"""
+
+
+@dataclass(frozen=True)
+class Attempt:
+    """一次答题记录。字段顺序与 attempts 表的列一致（不含 id）。"""
+    created: float
+    learner: str
+    page: str
+    slot: str
+    question: str
+    answer: Optional[float]
+    expected: Optional[str]
+    correct: Optional[bool]
+    seconds: Optional[float]
+
+
+class ProgressStore:
+    """带写后缓冲的 SQLite 进度存储。"""
+
+    def __init__(self, path: str | Path, flush_interval: float = FLUSH_INTERVAL,
+                 batch_size: int = BATCH_SIZE, max_buffer: int = MAX_BUFFER):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._buffer: deque = deque(maxlen=max_buffer)
+        self._cond = threading.Condition()
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self, readonly: bool = False) -> sqlite3.Connection:
+        if readonly:
+            conn = sqlite3.connect(f"{self.path.as_uri()}?mode=ro", uri=True, timeout=5.0)
+        else:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            # WAL 下 NORMAL 足够安全（断电最多丢最后一批），写入快得多
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ---- 写入 ----
+
+    def record(self, attempt: Attempt) -> None:
+        """追加一条记录（不做任何磁盘操作，立即返回）。"""
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(attempt)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="p2j-progress-writer",
+                                                daemon=True)
+                self._writer.start()
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+    def _run(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                with self._cond:
+                    if not self._closed and len(self._buffer) < self.batch_size:
+                        self._cond.wait(self.flush_interval)
+                    batch = list(self._buffer)
+                    self._buffer.clear()
+                    closed = self._closed
+                if batch:
+                    self._write(conn, batch)
+                if closed:
+                    return
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: list) -> None:
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO attempts (created, learner, page, slot, question, answer, "
+                    "expected, correct, seconds) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [astuple(a) for a in batch])
+            self.written += len(batch)
+        except sqlite3.Error:
+            # 写失败时放回缓冲区等下一轮；缓冲区放不下的部分会被丢弃
+            logger.exception("进度写入失败，%d 条记录留待重试", len(batch))
+            with self._cond:
+                self._buffer.extendleft(reversed(batch))
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """同步写入缓冲区中的全部记录（测试、看板“立即刷新”与退出时使用）。"""
+        with self._cond:
+            batch = list(self._buffer)
+            self._buffer.clear()
+        if batch:
+            with closing(self._connect()) as conn:
+                conn.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+                self._write(conn, batch)
+
+    def close(self) -> None:
+        """停止后台写线程并写完剩余记录。"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            writer = self._writer
+        if writer is not None:
+            writer.join(timeout=10.0)
+        self.flush()
+
+    @property
+    def pending(self) -> int:
+        """缓冲区中尚未写入的记录数。"""
+        with self._cond:
+            return len(self._buffer)
+
+    # ---- 读取（看板） ----
+
+    def _query(self, sql: str, params: tuple = ()) -> list[dict]:
+        try:
+            with closing(self._connect(readonly=True)) as conn:
+                return [dict(row) for row in conn.execute(sql, params)]
+        except sqlite3.OperationalError:
+            logger.exception("进度查询失败")
+            return []
+
+    def totals(self, since: float = 0.0) -> dict:
+        """总体统计：答题次数、学生数、判分题正确率、平均用时。"""
+        rows = self._query(
+            "SELECT COUNT(*) AS attempts, COUNT(DISTINCT learner) AS learners, "
+            "AVG(correct) AS accuracy, AVG(seconds) AS avg_seconds "
+            "FROM attempts WHERE created >= ?", (since,))
+        return rows[0] if rows else {"attempts": 0, "learners": 0, "accuracy": None,
+                                     "avg_seconds": None}
+
+    def by_question(self, page: Optional[str] = None, since: float = 0.0,
+                    limit: int = 50) -> list[dict]:
+        """按题目汇总：作答次数、正确率、平均用时与学生数，按作答次数降序。"""
+        where, params = "created >= ?", [since]
+        if page:
+            where += " AND page = ?"
+            params.append(page)
+        return self._query(
+            f"SELECT page, question, COUNT(*) AS attempts, AVG(correct) AS accuracy, "
+            f"AVG(seconds) AS avg_seconds, COUNT(DISTINCT learner) AS learners "
+            f"FROM attempts WHERE {where} GROUP BY page, question "
+            f"ORDER BY attempts DESC LIMIT ?", (*params, limit))
+
+    def by_page(self, since: float = 0.0) -> list[dict]:
+        """按页面与答题位置汇总。"""
+        return self._query(
+            "SELECT page, slot, COUNT(*) AS attempts, AVG(correct) AS accuracy, "
+            "AVG(seconds) AS avg_seconds FROM attempts WHERE created >= ? "
+            "GROUP BY page, slot ORDER BY page, slot", (since,))
+
+    def learner_history(self, learner: str, limit: int = 100) -> list[dict]:
+        """某个学生最近的答题记录，新的在前。"""
+        return self._query(
+            "SELECT created, page, slot, question, answer, expected, correct, seconds "
+            "FROM attempts WHERE learner = ? ORDER BY created DESC LIMIT ?", (learner, limit))
+
+    def recent(self, limit: int = 50) -> list[dict]:
+        """全体最近的答题记录，新的在前。"""
+        return self._query(
+            "SELECT created, learner, page, slot, question, answer, correct, seconds "
+            "FROM attempts ORDER BY created DESC LIMIT ?", (limit,))
+
+
+_store: Optional[ProgressStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Optional[ProgressStore]:
+    """进程内共享的进度存储（首次调用时打开）；关闭记录或打开失败时为 None。"""
+    global _store
+    if _store is not None:
+        return _store
+    path = os.environ.get("P2J_PROGRESS_DB", str(DEFAULT_PATH))
+    if not path:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = ProgressStore(path)
+            except (OSError, sqlite3.Error):
+                logger.exception("无法打开进度数据库 %s，本进程不记录答题", path)
+                return None
+            atexit.register(_store.close)
+    return _store
+
+
+REGISTRY.gauge("p2j_progress_pending", "进度缓冲区中尚未写入的答题记录数",
+               lambda: _store.pending if _store else 0)
+REGISTRY.gauge("p2j_progress_written_total", "已写入数据库的答题记录数",
+               lambda: _store.written if _store else 0, kind="counter")
+REGISTRY.gauge("p2j_progress_dropped_total", "缓冲区溢出丢弃的答题记录数",
+               lambda: _store.dropped if _store else 0, kind="counter")
+
+
+# ---- 页面辅助函数 ----
+
+def current_learner() -> str:
+    """当前学生的标识：地址里的 learner 参数，否则为本会话的随机标识。"""
+    import streamlit as st
+
+    learner = st.query_params.get("learner")
+    if learner:
+        return learner.strip()[:64]
+    if "progress_learner" not in st.session_state:
+        st.session_state.progress_learner = f"anon-{uuid.uuid4().hex[:12]}"
+    return st.session_state.progress_learner
+
+
+def question_shown(slot: str, question: str) -> None:
+    """题目出现在页面上时调用，记下首次出现的时间，用于计算答题用时。"""
+    import streamlit as st
+
+    shown = st.session_state.setdefault("progress_shown", {})
+    if shown.get(slot, (None,))[0] != question:
+        shown[slot] = (question, time.time())
+
+
+def record_answer(page: str, slot: str, question: str, answer: Optional[float],
+                  expected: Optional[str] = None, correct: Optional[bool] = None) -> None:
+    """记录一次答题（只写内存缓冲区，不阻塞重跑）。
+
+    Args:
+        page: 页面名。
+        slot: 页面上的答题位置。
+        question: 题目标识。
+        answer: 学生的答案。
+        expected: 正确答案的展示文本。
+        correct: 是否答对；不判对错的操作传 None。
+    """
+    import streamlit as st
+
+    store = get_store()
+    if store is None:
+        return
+    now = time.time()
+    shown = st.session_state.get("progress_shown", {}).get(slot)
+    seconds = now - shown[1] if shown and shown[0] == question else None
+    store.record(Attempt(now, current_learner(), page, slot, question,
+                         None if answer is None else float(answer), expected,
+                         correct, seconds))
+
+
+def format_rows(rows: list[dict]) -> list[dict]:
+    """看板表格的显示格式：正确率换成百分数、用时保留一位小数、时间戳换成可读时间。"""
+    for row in rows:
+        if "created" in row:
+            row["created"] = time.strftime("%m-%d %H:%M:%S", time.localtime(row["created"]))
+        if row.get("accuracy") is not None:
+            row["accuracy"] = f"{row['accuracy']:.0%}"
+        for name in ("avg_seconds", "seconds"):
+            if row.get(name) is not None:
+                row[name] = round(row[name], 1)
+        if row.get("correct") is not None:
+            row["correct"] = "✅" if row["correct"] else "❌"
+    return rows
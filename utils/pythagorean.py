@@ -0,0 +1,234 @@
+"""
+pythagorean.py
+
+勾股数引擎：用欧几里得公式流式枚举勾股数（整数边直角三角形）。
+
+欧几里得公式：对互素、一奇一偶的 m > n > 0，
+    a = m² − n²,  b = 2mn,  c = m² + n²
+给出全部本原勾股数；本原勾股数乘以 k = 1, 2, … 得到全部勾股数。
+
+枚举按 m 分块向量化进行，每块处理的元素个数有固定上限（CHUNK_ELEMENTS），
+因此无论上界 N 多大，内存占用都是常数；计数和直方图只累加标量/定长数组。
+"""
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from typing import Iterator, Optional
+
+import numpy as np
+
+# 每个分块最多处理的 (m, n) 组合数，决定了内存上限
+CHUNK_ELEMENTS = 1 << 18
+
+
+def _m_blocks(limit: int) -> Iterator[tuple[int, int]]:
+    """把 m 的取值范围 [2, √limit] 切成若干块，每块的 (m, n) 网格不超过 CHUNK_ELEMENTS。"""
+    m_max = math.isqrt(max(limit - 1, 0))
+    m = 2
+    while m <= m_max:
+        rows = max(1, CHUNK_ELEMENTS // m_max)
+        yield m, min(m + rows, m_max + 1)
+        m += rows
+
+
+def iter_primitive_triples(limit: int) -> Iterator[np.ndarray]:
+    """流式枚举斜边不超过 limit 的全部本原勾股数。
+
+    Args:
+        limit: 斜边上界 N。
+
+    Yields:
+        形状 (K, 3) 的 int64 数组，每行 (a, b, c) 满足 a < b < c。
+    """
+    for m_lo, m_hi in _m_blocks(limit):
+        m = np.arange(m_lo, m_hi, dtype=np.int64)[:, None]
+        n = np.arange(1, m_hi, dtype=np.int64)[None, :]
+        c = m * m + n * n
+        ok = (n < m) & ((m - n) % 2 == 1) & (c <= limit) & (np.gcd(m, n) == 1)
+        mm, nn = np.broadcast_arrays(m, n)
+        mm, nn = mm[ok], nn[ok]
+        if mm.size == 0:
+            continue
+        a = mm * mm - nn * nn
+        b = 2 * mm * nn
+        yield np.stack([np.minimum(a, b), np.maximum(a, b), mm * mm + nn * nn], axis=1)
+
+
+def iter_triples(limit: int, primitive: bool = False) -> Iterator[np.ndarray]:
+    """流式枚举斜边不超过 limit 的勾股数。
+
+    Args:
+        limit: 斜边上界 N。
+        primitive: 为 True 时只枚举本原勾股数。
+
+    Yields:
+        形状 (K, 3) 的 int64 数组，每块不超过 CHUNK_ELEMENTS 行。
+    """
+    for block in iter_primitive_triples(limit):
+        if primitive:
+            yield block
+            continue
+        multiples = limit // block[:, 2]
+        # 按倍数个数切分，保证展开后的每一块都不超过内存上限
+        ends = np.cumsum(multiples)
+        start = 0
+        while start < len(block):
+            base = ends[start - 1] if start else 0
+            stop = int(np.searchsorted(ends, base + CHUNK_ELEMENTS, side="right"))
+            if stop <= start:
+                # 单个小勾股数（如 3,4,5）的倍数就超过上限时，按 k 再切片
+                for k0 in range(1, int(multiples[start]) + 1, CHUNK_ELEMENTS):
+                    k = np.arange(k0, min(k0 + CHUNK_ELEMENTS, int(multiples[start]) + 1),
+                                  dtype=np.int64)
+                    yield block[start] * k[:, None]
+                start += 1
+                continue
+            part, reps = block[start:stop], multiples[start:stop]
+            k = np.arange(reps.sum(), dtype=np.int64) - np.repeat(np.cumsum(reps) - reps, reps) + 1
+            yield np.repeat(part, reps, axis=0) * k[:, None]
+            start = stop
+
+
+def count_triples(limit: int, primitive: bool = False) -> int:
+    """统计斜边不超过 limit 的勾股数个数（不展开倍数）。"""
+    total = 0
+    for block in iter_primitive_triples(limit):
+        total += len(block) if primitive else int((limit // block[:, 2]).sum())
+    return total
+
+
+def hypotenuse_histogram(limit: int, bins: int = 50,
+                         primitive: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """斜边长度分布的直方图（定长数组累加，内存与 limit 无关）。
+
+    Args:
+        limit: 斜边上界 N。
+        bins: 分箱个数。
+        primitive: 为 True 时只统计本原勾股数。
+
+    Returns:
+        (counts, edges)，与 np.histogram 的返回值含义相同。
+    """
+    edges = np.linspace(0, limit, bins + 1)
+    counts = np.zeros(bins, dtype=np.int64)
+    for block in iter_triples(limit, primitive=primitive):
+        counts += np.histogram(block[:, 2], bins=edges)[0]
+    return counts, edges
+
+
+def sample_primitive_legs(limit: int, max_points: int = 200_000,
+                          seed: int = 0) -> np.ndarray:
+    """从全部本原勾股数中均匀抽取至多 max_points 个 (a, b)，用于画散点图。
+
+    先数总数，再按固定比例在每个分块内抽样，内存只与 max_points 有关。
+    """
+    total = count_triples(limit, primitive=True)
+    rate = min(1.0, max_points / max(total, 1))
+    rng = np.random.default_rng(seed)
+    parts = []
+    for block in iter_primitive_triples(limit):
+        if rate < 1.0:
+            block = block[rng.random(len(block)) < rate]
+        parts.append(block[:, :2])
+    return np.concatenate(parts) if parts else np.empty((0, 2), dtype=np.int64)
+
+
+@lru_cache(maxsize=8)
+def triple_statistics(limit: int) -> dict:
+    """勾股数探索页的汇总：斜边分布、总数与本原勾股数 (a, b) 抽样。
+
+    结果按 limit 在进程内缓存、所有会话共享，调用方不要修改其中的数组。
+    """
+    counts, edges = hypotenuse_histogram(limit, bins=60)
+    prim_counts, _ = hypotenuse_histogram(limit, bins=60, primitive=True)
+    return {
+        "total": int(counts.sum()),
+        "primitive": count_triples(limit, primitive=True),
+        "counts": counts,
+        "prim_counts": prim_counts,
+        "edges": edges,
+        "legs": sample_primitive_legs(limit, max_points=50_000),
+    }
+
+
+def _factorize(n: int) -> dict[int, int]:
+    """试除法分解质因数。"""
+    factors: dict[int, int] = {}
+    d = 2
+    while d * d <= n:
+        while n % d == 0:
+            factors[d] = factors.get(d, 0) + 1
+            n //= d
+        d += 1 if d == 2 else 2
+    if n > 1:
+        factors[n] = factors.get(n, 0) + 1
+    return factors
+
+
+def _divisors(factors: dict[int, int]) -> np.ndarray:
+    """由质因数分解生成全部因数（升序）。"""
+    divs = np.array([1], dtype=np.int64)
+    for p, e in factors.items():
+        powers = p ** np.arange(e + 1, dtype=np.int64)
+        divs = (divs[:, None] * powers[None, :]).ravel()
+    return np.sort(divs)
+
+
+def triples_with_leg(a: int) -> np.ndarray:
+    """含有直角边 a 的全部勾股数。
+
+    由 a² = (c − b)(c + b)，枚举 a² 的因数 d < a，令 c − b = d、c + b = a²/d，
+    两者同奇偶时得到一组解。
+
+    Args:
+        a: 直角边长度（正整数）。
+
+    Returns:
+        形状 (K, 3) 的数组，每行 (a, b, c)，按 b 升序。
+    """
+    if a < 3:
+        return np.empty((0, 3), dtype=np.int64)
+    factors = {p: 2 * e for p, e in _factorize(a).items()}
+    d = _divisors(factors)
+    d = d[d < a]
+    e = (a * a) // d
+    d, e = d[(e - d) % 2 == 0], e[(e - d) % 2 == 0]
+    b, c = (e - d) // 2, (e + d) // 2
+    order = np.argsort(b)
+    return np.stack([np.full(len(b), a, dtype=np.int64), b[order], c[order]], axis=1)
+
+
+def triples_with_hypotenuse(c: int) -> np.ndarray:
+    """斜边为 c 的全部勾股数（即共享同一条斜边的所有直角三角形）。
+
+    对 c 的每个因数 h，找出斜边为 h 的本原勾股数 (m² + n² = h)，再放大 c/h 倍。
+
+    Args:
+        c: 斜边长度（正整数）。
+
+    Returns:
+        形状 (K, 3) 的数组，每行 (a, b, c)，a < b，按 a 升序。
+    """
+    rows = []
+    for h in _divisors(_factorize(c)) if c > 1 else []:
+        h = int(h)
+        m = np.arange(math.isqrt(h // 2) + 1, math.isqrt(h) + 1, dtype=np.int64)
+        n2 = h - m * m
+        n = np.round(np.sqrt(n2)).astype(np.int64)
+        ok = (n > 0) & (n * n == n2) & (n < m) & ((m - n) % 2 == 1) & (np.gcd(m, n) == 1)
+        m, n = m[ok], n[ok]
+        k = c // h
+        a, b = (m * m - n * n) * k, 2 * m * n * k
+        rows.append(np.stack([np.minimum(a, b), np.maximum(a, b), np.full(len(m), c)], axis=1))
+    if not rows:
+        return np.empty((0, 3), dtype=np.int64)
+    out = np.concatenate(rows)
+    return out[np.argsort(out[:, 0])]
+
+
+def integer_hypotenuse(a: int, b: int) -> Optional[int]:
+    """若直角边 a、b 的斜边是整数则返回它，否则返回 None。"""
+    c2 = a * a + b * b
+    c = math.isqrt(c2)
+    return c if c * c == c2 else None
@@ -0,0 +1,667 @@
+"""
+render.py
+
+模型图像的渲染缓存：按 (模型名, 规范化参数) 缓存编码好的 PNG 字节串。
+
+同一组滑块取值在所有会话之间只渲染一次；缓存是进程级的 LRU，容量由环境变量
+P2J_RENDER_CACHE_SIZE 控制（默认 256 张图）。所有操作都加锁，可以在多个脚本
+线程之间安全共享。
+
+一个页面里往往有好几张互不依赖的图。它们可以写成 FigureJob 交给 FigureBatch：
+文字和控件照常立即输出，每张图先占一个与成图等比例的占位框；缓存命中的当场填上，
+未命中的分发到渲染工作进程并发绘制，哪张先画完先填哪张。学生看到页面文字的时间
+因此与图的数量无关。用进程而不是线程，是因为绘图主要是持有 GIL 的 Python 代码，
+而且 Matplotlib 的 mathtext 解析器与字体对象不是线程安全的。工作进程数由
+P2J_RENDER_WORKERS 控制，默认 min(4, CPU 数 − 1)；为 0 时（例如单核机器）
+在当前进程里持有 MPL_LOCK 串行渲染。
+
+课堂上老师一句“大家都把 a 设成 3、b 设成 4”，几十个会话会在同一秒请求同一张图；
+第一张还没画完时缓存里没有它，每个会话都会各自再画一遍。submit_many 因此对缓存
+未命中做单飞（single-flight）合并：同一个缓存键同时只有一次渲染在进行，后来的
+请求直接等待这次渲染的结果。
+"""
+from __future__ import annotations
+
+import html
+import logging
+import multiprocessing
+import os
+import pickle
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Iterator, Optional
+
+from utils.figures import MPL_LOCK, FigureSpec, encode_png, spec_to_png
+from utils.fonts import active_font_setup, setup_custom_font
+from utils.metrics import ENCODE_BYTES, REGISTRY, RENDER_ERRORS, RENDER_SECONDS
+from utils.models import get_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 256
+# 不知道成图尺寸时，占位框按这个 figsize 的比例
+DEFAULT_FIGSIZE = (10, 6)
+
+
+class RenderCache:
+    """线程安全的 LRU 缓存，并记录命中、未命中与淘汰次数。"""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """取出缓存项并把它移到最近使用的位置；不存在时返回 None。"""
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        """写入缓存项，超出容量时淘汰最久未使用的项。"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def peek(self, key: Hashable) -> Optional[bytes]:
+        """取出缓存项，但不计入命中统计，也不调整 LRU 顺序。"""
+        with self._lock:
+            return self._data.get(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        """缓存中 PNG 数据的总字节数。"""
+        with self._lock:
+            return sum(len(v) for v in self._data.values())
+
+    def stats(self) -> dict:
+        """当前的统计数据。"""
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
+
+    def clear(self) -> None:
+        """清空缓存与统计。"""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+RENDER_CACHE = RenderCache(int(os.environ.get("P2J_RENDER_CACHE_SIZE", DEFAULT_CACHE_SIZE)))
+
+# 命中/未命中/淘汰次数由 RenderCache 自己累计，抓取时读出，按计数器类型暴露
+for _stat, _desc in (("hits", "命中"), ("misses", "未命中"), ("evictions", "淘汰")):
+    REGISTRY.gauge(f"p2j_render_cache_{_stat}_total", f"渲染缓存累计{_desc}次数",
+                   lambda stat=_stat: RENDER_CACHE.stats()[stat], kind="counter")
+REGISTRY.gauge("p2j_render_cache_entries", "渲染缓存中的图片数", RENDER_CACHE.__len__)
+REGISTRY.gauge("p2j_render_cache_bytes", "渲染缓存中 PNG 数据的总字节数",
+               lambda: RENDER_CACHE.nbytes)
+
+
+def cache_key(name: str, params: dict) -> tuple:
+    """由模型名和规范化参数组成的缓存键。"""
+    return (name, tuple(sorted(params.items())))
+
+
+@dataclass(frozen=True)
+class FigureJob:
+    """一张图的渲染任务。
+
+    Attributes:
+        func: 模块级函数，返回 FigureSpec 或 Matplotlib 图像（须可 pickle）。
+        args: 位置参数。
+        kwargs: 关键字参数，按键排序的 (键, 值) 元组。
+        key: 缓存键；None 表示不缓存。
+        dpi: 返回 Matplotlib 图像时的编码分辨率。
+        figsize: 成图的 (宽, 高) 英寸数，只用于确定占位框的比例；None 表示未知。
+    """
+    func: Callable
+    args: tuple = ()
+    kwargs: tuple = ()
+    key: Optional[Hashable] = None
+    dpi: int = 100
+    figsize: Optional[tuple] = field(default=None, compare=False)
+
+    @property
+    def label(self) -> str:
+        """指标里使用的图名：模型图为 model:<模型名>，其余为绘图函数名。"""
+        if self.func is _model_spec:
+            return f"model:{self.args[0]}"
+        if self.func is _identity:
+            return "spec"
+        return getattr(self.func, "__qualname__", repr(self.func))
+
+    def run(self) -> bytes:
+        """在当前进程里绘制并编码。"""
+        with MPL_LOCK:
+            result = self.func(*self.args, **dict(self.kwargs))
+            if isinstance(result, FigureSpec):
+                return spec_to_png(result)
+            return encode_png(result, dpi=self.dpi)
+
+
+def _model_spec(name: str, params: tuple) -> FigureSpec:
+    model = get_model(name)
+    params = dict(params)
+    return model.figure(params, model.compute(**params))
+
+
+def _identity(spec: FigureSpec) -> FigureSpec:
+    return spec
+
+
+# 脚本线程 → 本次重跑里构造过的模型图 [(模型名, 规范化参数)]，由 utils.prefetch 开启与取走
+_CAPTURED: dict[int, list] = {}
+
+
+def capture_model_jobs() -> None:
+    """开始记录当前线程构造的模型图任务（重跑开头调用，覆盖上一次的记录）。"""
+    _CAPTURED[threading.get_ident()] = []
+
+
+def captured_model_jobs() -> list[tuple[str, dict]]:
+    """取走当前线程记录的 (模型名, 规范化参数) 列表并停止记录。"""
+    return _CAPTURED.pop(threading.get_ident(), [])
+
+
+def model_job(name: str, **params) -> FigureJob:
+    """某个模型在给定参数下的图像任务（参数先规范化，与 render_png 共用缓存）。"""
+    model = get_model(name)
+    params = model.normalize(params)
+    key = cache_key(name, params)
+    captured = _CAPTURED.get(threading.get_ident())
+    if captured is not None:
+        captured.append((name, params))
+    # 构造图纸只是组装数据，很便宜；真正费时的绘制与编码留给渲染进程
+    figsize = model.figure(params, model.compute(**params)).figsize
+    return FigureJob(_model_spec, (name, key[1]), key=key, figsize=figsize)
+
+
+def spec_job(spec: FigureSpec) -> FigureJob:
+    """一份现成图纸的渲染任务（图纸本身作为缓存键）。"""
+    return FigureJob(_identity, (spec,), key=("spec", spec), figsize=spec.figsize)
+
+
+def figure_job(func: Callable, *args, key: Optional[Hashable] = None,
+               size_hint: Optional[tuple] = None, **kwargs) -> FigureJob:
+    """任意绘图函数的渲染任务。
+
+    Args:
+        func: 模块级绘图函数，返回 FigureSpec 或 Matplotlib 图像。
+        *args, **kwargs: 传给 func 的参数。
+        key: 缓存键。缺省时由函数名与参数组成；参数不可哈希（如数组）时不缓存，
+            这种情况应显式给出 key。
+        size_hint: 成图的 figsize，用于占位框的比例；缺省按 DEFAULT_FIGSIZE。
+
+    Returns:
+        FigureJob。
+    """
+    kwargs = tuple(sorted(kwargs.items()))
+    if key is None:
+        key = ("figure", func.__module__, func.__qualname__, args, kwargs)
+        try:
+            hash(key)
+        except TypeError:
+            key = None
+    return FigureJob(func, args, kwargs, key=key, figsize=size_hint)
+
+
+def _run_job(job: FigureJob) -> tuple[bytes, float]:
+    # 在执行任务的进程里计时，排队与进程间传输不计入
+    start = time.perf_counter()
+    png = job.run()
+    return png, time.perf_counter() - start
+
+
+def _call_inline(future: Future, func: Callable, args: tuple) -> None:
+    try:
+        future.set_result(func(*args))
+    except Exception as exc:  # 与进程池一致：异常交给 result() 抛出
+        future.set_exception(exc)
+
+
+def _copy_result(outer: Future, inner: Future) -> None:
+    exc = inner.exception()
+    if exc is not None:
+        outer.set_exception(exc)
+    else:
+        outer.set_result(inner.result())
+
+
+def _init_worker(font_setup: Optional[tuple]) -> None:
+    if font_setup is not None:
+        setup_custom_font(*font_setup)
+
+
+def default_workers() -> int:
+    """渲染工作进程数：P2J_RENDER_WORKERS，缺省为 min(4, CPU 数 − 1)。"""
+    value = os.environ.get("P2J_RENDER_WORKERS")
+    if value is not None:
+        return max(0, int(value))
+    return max(0, min(4, (os.cpu_count() or 1) - 1))
+
+
+POOL_BROKEN = REGISTRY.counter("p2j_render_pool_broken_total", "渲染进程池损坏、被丢弃重建的次数")
+# 替换 sys.modules["__main__"] 期间持有，避免两个线程交错替换、还原
+_MAIN_LOCK = threading.Lock()
+
+
+@contextmanager
+def _plain_main() -> Iterator[None]:
+    """spawn 工作进程期间把 sys.modules["__main__"] 换成一个空模块。
+
+    Streamlit 运行页面时把页面脚本作为 __main__ 放进 sys.modules（__file__ 是页面路径），
+    之后也不换回原来的模块。spawn 启动的子进程会按 __main__ 的 __file__ 把整个页面脚本
+    再执行一遍，页面里的渲染又要启动进程池，子进程在启动阶段就出错退出，进程池随之损坏。
+    空模块没有 __file__ 和 __spec__，子进程只导入任务函数所在的模块。
+    """
+    with _MAIN_LOCK:
+        main = sys.modules.get("__main__")
+        stub = types.ModuleType("__main__")
+        sys.modules["__main__"] = stub
+        try:
+            yield
+        finally:
+            # 其间另一个脚本线程开始运行时会放进自己的 __main__，不能把它覆盖掉
+            if sys.modules.get("__main__") is stub and main is not None:
+                sys.modules["__main__"] = main
+
+
+class RenderBackend:
+    """把渲染任务分发到工作进程池；进程池按需创建，损坏后自动重建。
+
+    工作进程用 spawn 方式启动，不继承服务进程里的线程与锁，也不执行页面脚本
+    （见 _plain_main）；启动时重放页面的字体设置。workers 为 0、任务无法 pickle
+    或进程池损坏时，submit 与 call 都退回当前进程串行执行。
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # 进程池任务失败后的进程内补渲染。完成回调跑在进程池的管理线程上，
+        # 在那里渲染会卡住其他任务的结果回传，所以交给这个单独的线程
+        self._fallback = ThreadPoolExecutor(max_workers=1, thread_name_prefix="p2j-render-inline")
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker, initargs=(active_font_setup(),))
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        POOL_BROKEN.inc()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, job: FigureJob) -> Future:
+        """提交一个任务，返回结果为 PNG 字节串的 Future。"""
+        return self._dispatch(_run_job, (job,), lambda future: self._run_inline(future, job),
+                              lambda outer, inner: self._finish(outer, inner, job))
+
+    def call(self, func: Callable, *args) -> Future:
+        """在渲染工作进程里执行任意模块级函数（例如整页组版），返回其结果的 Future。
+
+        与 submit 不同，结果原样返回，不经过缓存也不计入渲染指标。workers 为 0、
+        任务无法 pickle 或进程池损坏时，与 submit 一样改在当前进程里执行。
+        """
+        return self._dispatch(func, args, lambda future: _call_inline(future, func, args),
+                              _copy_result)
+
+    def _dispatch(self, func: Callable, args: tuple, inline: Callable[[Future], None],
+                  finish: Callable[[Future, Future], None]) -> Future:
+        """把 func(*args) 交给进程池；没有可用的进程池时调用 inline(future) 当场完成。
+
+        进程池正常执行完（得到结果或 func 自己抛出异常）时由 finish(outer, inner) 转交
+        结果；进程池损坏、任务无法 pickle 时改由 inline 在 _fallback 线程上补做。
+        """
+        outer: Future = Future()
+        if self.workers > 0:
+            pool = self._get_pool()
+            try:
+                # 进程池在 submit 时按需启动工作进程
+                with _plain_main():
+                    inner = pool.submit(func, *args)
+            except BrokenProcessPool:
+                logger.warning("渲染进程池已损坏，重建后本次改为进程内执行")
+                self._discard_pool(pool)
+            else:
+                outer.add_done_callback(lambda f: f.cancelled() and inner.cancel())
+                inner.add_done_callback(
+                    lambda f: self._settle(outer, f, pool, inline, finish))
+                return outer
+        inline(outer)
+        return outer
+
+    def _settle(self, outer: Future, inner: Future, pool: ProcessPoolExecutor,
+                inline: Callable[[Future], None],
+                finish: Callable[[Future, Future], None]) -> None:
+        # 完成回调，跑在进程池的管理线程上
+        if not outer.set_running_or_notify_cancel():
+            return
+        # 进程池被丢弃时，还在排队的任务会被取消，同样改为进程内执行
+        exc = None if inner.cancelled() else inner.exception()
+        if isinstance(exc, BrokenProcessPool):
+            logger.warning("渲染进程池已损坏，重建后本次改为进程内执行")
+            self._discard_pool(pool)
+        elif isinstance(exc, (pickle.PicklingError, AttributeError)):
+            # 多半是 func 不是模块级函数，无法发送到工作进程
+            logger.warning("任务无法在渲染工作进程中执行（%s），改为进程内执行", exc)
+        elif not inner.cancelled():
+            finish(outer, inner)
+            return
+        self._fallback.submit(inline, outer)
+
+    def _finish(self, outer: Future, inner: Future, job: FigureJob) -> None:
+        exc = inner.exception()
+        if exc is not None:
+            RENDER_ERRORS.inc(figure=job.label)
+            outer.set_exception(exc)
+        else:
+            self._deliver(outer, job, *inner.result())
+
+    def _run_inline(self, future: Future, job: FigureJob) -> None:
+        try:
+            png, seconds = _run_job(job)
+        except Exception as exc:  # 与进程池一致：异常交给 result() 抛出
+            RENDER_ERRORS.inc(figure=job.label)
+            future.set_exception(exc)
+        else:
+            self._deliver(future, job, png, seconds)
+
+    @staticmethod
+    def _deliver(future: Future, job: FigureJob, png: bytes, seconds: float) -> None:
+        RENDER_SECONDS.observe(seconds, figure=job.label)
+        ENCODE_BYTES.observe(len(png), figure=job.label)
+        future.set_result(png)
+
+    def shutdown(self) -> None:
+        """关闭进程池（下次提交时重新创建）。"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+RENDER_BACKEND = RenderBackend(default_workers())
+
+
+class _Flight:
+    """一次进行中的渲染：所有等待者共享的 Future 与等待者计数。"""
+
+    __slots__ = ("future", "label", "waiters")
+
+    def __init__(self, label: str):
+        self.future: Future = Future()
+        self.label = label
+        self.waiters = 1
+
+
+class SingleFlight:
+    """按缓存键合并并发的相同渲染请求。
+
+    同一个键同时只有一个“领头”请求真正提交渲染，其余请求拿到同一个 Future。
+    渲染成功时先写入 RENDER_CACHE 再移出进行中表，因此任何时刻一个键要么在缓存里，
+    要么在进行中表里，不会出现两者皆无、又被重新渲染的空档。渲染失败时所有等待者
+    收到同一个异常，结果不缓存，下一次请求会重新尝试。
+
+    返回的 Future 由多个会话共享，调用方不应取消它。
+    """
+
+    def __init__(self, cache: RenderCache, backend: RenderBackend):
+        self.cache = cache
+        self.backend = backend
+        self._flights: dict = {}
+        self._lock = threading.Lock()
+        # 进行中表变空时通知，供预取之类的低优先级任务等前台渲染让出
+        self._idle = threading.Condition(self._lock)
+
+    def submit(self, job: FigureJob) -> Future:
+        """提交一个带缓存键的任务；相同键已在渲染时加入等待。"""
+        with self._lock:
+            flight = self._flights.get(job.key)
+            if flight is not None:
+                flight.waiters += 1
+                COALESCED.inc(figure=job.label)
+                started = time.perf_counter()
+                flight.future.add_done_callback(
+                    lambda f: COALESCED_WAIT.observe(time.perf_counter() - started,
+                                                     figure=job.label))
+                return flight.future
+            # 未命中后、拿到领头权之前，别的领头请求可能刚好完成并写入了缓存
+            png = self.cache.peek(job.key)
+            if png is None:
+                flight = self._flights[job.key] = _Flight(job.label)
+        if png is not None:
+            future: Future = Future()
+            future.set_result(png)
+            return future
+        inner = self.backend.submit(job)
+        inner.add_done_callback(lambda f: self._land(job.key, flight, f))
+        return flight.future
+
+    def _land(self, key: Hashable, flight: _Flight, inner: Future) -> None:
+        exc = inner.exception()
+        if exc is None:
+            self.cache.put(key, inner.result())
+        with self._lock:
+            del self._flights[key]
+            waiters = flight.waiters
+            if not self._flights:
+                self._idle.notify_all()
+        FANOUT.observe(waiters, figure=flight.label)
+        if exc is None:
+            flight.future.set_result(inner.result())
+        else:
+            flight.future.set_exception(exc)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """等到没有进行中的渲染；超时返回 False。"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._flights, timeout)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+RENDER_FLIGHTS = SingleFlight(RENDER_CACHE, RENDER_BACKEND)
+
+COALESCED = REGISTRY.counter("p2j_render_coalesced_total",
+                             "缓存未命中、但加入了进行中的相同渲染的请求数", ("figure",))
+COALESCED_WAIT = REGISTRY.histogram("p2j_render_coalesced_wait_seconds",
+                                    "合并请求等待进行中渲染完成的时间", ("figure",))
+FANOUT = REGISTRY.histogram("p2j_render_fanout", "每次实际渲染服务的请求数（含领头请求）",
+                            ("figure",), buckets=(1, 2, 4, 8, 16, 32, 64))
+REGISTRY.gauge("p2j_render_inflight", "正在渲染（可被合并）的缓存键数", RENDER_FLIGHTS.__len__)
+
+
+def submit_many(jobs: list[FigureJob]) -> list[Future]:
+    """提交一批任务：缓存命中的直接完成，未命中的交给 RENDER_BACKEND 并发渲染。
+
+    带缓存键的任务经 RENDER_FLIGHTS 合并：其他会话正在渲染同一张图时，
+    直接等待那次渲染的结果。
+
+    Returns:
+        与 jobs 一一对应的 Future；渲染完成后结果自动写入 RENDER_CACHE。
+    """
+    return [submit(job) for job in jobs]
+
+
+def submit(job: FigureJob) -> Future:
+    """提交单个任务，规则同 submit_many。"""
+    png = RENDER_CACHE.get(job.key) if job.key is not None else None
+    if png is not None:
+        future: Future = Future()
+        future.set_result(png)
+        return future
+    return _submit_uncached(job)
+
+
+def _submit_uncached(job: FigureJob) -> Future:
+    if job.key is None:
+        return RENDER_BACKEND.submit(job)
+    return RENDER_FLIGHTS.submit(job)
+
+
+def render_many(jobs: list[FigureJob]) -> list[bytes]:
+    """并发渲染一批任务，按顺序返回 PNG 字节串。"""
+    return [future.result() for future in submit_many(jobs)]
+
+
+def render_png(name: str, **params) -> bytes:
+    """渲染某个模型在给定参数下的图像（带缓存）。
+
+    Args:
+        name: 模型注册名。
+        **params: 模型参数，缺省的取默认值。
+
+    Returns:
+        PNG 字节串，可直接交给 st.image。
+    """
+    return render_many([model_job(name, **params)])[0]
+
+
+def render_spec_png(spec: FigureSpec) -> bytes:
+    """渲染一份不属于任何模型参数组合的图纸（图纸本身作为缓存键）。"""
+    return render_many([spec_job(spec)])[0]
+
+
+# 占位框：与成图同宽高比的浅色方块，图画好后原地替换，页面不会跳动
+_PLACEHOLDER_HTML = (
+    '<div style="aspect-ratio:{w}/{h};width:100%;display:flex;align-items:center;'
+    'justify-content:center;background:#f4f5f7;border-radius:6px;color:#9aa0a6;">'
+    '🖼️ 图像生成中…</div>{caption}')
+_CAPTION_HTML = ('<div style="text-align:center;font-size:14px;color:#9aa0a6;'
+                 'padding-top:4px;">{}</div>')
+
+
+@dataclass
+class _Pending:
+    job: FigureJob
+    slot: object
+    caption: Optional[str]
+    image_kwargs: dict
+    future: Optional[Future] = None
+    png: Optional[bytes] = None
+    filled: bool = False
+
+
+class FigureBatch:
+    """页面级的渐进式出图：文字先行，图先占位，画好一张填一张。
+
+    用法::
+
+        figures = FigureBatch()
+        figures.image(model_job("pythagorean", a=3, b=4), caption="图示")
+        ...
+        figures.render()   # 放在页面末尾
+
+    image 在调用处放一个与成图等比例的占位框（在哪个容器里调用，图就出现在哪里）：
+
+    - 缓存命中的图当场填上；
+    - 有渲染工作进程时，未命中的图当场提交，页面脚本继续往下输出文字，
+      绘制与之并行；没有工作进程（在当前进程里渲染）时推迟到 render 再画，
+      不让绘图挡住后面的文字；
+    - render 等待其余的图，哪张先画完先填哪张；某张图渲染失败时只在它的位置
+      显示错误，不影响其他图。
+
+    Args:
+        eager: 是否在 image 时就提交渲染；缺省为“有渲染工作进程时提交”。
+    """
+
+    def __init__(self, eager: Optional[bool] = None):
+        self.eager = RENDER_BACKEND.workers > 0 if eager is None else eager
+        self._items: list[_Pending] = []
+
+    def image(self, job: FigureJob, caption: Optional[str] = None, container=None,
+              **image_kwargs) -> None:
+        """登记一张图并在当前位置占位。
+
+        Args:
+            job: 渲染任务。
+            caption: 图片说明。
+            container: 放置占位的容器，缺省为当前上下文。
+            **image_kwargs: 透传给 st.image 的其他参数。
+        """
+        import streamlit as st
+        item = _Pending(job, (container or st).empty(), caption, image_kwargs)
+        if self.eager:
+            item.future = submit(job)
+        elif job.key is not None:
+            png = RENDER_CACHE.get(job.key)
+            if png is not None:
+                item.future = Future()
+                item.future.set_result(png)
+        if item.future is not None and item.future.done():
+            self._fill(item)
+        else:
+            w, h = job.figsize or DEFAULT_FIGSIZE
+            caption_html = _CAPTION_HTML.format(html.escape(caption)) if caption else ""
+            item.slot.markdown(_PLACEHOLDER_HTML.format(w=w, h=h, caption=caption_html),
+                               unsafe_allow_html=True)
+        self._items.append(item)
+
+    @staticmethod
+    def _fill(item: _Pending) -> None:
+        item.filled = True
+        try:
+            item.png = item.future.result()
+        except Exception as exc:
+            logger.exception("图像 %s 渲染失败", item.job.label)
+            item.slot.error(f"图像生成失败：{exc}")
+        else:
+            item.slot.image(item.png, caption=item.caption, **item.image_kwargs)
+
+    def render(self) -> list[Optional[bytes]]:
+        """画完并填上所有登记的图。
+
+        Returns:
+            按登记顺序排列的 PNG 字节串；渲染失败的位置为 None。
+        """
+        items, self._items = self._items, []
+        waiting: dict = defaultdict(list)
+        for item in items:
+            if item.future is None:
+                # 当前进程里渲染时这里会同步画完，随即填上，不必等其他图
+                item.future = _submit_uncached(item.job)
+            if item.future.done():
+                if not item.filled:
+                    self._fill(item)
+            else:
+                waiting[item.future].append(item)
+        for future in as_completed(waiting):
+            for item in waiting[future]:
+                self._fill(item)
+        return [item.png for item in items]
@@ -0,0 +1,418 @@
+"""
+session_memory.py
+
+按会话统计内存，并按策略回收空闲会话的重型缓存。
+
+每个页面把正文放在 with page_rerun(页面名): 里（开头调用 track_rerun、
+结束时——包括 st.stop() 提前结束和出错——调用 finish_rerun）：
+
+- 记录会话的活跃时间和重跑次数；
+- 估算会话状态（st.session_state）和会话级缓存的字节数，统计其中持有的
+  Matplotlib 图像与 PNG/base64 图片个数；
+- 开启 tracemalloc 时，按采样率记录一次重跑期间新增的 Python 堆内存。
+  多个会话的脚本线程可能交替执行，这个数字是近似值，适合看量级和趋势。
+
+重型中间结果（例如上百万个三角形的相似索引）应通过 session_artifact 存放，
+而不是直接放进 st.session_state：它们会被计入内存账本，并在会话空闲超时或
+总量超出预算时被回收，下次使用时再重新计算。
+
+环境变量：
+    P2J_MEMORY_TRACKING      为 1 时启动 tracemalloc（有一定开销，默认关闭）
+    P2J_MEMORY_SAMPLE_RATE   tracemalloc 采样的重跑比例，默认 0.1
+    P2J_SESSION_IDLE_SECONDS 会话空闲多久后回收其缓存，默认 600 秒
+    P2J_SESSION_BUDGET_MB    全部会话缓存的总预算，超出时从最久未活跃的会话开始回收；
+                             0 表示不限制（默认）
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+import numpy as np
+
+from utils.metrics import REGISTRY, RERUN_SECONDS, RERUNS, start_metrics_server
+from utils.popularity import POPULARITY, WARMER
+from utils.prefetch import PREFETCHER
+from utils.profiling import show_profile, start_profile, stop_profile
+from utils.render import capture_model_jobs, captured_model_jobs
+from utils.traces import TRACES
+
+# 两次空闲回收检查之间的最短间隔（秒）
+SWEEP_INTERVAL = 30.0
+# 会话空闲超过 idle_seconds 的这么多倍后，连记录一起删除
+FORGET_FACTOR = 6
+
+
+def estimate_size(obj, _seen: Optional[set] = None, _depth: int = 0) -> int:
+    """粗略估算一个对象（含其引用的容器与数组）占用的字节数。
+
+    NumPy 数组按 nbytes 计，容器逐项递归，同一对象只计一次；
+    Matplotlib 图像只按外壳计（其内部对象图过于庞大，单独用个数统计）。
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen or _depth > 8:
+        return 0
+    _seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + sys.getsizeof(obj) if obj.base is None else sys.getsizeof(obj)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return size
+    if _is_figure(obj):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(estimate_size(k, _seen, _depth + 1) + estimate_size(v, _seen, _depth + 1)
+                          for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(v, _seen, _depth + 1) for v in obj)
+    if hasattr(obj, "__dict__"):
+        return size + estimate_size(vars(obj), _seen, _depth + 1)
+    return size
+
+
+def _is_figure(obj) -> bool:
+    """是否为 Matplotlib 图像（不导入 matplotlib 也能判断）。"""
+    return type(obj).__name__ == "Figure" and type(obj).__module__.startswith("matplotlib")
+
+
+def count_held(obj, _seen: Optional[set] = None, _depth: int = 0) -> Counter:
+    """统计对象中持有的图像（Figure）和图片（PNG 字节串或 base64 字符串）个数。"""
+    if _seen is None:
+        _seen = set()
+    counts: Counter = Counter()
+    if id(obj) in _seen or _depth > 8:
+        return counts
+    _seen.add(id(obj))
+    if _is_figure(obj):
+        counts["figures"] += 1
+    elif isinstance(obj, (bytes, bytearray)) and obj[:4] == b"\x89PNG":
+        counts["images"] += 1
+    elif isinstance(obj, str) and obj.startswith(("iVBORw0KGgo", "data:image/")):
+        counts["images"] += 1
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            counts += count_held(v, _seen, _depth + 1)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for v in obj:
+            counts += count_held(v, _seen, _depth + 1)
+    return counts
+
+
+@dataclass
+class SessionRecord:
+    """一个会话的内存账本。
+
+    Attributes:
+        session_id: 会话标识。
+        first_seen: 首次出现的时间戳。
+        last_seen: 最近一次重跑的时间戳。
+        reruns: 重跑次数。
+        page: 最近访问的页面。
+        state_bytes: 最近一次测得的 session_state 字节数。
+        artifacts: 会话级缓存，名字 → (键, 对象)。
+        artifact_bytes: 各缓存项的字节数。
+        figures: 会话状态与缓存中持有的图像个数。
+        images: 会话状态与缓存中持有的图片个数。
+        rerun_alloc: 最近一次采样的重跑期间新增堆内存（字节）。
+        max_rerun_alloc: 采样到的最大值。
+        evictions: 缓存被回收的次数。
+    """
+    session_id: str
+    first_seen: float
+    last_seen: float
+    reruns: int = 0
+    page: str = ""
+    state_bytes: int = 0
+    artifacts: dict = field(default_factory=dict)
+    artifact_bytes: dict = field(default_factory=dict)
+    figures: int = 0
+    images: int = 0
+    rerun_alloc: Optional[int] = None
+    max_rerun_alloc: int = 0
+    evictions: int = 0
+    _sample_start: Optional[int] = None
+
+    @property
+    def total_bytes(self) -> int:
+        """会话状态与会话级缓存的字节数之和。"""
+        return self.state_bytes + sum(self.artifact_bytes.values())
+
+
+class SessionMemoryTracker:
+    """进程内所有会话的内存账本与回收策略。"""
+
+    def __init__(self, idle_seconds: float = 600.0, budget_bytes: int = 0,
+                 sample_rate: float = 0.1, tracing: bool = False):
+        self.idle_seconds = idle_seconds
+        self.budget_bytes = budget_bytes
+        self.sample_rate = sample_rate
+        self.tracing = tracing
+        self._sessions: dict[str, SessionRecord] = {}
+        self._lock = threading.RLock()
+        self._last_sweep = 0.0
+        if tracing and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @classmethod
+    def from_env(cls) -> "SessionMemoryTracker":
+        """按环境变量创建。"""
+        return cls(
+            idle_seconds=float(os.environ.get("P2J_SESSION_IDLE_SECONDS", 600)),
+            budget_bytes=int(float(os.environ.get("P2J_SESSION_BUDGET_MB", 0)) * 2 ** 20),
+            sample_rate=float(os.environ.get("P2J_MEMORY_SAMPLE_RATE", 0.1)),
+            tracing=os.environ.get("P2J_MEMORY_TRACKING") == "1",
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _record(self, session_id: str, now: float) -> SessionRecord:
+        record = self._sessions.get(session_id)
+        if record is None:
+            record = self._sessions[session_id] = SessionRecord(session_id, now, now)
+        return record
+
+    def begin_rerun(self, session_id: str, page: str) -> None:
+        """一次重跑开始：更新活跃时间，必要时开始 tracemalloc 采样并检查回收。"""
+        now = time.time()
+        with self._lock:
+            record = self._record(session_id, now)
+            record.last_seen = now
+            record.reruns += 1
+            record.page = page
+            record._sample_start = None
+            if self.tracing and random.random() < self.sample_rate:
+                record._sample_start = tracemalloc.get_traced_memory()[0]
+        if now - self._last_sweep >= SWEEP_INTERVAL:
+            self._last_sweep = now
+            self.evict(now)
+
+    def end_rerun(self, session_id: str, state: dict) -> tuple[str, float]:
+        """一次重跑结束：测量会话状态，结束 tracemalloc 采样。
+
+        Args:
+            session_id: 会话标识。
+            state: 会话状态的快照（st.session_state.to_dict()）。
+
+        Returns:
+            (页面名, 本次重跑从 begin_rerun 到现在的秒数)。
+        """
+        now = time.time()
+        state_bytes = estimate_size(state)
+        held = count_held(state)
+        with self._lock:
+            record = self._record(session_id, now)
+            record.state_bytes = state_bytes
+            for _, obj in record.artifacts.values():
+                held += count_held(obj)
+            record.figures, record.images = held["figures"], held["images"]
+            if record._sample_start is not None:
+                delta = tracemalloc.get_traced_memory()[0] - record._sample_start
+                record.rerun_alloc = delta
+                record.max_rerun_alloc = max(record.max_rerun_alloc, delta)
+                record._sample_start = None
+            return record.page, now - record.last_seen
+
+    def get_artifact(self, session_id: str, name: str, key: Hashable,
+                     factory: Callable[[], Any]):
+        """取出会话级缓存；不存在、键变了或已被回收时调用 factory 重新计算。"""
+        with self._lock:
+            record = self._record(session_id, time.time())
+            cached = record.artifacts.get(name)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+        # 计算可能很慢，不持锁，避免阻塞其他会话
+        obj = factory()
+        size = estimate_size(obj)
+        with self._lock:
+            record = self._record(session_id, time.time())
+            record.artifacts[name] = (key, obj)
+            record.artifact_bytes[name] = size
+        return obj
+
+    def drop_artifacts(self, session_id: str) -> int:
+        """回收某个会话的全部缓存，返回释放的字节数。"""
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None or not record.artifacts:
+                return 0
+            freed = sum(record.artifact_bytes.values())
+            record.artifacts.clear()
+            record.artifact_bytes.clear()
+            record.evictions += 1
+            return freed
+
+    def evict(self, now: Optional[float] = None) -> dict:
+        """执行回收策略。
+
+        1. 空闲超过 idle_seconds 的会话：回收其缓存；
+        2. 空闲超过 FORGET_FACTOR 倍的会话：连账本记录一起删除；
+        3. 设置了预算且缓存总量仍超出时，从最久未活跃的会话开始回收。
+
+        Returns:
+            会话标识 → 释放的字节数。
+        """
+        now = time.time() if now is None else now
+        freed: dict[str, int] = {}
+        with self._lock:
+            for sid, record in list(self._sessions.items()):
+                idle = now - record.last_seen
+                if idle >= self.idle_seconds:
+                    freed[sid] = self.drop_artifacts(sid)
+                if idle >= self.idle_seconds * FORGET_FACTOR:
+                    del self._sessions[sid]
+            if self.budget_bytes:
+                total = sum(sum(r.artifact_bytes.values()) for r in self._sessions.values())
+                for record in sorted(self._sessions.values(), key=lambda r: r.last_seen):
+                    if total <= self.budget_bytes:
+                        break
+                    released = self.drop_artifacts(record.session_id)
+                    freed[record.session_id] = freed.get(record.session_id, 0) + released
+                    total -= released
+        return {sid: n for sid, n in freed.items() if n}
+
+    def report(self, top: int = 10, allocation_sites: int = 0) -> dict:
+        """内存报告。
+
+        Args:
+            top: 列出占用最多的前几个会话。
+            allocation_sites: 开启 tracemalloc 时，列出分配最多的前几处代码位置。
+
+        Returns:
+            字典：sessions（按占用从大到小）、totals（汇总）、sites（分配位置）。
+        """
+        now = time.time()
+        with self._lock:
+            records = sorted(self._sessions.values(), key=lambda r: r.total_bytes, reverse=True)
+            sessions = [{
+                "session": r.session_id[:8],
+                "page": r.page,
+                "idle_s": round(now - r.last_seen, 1),
+                "reruns": r.reruns,
+                "state_kb": round(r.state_bytes / 1024, 1),
+                "artifact_kb": round(sum(r.artifact_bytes.values()) / 1024, 1),
+                "figures": r.figures,
+                "images": r.images,
+                "rerun_alloc_kb": None if r.rerun_alloc is None else round(r.rerun_alloc / 1024, 1),
+                "max_rerun_alloc_kb": round(r.max_rerun_alloc / 1024, 1),
+                "evictions": r.evictions,
+            } for r in records[:top]]
+            totals = {
+                "sessions": len(records),
+                "state_bytes": sum(r.state_bytes for r in records),
+                "artifact_bytes": sum(sum(r.artifact_bytes.values()) for r in records),
+                "figures": sum(r.figures for r in records),
+                "images": sum(r.images for r in records),
+            }
+        totals["open_pyplot_figures"] = _open_pyplot_figures()
+        sites = []
+        if self.tracing and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            totals["traced_bytes"], totals["traced_peak_bytes"] = current, peak
+            if allocation_sites:
+                stats = tracemalloc.take_snapshot().statistics("lineno")[:allocation_sites]
+                sites = [{"site": str(s.traceback[0]), "kb": round(s.size / 1024, 1),
+                          "blocks": s.count} for s in stats]
+        return {"sessions": sessions, "totals": totals, "sites": sites}
+
+
+def _open_pyplot_figures() -> int:
+    """进程内尚未关闭的 pyplot 图像个数（泄漏的图像会一直留在这里）。"""
+    if "matplotlib.pyplot" not in sys.modules:
+        return 0
+    return len(sys.modules["matplotlib.pyplot"].get_fignums())
+
+
+TRACKER = SessionMemoryTracker.from_env()
+
+REGISTRY.gauge("p2j_sessions", "内存账本中跟踪的会话数", TRACKER.__len__)
+REGISTRY.gauge("p2j_open_figures", "进程内尚未关闭的 pyplot 图像数", _open_pyplot_figures)
+
+
+def current_session_id() -> str:
+    """当前 Streamlit 会话的标识；取不到运行上下文时退回到会话状态中的随机标识。"""
+    import streamlit as st
+
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            return ctx.session_id
+    except ImportError:
+        pass
+    if "memory_session_id" not in st.session_state:
+        st.session_state.memory_session_id = uuid.uuid4().hex
+    return st.session_state.memory_session_id
+
+
+def track_rerun(page: str) -> None:
+    """在页面开头调用：登记一次重跑（首次调用时顺带启动指标服务和缓存预热）。
+
+    地址带着正确的剖析令牌时，从这里开始剖析本次重跑，见 utils.profiling；
+    同时开始记录本次重跑用到的模型图，供结尾统计热度（utils.popularity）
+    与预取相邻取值（utils.prefetch）；开启了轨迹录制时记下本次的控件状态（utils.traces）。
+    """
+    start_metrics_server()
+    WARMER.start()
+    RERUNS.inc(page=page)
+    session_id = current_session_id()
+    TRACKER.begin_rerun(session_id, page)
+    TRACES.begin(session_id, page)
+    capture_model_jobs()
+    start_profile(page)
+
+
+def finish_rerun() -> None:
+    """在页面结尾调用：测量本会话的状态大小、结束采样，计入热度并排入相邻取值的预取。"""
+    import streamlit as st
+
+    capture = stop_profile()
+    session_id = current_session_id()
+    page, seconds = TRACKER.end_rerun(session_id, st.session_state.to_dict())
+    RERUN_SECONDS.observe(seconds, page=page)
+    TRACES.end(session_id, seconds)
+    used = captured_model_jobs()
+    if used:
+        POPULARITY.record(page, used)
+        PREFETCHER.schedule(session_id, used)
+    if capture is not None:
+        show_profile(capture)
+
+
+@contextmanager
+def page_rerun(page: str) -> Iterator[None]:
+    """包住页面正文：进入时 track_rerun，退出时无论如何都 finish_rerun。
+
+    st.stop()、st.rerun() 和异常都会跳过页面末尾的代码；放在 finally 里才能保证
+    剖析被关掉、计时与热度照常记录、本次记下的模型图列表被取走。
+
+    Args:
+        page: 页面名（与页面文件名一致，不含扩展名）。
+    """
+    track_rerun(page)
+    try:
+        yield
+    finally:
+        finish_rerun()
+
+
+def session_artifact(name: str, key: Hashable, factory: Callable[[], Any]):
+    """当前会话的重型缓存：键不变时复用，否则（或已被回收时）调用 factory 重新计算。
+
+    Args:
+        name: 缓存名，同一会话内唯一。
+        key: 决定缓存是否仍然有效的键（例如数据来源与参数）。
+        factory: 无参函数，返回要缓存的对象。
+    """
+    return TRACKER.get_artifact(current_session_id(), name, key, factory)
@@ -0,0 +1,279 @@
+"""
+similarity.py
+
+相似三角形索引：把每个三角形映射为“形状键”，用排序/哈希代替两两比较。
+
+形状键的构造：
+1. 三边从小到大排序，再都除以最长边，得到 (r0, r1, 1)，它与三角形的大小、
+   位置、朝向和顶点顺序都无关——两个三角形相似当且仅当 (r0, r1) 相同；
+2. 按容差 tol 把 (r0, r1) 量化成整数，再合成一个 int64 键。
+
+分组只需对键排序（np.unique），查询用二分查找（np.searchsorted），
+整体复杂度 O(N log N)，可以处理上百万个三角形。边长、角度、分类与面积的计算沿用
+pages/7_相似模型.py 中 calculate_side_lengths / calculate_angles 的约定（分类规则同
+页面 1 的三角形模型），只是改成了批量形式。
+"""
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from utils.predicates import orient2d
+
+# 退化三角形（不满足三角形不等式）的形状键
+INVALID_KEY = -1
+
+
+def side_lengths(vertices) -> np.ndarray:
+    """批量计算三角形边长。
+
+    Args:
+        vertices: 顶点坐标，形状 (3, 2) 或 (N, 3, 2)。
+
+    Returns:
+        形状 (N, 3) 的边长，顺序为 |P1P0|、|P2P1|、|P0P2|（与页面 7 一致）。
+    """
+    v = np.asarray(vertices, dtype=float)
+    if v.ndim == 2:
+        v = v[None]
+    return np.stack([
+        np.hypot(*(v[:, 1] - v[:, 0]).T),
+        np.hypot(*(v[:, 2] - v[:, 1]).T),
+        np.hypot(*(v[:, 0] - v[:, 2]).T),
+    ], axis=1)
+
+
+def angles_from_sides(sides) -> np.ndarray:
+    """用余弦定理批量计算三个内角（角度制）。
+
+    余弦值会先截断到 [-1, 1]，避免浮点误差让 arccos 返回 nan。
+
+    Args:
+        sides: 形状 (3,) 或 (N, 3) 的边长，顺序同 side_lengths。
+
+    Returns:
+        形状 (N, 3) 的角度：顶点 0（对边 sides[1]）、顶点 1（对边 sides[2]）、
+        顶点 2（对边 sides[0]）。
+    """
+    s = np.atleast_2d(np.asarray(sides, dtype=float))
+    a, b, c = s[:, 0], s[:, 1], s[:, 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cos0 = (a ** 2 + c ** 2 - b ** 2) / (2 * a * c)
+        cos1 = (a ** 2 + b ** 2 - c ** 2) / (2 * a * b)
+        cos2 = (b ** 2 + c ** 2 - a ** 2) / (2 * b * c)
+    cosines = np.clip(np.stack([cos0, cos1, cos2], axis=1), -1.0, 1.0)
+    return np.degrees(np.arccos(cosines))
+
+
+# classify_triangles 返回的类别编号对应的名称；退化三角形的编号为 -1
+ANGLE_CLASSES = ("锐角三角形", "直角三角形", "钝角三角形")
+SIDE_CLASSES = ("等边三角形", "等腰三角形", "不等边三角形")
+
+
+def classify_triangles(sides) -> tuple[np.ndarray, np.ndarray]:
+    """批量按角、按边给三角形分类（判定规则与页面 1 的三角形模型一致）。
+
+    最大角与 90° 相差不超过 0.5° 算直角三角形；边长相对误差 1e-3 以内算相等。
+
+    Args:
+        sides: 形状 (N, 3) 的边长。
+
+    Returns:
+        (by_angle, by_side)：int8 编号，分别对应 ANGLE_CLASSES、SIDE_CLASSES；
+        不能构成三角形的行为 -1。
+    """
+    s = np.sort(np.atleast_2d(np.asarray(sides, dtype=float)), axis=1)
+    _, valid = normalized_shape(s)
+    largest = angles_from_sides(s).max(axis=1)
+    by_angle = np.where(np.isclose(largest, 90.0, atol=0.5), 1,
+                        np.where(largest > 90.0, 2, 0)).astype(np.int8)
+    equilateral = np.isclose(s[:, 0], s[:, 2], rtol=1e-3)
+    isosceles = np.isclose(s[:, 0], s[:, 1], rtol=1e-3) | np.isclose(s[:, 1], s[:, 2], rtol=1e-3)
+    by_side = np.where(equilateral, 0, np.where(isosceles, 1, 2)).astype(np.int8)
+    by_angle[~valid] = -1
+    by_side[~valid] = -1
+    return by_angle, by_side
+
+
+def triangle_areas(sides) -> np.ndarray:
+    """由三边批量求面积（Kahan 改写的海伦公式，细长三角形也有完整精度）。
+
+    Args:
+        sides: 形状 (N, 3) 的边长。
+
+    Returns:
+        形状 (N,) 的面积；不能构成三角形的行为 nan。
+    """
+    s = np.sort(np.atleast_2d(np.asarray(sides, dtype=float)), axis=1)
+    c, b, a = s[:, 0], s[:, 1], s[:, 2]  # a ≥ b ≥ c
+    with np.errstate(invalid="ignore"):
+        area = 0.25 * np.sqrt((a + (b + c)) * (c - (a - b)) * (c + (a - b)) * (a + (b - c)))
+    _, valid = normalized_shape(s)
+    return np.where(valid, area, np.nan)
+
+
+def to_sides(data) -> np.ndarray:
+    """把输入统一转换为边长数组。
+
+    Args:
+        data: 形状 (N, 3) 的边长，或 (N, 6)/(N, 3, 2) 的顶点坐标。
+
+    Returns:
+        形状 (N, 3) 的边长。由顶点给出且三点精确共线的行为 nan（按退化处理）。
+
+    Raises:
+        ValueError: 列数既不是 3 也不是 6。
+    """
+    arr = np.asarray(data, dtype=float)
+    if arr.ndim != 3:
+        arr = np.atleast_2d(arr)
+        if arr.shape[1] == 6:
+            arr = arr.reshape(-1, 3, 2)
+    if arr.ndim == 3:
+        # 共线的三点算出的边长满足 a + b ≈ c，浮点舍入可能让它“勉强”通过三角形不等式
+        sides = side_lengths(arr)
+        sides[orient2d(arr[:, 0], arr[:, 1], arr[:, 2]) == 0] = np.nan
+        return sides
+    if arr.shape[1] == 3:
+        return arr
+    raise ValueError(f"每行应为 3 个边长或 6 个顶点坐标，实际为 {arr.shape[1]} 列")
+
+
+def parse_triangle_csv(raw: bytes) -> np.ndarray:
+    """解析上传的 CSV（每行 3 个边长或 6 个顶点坐标，可带表头），返回边长数组。"""
+    rows = np.atleast_2d(np.genfromtxt(io.BytesIO(raw), delimiter=",", dtype=float,
+                                       invalid_raise=False))
+    rows = rows[~np.isnan(rows).all(axis=1)]  # 跳过表头等非数字行
+    return to_sides(rows)
+
+
+@lru_cache(maxsize=4)
+def sample_triangles(n: int, families: int, seed: int) -> np.ndarray:
+    """示例数据：若干“形状家族”的三角形，经过随机缩放、旋转和平移，返回边长数组。
+
+    结果在进程内缓存、所有会话共享，调用方不要修改。
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0, 10, (families, 3, 2))
+    pick = rng.integers(0, families, n)
+    theta = rng.uniform(0, 2 * np.pi, n)
+    rot = np.stack([np.stack([np.cos(theta), -np.sin(theta)], -1),
+                    np.stack([np.sin(theta), np.cos(theta)], -1)], -2)
+    vertices = np.einsum("nij,nkj->nki", rot, base[pick]) * rng.uniform(0.2, 5, n)[:, None, None]
+    vertices += rng.uniform(-50, 50, (n, 1, 2))
+    return to_sides(vertices)
+
+
+def normalized_shape(sides) -> tuple[np.ndarray, np.ndarray]:
+    """排序并按最长边归一化后的形状参数 (r0, r1) 与有效性掩码。"""
+    s = np.sort(np.atleast_2d(np.asarray(sides, dtype=float)), axis=1)
+    valid = (s[:, 0] > 0) & (s[:, 0] + s[:, 1] > s[:, 2]) & np.isfinite(s).all(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = s[:, :2] / s[:, 2:3]
+    return r, valid
+
+
+def shape_keys(sides, tol: float = 1e-3) -> np.ndarray:
+    """计算形状键。
+
+    Args:
+        sides: 形状 (N, 3) 的边长。
+        tol: 量化容差（按最长边归一化后的相对边长）。
+
+    Returns:
+        形状 (N,) 的 int64 键；退化三角形为 INVALID_KEY。
+    """
+    r, valid = normalized_shape(sides)
+    scale = int(round(1 / tol)) + 1
+    q = np.rint(np.nan_to_num(r) / tol).astype(np.int64)
+    return np.where(valid, q[:, 0] * scale + q[:, 1], INVALID_KEY)
+
+
+def group_similar(sides, tol: float = 1e-3) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """把三角形按相似关系分组。
+
+    Args:
+        sides: 形状 (N, 3) 的边长。
+        tol: 量化容差。
+
+    Returns:
+        (labels, group_keys, counts)：labels[i] 是第 i 个三角形的组号
+        （退化三角形为 -1），group_keys/counts 为各组的形状键和数量，
+        按数量从多到少排列。
+    """
+    keys = shape_keys(sides, tol)
+    valid = keys != INVALID_KEY
+    uniq, inverse, counts = np.unique(keys[valid], return_inverse=True, return_counts=True)
+    order = np.argsort(-counts, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    labels = np.full(len(keys), -1, dtype=np.int64)
+    labels[valid] = rank[inverse]
+    return labels, uniq[order], counts[order]
+
+
+def key_to_shape(keys, tol: float = 1e-3) -> np.ndarray:
+    """把形状键还原为代表性的边长比 (r0, r1, 1)。"""
+    keys = np.asarray(keys, dtype=np.int64)
+    scale = int(round(1 / tol)) + 1
+    return np.stack([keys // scale * tol, keys % scale * tol, np.ones(keys.shape)], axis=-1)
+
+
+@dataclass
+class SimilarityIndex:
+    """按形状键排序的相似三角形索引。
+
+    Attributes:
+        tol: 量化容差。
+        keys: 排好序的形状键。
+        order: keys[i] 对应的原始下标。
+        shapes: 原始的 (r0, r1)，用于查询时按容差精确过滤。
+    """
+    tol: float
+    keys: np.ndarray
+    order: np.ndarray
+    shapes: np.ndarray
+
+    @classmethod
+    def build(cls, sides, tol: float = 1e-3) -> "SimilarityIndex":
+        """由边长数组建立索引，O(N log N)。"""
+        keys = shape_keys(sides, tol)
+        r, _ = normalized_shape(sides)
+        order = np.argsort(keys, kind="stable")
+        return cls(tol, keys[order], order, r)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def query(self, sides) -> np.ndarray:
+        """查找与给定三角形相似的所有三角形。
+
+        为避免量化边界两侧的近似三角形被漏掉，会同时检查相邻的 3×3 个量化格
+        （只取网格 [0, round(1/tol)] 以内的格子），再用原始形状参数按容差精确过滤。
+
+        Args:
+            sides: 单个三角形的三条边（或 6 个顶点坐标）。
+
+        Returns:
+            相似三角形的原始下标（升序）。
+        """
+        s = to_sides(np.asarray(sides, dtype=float).reshape(1, -1))
+        r, valid = normalized_shape(s)
+        if not valid[0]:
+            return np.empty(0, dtype=np.int64)
+        scale = int(round(1 / self.tol)) + 1
+        q = np.rint(r[0] / self.tol).astype(np.int64)
+        # 越出网格的邻格不是空格：负的键会碰上 INVALID_KEY，超出上限的会落进下一行
+        top = scale - 1
+        hits = []
+        for c0 in range(max(q[0] - 1, 0), min(q[0] + 1, top) + 1):
+            for c1 in range(max(q[1] - 1, 0), min(q[1] + 1, top) + 1):
+                key = c0 * scale + c1
+                lo, hi = np.searchsorted(self.keys, [key, key + 1])
+                hits.append(self.order[lo:hi])
+        candidates = np.concatenate(hits)
+        close = np.all(np.abs(self.shapes[candidates] - r[0]) <= self.tol, axis=1)
+        return np.sort(candidates[close])
@@ -0,0 +1,179 @@
+"""
+sweep.py
+
+二维参数扫描组件：给定一个模型函数和两条参数轴，一次向量化调用算出整张
+网格，再画成热力图或等高线图，并在图上标出当前滑块所在的位置。
+
+- 模型函数必须接受 NumPy 数组并逐元素计算（页面中的面积/比例公式天然满足）；
+- 网格按 (模型, 轴, 固定参数) 缓存在进程内，拖动滑块时不必重算网格；
+- 图上的当前位置标记是渲染缓存键的一部分，每拖动一次滑块都要重画整张图
+  （约 0.2 秒），所以全景图默认不画，学生打开开关后才渲染——放在折叠框里
+  也不够，st.expander 折叠时里面的代码照样会执行；
+- 成图经 utils.render 的渲染缓存与工作进程输出，可以并入页面的 FigureBatch；
+- 模型函数需定义在模块顶层（而不是页面脚本里），这样函数对象在多次重跑间
+  保持同一身份，缓存才能命中。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional
+
+import numpy as np
+import streamlit as st
+
+from utils.cevians import swallowtail_areas
+from utils.figures import new_figure
+from utils.render import FigureBatch, figure_job, render_many
+
+
+@dataclass(frozen=True)
+class Axis:
+    """一条参数轴。
+
+    Attributes:
+        name: 模型函数中对应的参数名。
+        label: 图中显示的轴标题。
+        values: 该轴上的取值（元组，便于作为缓存键）。
+    """
+    name: str
+    label: str
+    values: tuple
+
+    @classmethod
+    def linspace(cls, name: str, label: str, start: float, stop: float,
+                 num: int = 101) -> "Axis":
+        """在 [start, stop] 上等距取 num 个点。"""
+        return cls(name, label, tuple(np.linspace(start, stop, num).round(6)))
+
+
+@lru_cache(maxsize=64)
+def _cached_grid(model: Callable, x_axis: Axis, y_axis: Axis, fixed: tuple) -> np.ndarray:
+    """按 (模型, 轴, 固定参数) 缓存的网格计算。"""
+    X, Y = np.meshgrid(np.asarray(x_axis.values), np.asarray(y_axis.values))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Z = np.asarray(model(**{x_axis.name: X, y_axis.name: Y}, **dict(fixed)), dtype=float)
+    Z = np.broadcast_to(Z, X.shape).copy()
+    Z.setflags(write=False)
+    return Z
+
+
+def evaluate_grid(model: Callable, x_axis: Axis, y_axis: Axis, **fixed) -> np.ndarray:
+    """一次向量化调用计算整张参数网格。
+
+    Args:
+        model: 模型函数，参数按名字传入，支持数组广播。
+        x_axis: 横轴。
+        y_axis: 纵轴。
+        **fixed: 其余参数的固定取值。
+
+    Returns:
+        形状 (len(y_axis.values), len(x_axis.values)) 的只读数组。
+    """
+    return _cached_grid(model, x_axis, y_axis, tuple(sorted(fixed.items())))
+
+
+def plot_sweep(grid: np.ndarray, x_axis: Axis, y_axis: Axis,
+               current: Optional[tuple[float, float]] = None,
+               kind: str = "heatmap", title: str = "", value_label: str = "",
+               figsize=(6, 5)):
+    """把网格画成热力图或等高线图。
+
+    Args:
+        grid: evaluate_grid 的结果。
+        x_axis: 横轴。
+        y_axis: 纵轴。
+        current: 当前滑块取值 (x, y)，会在图上标出。
+        kind: "heatmap" 或 "contour"。
+        title: 图像标题。
+        value_label: 颜色条标题。
+        figsize: 图像大小。
+
+    Returns:
+        Matplotlib 图像对象。
+    """
+    xs, ys = np.asarray(x_axis.values), np.asarray(y_axis.values)
+    fig, ax = new_figure(figsize=figsize)
+    masked = np.ma.masked_invalid(grid)
+    if kind == "contour":
+        filled = ax.contourf(xs, ys, masked, levels=20, cmap="viridis")
+        lines = ax.contour(xs, ys, masked, levels=10, colors="white", linewidths=0.6)
+        ax.clabel(lines, fontsize=8, fmt="%.2f")
+    else:
+        filled = ax.pcolormesh(xs, ys, masked, shading="auto", cmap="viridis")
+    fig.colorbar(filled, ax=ax, label=value_label)
+    if current is not None:
+        ax.plot(current[0], current[1], marker="*", color="red", markersize=16,
+                markeredgecolor="white", label="当前取值")
+        ax.legend(loc="upper right")
+    ax.set_xlabel(x_axis.label)
+    ax.set_ylabel(y_axis.label)
+    ax.set_title(title, fontsize=13)
+    return fig
+
+
+def sweep_figure(model: Callable, x_axis: Axis, y_axis: Axis, fixed: tuple,
+                 current: Optional[tuple[float, float]], kind: str, title: str,
+                 value_label: str):
+    """计算网格并作图；参数都可哈希、可 pickle，便于交给渲染缓存与工作进程。"""
+    grid = evaluate_grid(model, x_axis, y_axis, **dict(fixed))
+    return plot_sweep(grid, x_axis, y_axis, current=current, kind=kind, title=title,
+                      value_label=value_label)
+
+
+def render_sweep(model: Callable, x_axis: Axis, y_axis: Axis,
+                 current: tuple[float, float], title: str, value_label: str,
+                 key: str, figures: Optional[FigureBatch] = None, **fixed) -> None:
+    """在页面中渲染一个参数扫描全景图（带开关和热力图/等高线切换）。
+
+    开关关闭时直接返回，不构造、不渲染图像。
+
+    Args:
+        model: 模型函数。
+        x_axis: 横轴。
+        y_axis: 纵轴。
+        current: 当前滑块取值 (x, y)。
+        title: 图像标题。
+        value_label: 颜色条标题。
+        key: Streamlit 控件键，同一页面内需唯一。
+        figures: 页面的 FigureBatch；给出时图先占位、随页面其他图一起渲染，
+            否则当场渲染。
+        **fixed: 其余参数的固定取值。
+    """
+    if not st.toggle("显示全景图", key=f"{key}_on"):
+        return
+    kind = st.radio("显示方式", ["热力图", "等高线"], horizontal=True, key=f"{key}_kind")
+    job = figure_job(sweep_figure, model, x_axis, y_axis, tuple(sorted(fixed.items())),
+                     tuple(current), "contour" if kind == "等高线" else "heatmap", title,
+                     value_label, size_hint=(6, 5))
+    if figures is not None:
+        figures.image(job)
+    else:
+        st.image(render_many([job])[0])
+
+
+# --- 页面使用的预置模型（定义在模块顶层，保证缓存键稳定） ---
+
+def swallowtail_ratio(t, s):
+    """燕尾模型：S△AOB / S△AOC。"""
+    return swallowtail_areas(t, s)["ratio12"]
+
+
+def swallowtail_s1(t, s):
+    """燕尾模型：S△AOB 的面积。"""
+    return swallowtail_areas(t, s)["S1"]
+
+
+def equal_height_ratio(base1, base2, height):
+    """等高模型：两个等高三角形的面积比 S1 : S2。"""
+    return (base1 * height / 2) / (base2 * height / 2)
+
+
+def equal_height_area(base1, height):
+    """等高模型：三角形1的面积。"""
+    return base1 * height / 2
+
+
+def bird_head_ratio(big_wing1, big_wing2, small_wing1, small_wing2):
+    """鸟头模型：大三角形面积是小三角形的几倍。"""
+    return (big_wing1 * big_wing2) / (small_wing1 * small_wing2)
@@ -0,0 +1,207 @@
+"""
+traces.py
+
+交互轨迹录制：按会话记下学生真实的操作序列（每次重跑时控件状态的变化和时间），
+供 tools/replay.py 按原速或加速回放，用真实负载评估性能改动。
+
+合成的滑块扫描和真实使用差得很远：第 6 页学生在标签页之间来回切、做小测，
+第 8 页先输数字再点“开始计算”。录下来的轨迹保留了这些节奏。
+
+- 默认关闭；设置 P2J_TRACE_DIR 后按 P2J_TRACE_SAMPLE 的比例抽取会话录制；
+- 每次重跑写一行 JSON：轨迹号、序号、距该轨迹第一次重跑的秒数、页面、
+  页面脚本哈希、相对上一次重跑新增/改变的控件状态（set）与消失的控件（drop）、
+  服务端重跑耗时。控件状态就是浏览器发来的 WidgetState，回放时原样发回；
+- 匿名化：轨迹号是随机生成的，不记会话号、地址参数（学号）、时间戳；
+  文本输入框的内容换成等长的 “x”，上传的文件只记有过上传、不记内容
+  （回放时无法重现上传，这部分重跑按没有上传处理）；
+- 控件号由 Streamlit 按控件参数和页面算出，代码改了控件参数后旧轨迹里的
+  对应控件会匹配不上，回放报告里会统计这类状态的个数。
+
+文件按天、按进程分开：<P2J_TRACE_DIR>/traces-YYYYMMDD-<进程号>.jsonl。
+
+环境变量：
+    P2J_TRACE_DIR     轨迹文件目录；不设置（默认）时不录制
+    P2J_TRACE_SAMPLE  录制的会话比例，默认 1.0
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE = 1.0
+# 同时跟踪的会话数上限，超出时忘掉最久未活跃的会话（它之后的重跑另起一条轨迹）
+REMEMBER_SESSIONS = 1024
+# 这些控件的字符串取值是学生自己输入的文字，写入前遮盖
+_FREE_TEXT_SERDES = ("TextInputSerde", "TextAreaSerde")
+
+TRACE_EVENTS = REGISTRY.counter("p2j_trace_events_total", "写入交互轨迹的重跑数", ("page",))
+
+
+def _script_context():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    return get_script_run_ctx()
+
+
+def _widget_metadata(ctx) -> dict:
+    """当前会话的控件元数据（控件号 → WidgetMetadata）；取不到时返回空字典。"""
+    try:
+        return ctx.session_state._state._new_widget_state.widget_metadata
+    except AttributeError:
+        return {}
+
+
+def _is_free_text(metadata) -> bool:
+    # 取不到元数据时按自由文本处理：宁可回放不准，也不写出学生输入的内容
+    serializer = getattr(metadata, "serializer", None)
+    owner = getattr(serializer, "__self__", None)
+    return owner is None or type(owner).__name__ in _FREE_TEXT_SERDES
+
+
+def _redact(state, metadata) -> Optional[dict]:
+    """把一个 WidgetState 转成可写出的字典；上传文件的状态返回 None。"""
+    from google.protobuf.json_format import MessageToDict
+
+    kind = state.WhichOneof("value")
+    if kind == "file_uploader_state_value":
+        return None
+    data = MessageToDict(state)
+    if kind == "string_value" and _is_free_text(metadata):
+        data["stringValue"] = "x" * len(state.string_value)
+    return data
+
+
+class TraceRecorder:
+    """按会话录制控件状态变化，逐行追加写入轨迹文件。"""
+
+    def __init__(self, directory: Optional[Path], sample: float = DEFAULT_SAMPLE):
+        self.directory = directory
+        self.sample = sample
+        # 会话 → 轨迹状态（未被抽中的会话为 None），按最近活跃排序
+        self._sessions: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TraceRecorder":
+        directory = os.environ.get("P2J_TRACE_DIR", "")
+        return cls(Path(directory) if directory else None,
+                   float(os.environ.get("P2J_TRACE_SAMPLE", DEFAULT_SAMPLE)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None and self.sample > 0
+
+    def _trace(self, session_id: str) -> Optional[dict]:
+        # 调用方持有 self._lock
+        if session_id in self._sessions:
+            self._sessions.move_to_end(session_id)
+            return self._sessions[session_id]
+        trace = None
+        if random.random() < self.sample:
+            trace = {"id": uuid.uuid4().hex[:12], "seq": 0, "t0": time.monotonic(),
+                     "states": {}, "pending": None}
+        self._sessions[session_id] = trace
+        while len(self._sessions) > REMEMBER_SESSIONS:
+            self._sessions.popitem(last=False)
+        return trace
+
+    def begin(self, session_id: str, page: str) -> None:
+        """在重跑开头调用：记下浏览器这次发来的控件状态。"""
+        if not self.enabled:
+            return
+        ctx = _script_context()
+        if ctx is None:
+            return
+        states = {s.id: s for s in ctx.session_state.get_widget_states()}
+        with self._lock:
+            trace = self._trace(session_id)
+            if trace is not None:
+                trace["pending"] = (page, ctx.page_script_hash, time.monotonic(), states)
+
+    def end(self, session_id: str, seconds: float) -> None:
+        """在重跑结尾调用：与上一次重跑比较，写出一行轨迹。"""
+        if not self.enabled:
+            return
+        with self._lock:
+            trace = self._sessions.get(session_id)
+            if trace is None or trace["pending"] is None:
+                return
+            page, page_hash, started, states = trace["pending"]
+            trace["pending"] = None
+            previous = trace["states"]
+            trace["states"] = states
+            seq = trace["seq"]
+            trace["seq"] += 1
+            t = started - trace["t0"]
+        ctx = _script_context()
+        metadata = _widget_metadata(ctx) if ctx is not None else {}
+        changed = [s for wid, s in states.items()
+                   if wid not in previous
+                   or previous[wid].SerializeToString() != s.SerializeToString()]
+        redacted = [_redact(s, metadata.get(s.id)) for s in changed]
+        event = {"trace": trace["id"], "seq": seq, "t": round(t, 3), "page": page,
+                 "page_hash": page_hash,
+                 "set": [d for d in redacted if d is not None],
+                 "drop": [wid for wid in previous if wid not in states],
+                 "seconds": round(seconds, 4)}
+        if len(redacted) != len(event["set"]):
+            event["uploads"] = len(redacted) - len(event["set"])
+        self._write(event)
+        TRACE_EVENTS.inc(page=page)
+
+    def _write(self, event: dict) -> None:
+        path = self.directory / f"traces-{time.strftime('%Y%m%d')}-{os.getpid()}.jsonl"
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        try:
+            with self._lock:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as exc:
+            logger.warning("轨迹文件 %s 写入失败：%s", path, exc)
+
+
+def load_traces(paths: Iterable) -> dict[str, list[dict]]:
+    """读取轨迹文件，按轨迹号分组，每条轨迹内按序号排列。
+
+    Args:
+        paths: 轨迹文件路径（.jsonl）。
+
+    Returns:
+        轨迹号 → 事件字典列表。
+    """
+    traces: dict[str, list[dict]] = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    event = json.loads(line)
+                    traces.setdefault(event["trace"], []).append(event)
+    for events in traces.values():
+        events.sort(key=lambda e: e["seq"])
+    return traces
+
+
+def widget_states(states: dict) -> list:
+    """把轨迹里的控件状态字典（控件号 → 字典）转回 WidgetState 列表。"""
+    from google.protobuf.json_format import ParseDict
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    return [ParseDict(data, WidgetState()) for data in states.values()]
+
+
+TRACES = TraceRecorder.from_env()
@@ -0,0 +1,63 @@
+"""
+widgets.py
+
+按模型的参数表生成 Streamlit 控件，让页面只需一行就能读出全部参数。
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import streamlit as st
+
+from utils.models import ModelSpec, ParamSpec
+
+
+def param_widget(param: ParamSpec, key: Optional[str] = None, container=st):
+    """为单个参数创建控件并返回其当前取值。
+
+    Args:
+        param: 参数声明。
+        key: Streamlit 控件键；页面原有的键应原样传入，保持会话状态不变。
+        container: 放置控件的容器（st、st.sidebar 或某一列）。
+
+    Returns:
+        控件的当前取值。
+    """
+    widget = param.widget
+    if widget == "auto":
+        widget = {"choice": "select", "bool": "checkbox", "text": "text"}.get(param.kind, "slider")
+    if widget == "select":
+        return container.selectbox(param.label, list(param.options),
+                                   index=list(param.options).index(param.default), key=key)
+    if widget == "checkbox":
+        return container.checkbox(param.label, param.default, key=key)
+    if widget == "text":
+        return container.text_input(param.label, param.default, key=key)
+    if widget == "number":
+        return container.number_input(param.label, min_value=param.min, max_value=param.max,
+                                      value=param.default, step=param.step, key=key,
+                                      format="%.1f" if param.kind == "float" else "%d")
+    if param.kind == "int":
+        return container.slider(param.label, int(param.min), int(param.max), param.default,
+                                key=key)
+    return container.slider(param.label, param.min, param.max, param.default, param.step,
+                            key=key)
+
+
+def model_widgets(model: ModelSpec, names: Optional[Iterable[str]] = None,
+                  keys: Optional[dict] = None, container=st) -> dict:
+    """按参数表顺序为模型创建一组控件。
+
+    Args:
+        model: 模型。
+        names: 只为这些参数创建控件（默认全部）。
+        keys: 参数名 → 控件键。
+        container: 放置控件的容器。
+
+    Returns:
+        参数名 → 当前取值。
+    """
+    keys = keys or {}
+    wanted = set(names) if names is not None else None
+    return {p.name: param_widget(p, keys.get(p.name), container)
+            for p in model.params if wanted is None or p.name in wanted}
@@ -0,0 +1,464 @@
+"""
+worksheet.py
+
+批量生成可打印的练习卷 PDF：给定题型、人数、每人题数和随机种子，每位学生得到一份
+互不相同的试卷，最后附上全部答案。
+
+- 题目从 utils.problem_bank 的题库中按学生编号抽取，同一份规格总是生成同一套卷子，
+  丢了可以原样重印；
+- 插图是示意图，只取决于题型和分档后的比例（例如 BD : DC 取到 0.1），具体数值写在
+  题干里。40 人 × 10 题的一套卷子通常只有几十张不同的插图，它们一开始就全部交给
+  utils.render 的渲染进程池并发绘制，并进入进程级渲染缓存，下一套卷子直接复用；
+- 组版也在渲染进程池里进行：卷面按每 BLOCK_STUDENTS 份一段，经 RENDER_BACKEND.call
+  交给工作进程排成一份小 PDF（讲义页和答案页各自成段）；当前进程用 _PdfConcat 按顺序
+  把各段拼进输出文件，每拼好一段回调一次，页面据此实时显示进度。前面的段拼接时，
+  后面的段仍在工作进程里排版。
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import math
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import BinaryIO, Callable, Iterable, Optional
+
+import numpy as np
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from matplotlib.image import imread
+
+from utils.butterfly import quad_from_wings
+from utils.figures import (MPL_LOCK, AxesSpec, FigureSpec, Shape, Text, line, marker, points,
+                           polyline)
+from utils.illustrations import equal_height_application, half_model_application
+from utils.metrics import REGISTRY
+from utils.models import butterfly_figure, get_model
+from utils.problem_bank import (KIND_BIRD_HEAD, KIND_BUTTERFLY, KIND_EQUAL_HEIGHT,
+                                KIND_SWALLOWTAIL, Problem, ProblemBank, describe,
+                                get_default_bank)
+from utils.render import RENDER_BACKEND, figure_job, spec_job, submit_many
+
+# 题型 → 卷面上的名称（顺序即页面上的默认顺序）
+TOPICS = {
+    KIND_EQUAL_HEIGHT: "等高模型",
+    KIND_BIRD_HEAD: "鸟头模型",
+    KIND_SWALLOWTAIL: "燕尾模型",
+    KIND_BUTTERFLY: "蝴蝶模型",
+}
+
+MAX_STUDENTS = 60
+MAX_PROBLEMS = 20
+
+PAGE_SIZE = (8.27, 11.69)  # A4，英寸
+COLUMNS, ROWS = 2, 3
+PER_PAGE = COLUMNS * ROWS
+ANSWER_ROWS = 40  # 答案页每页的学生数
+BLOCK_STUDENTS = 4  # 每段交给一个工作进程排版的份数
+# 插图的尺寸与分辨率：贴到页面上缩小到 150/180，正好放进约 3.4 × 1.85 英寸的插图区
+SHEET_FIGSIZE = (4.0, 2.2)
+SHEET_DPI = 150
+# 页面的“像素密度”：插图按原像素贴到页面上，显示尺寸为 像素数 / PAGE_DPI 英寸，
+# 所以 150 dpi 的插图在纸上缩小到 150/180
+PAGE_DPI = 180
+
+WORKSHEET_PAGES = REGISTRY.counter("p2j_worksheet_pages_total", "练习卷 PDF 已生成的页数")
+WORKSHEET_SECONDS = REGISTRY.histogram("p2j_worksheet_seconds", "生成一套练习卷 PDF 的耗时")
+
+
+@dataclass(frozen=True)
+class WorksheetSpec:
+    """一套练习卷的规格。
+
+    Attributes:
+        topics: 题型元组，取值见 TOPICS；每份卷子的题目按这个顺序轮流出。
+        students: 份数（每位学生一份）。
+        problems: 每份的题数。
+        seed: 随机种子；改动它就换一整套题。
+        title: 卷首标题。
+        handout: 是否在最前面加一页例题讲义（等高模型与一半模型的应用示例）。
+    """
+    topics: tuple
+    students: int = 40
+    problems: int = 10
+    seed: int = 1
+    title: str = "几何模型练习卷"
+    handout: bool = False
+
+    def __post_init__(self):
+        unknown = [t for t in self.topics if t not in TOPICS]
+        if not self.topics or unknown:
+            raise ValueError(f"题型必须是 {', '.join(TOPICS)} 中的一个或多个")
+        if not 1 <= self.students <= MAX_STUDENTS:
+            raise ValueError(f"份数应在 1 到 {MAX_STUDENTS} 之间")
+        if not 1 <= self.problems <= MAX_PROBLEMS:
+            raise ValueError(f"每份题数应在 1 到 {MAX_PROBLEMS} 之间")
+
+    @property
+    def sheet_pages(self) -> int:
+        """每位学生的卷面页数。"""
+        return math.ceil(self.problems / PER_PAGE)
+
+    @property
+    def total_pages(self) -> int:
+        """整个 PDF 的页数（含讲义页与答案页）。"""
+        return (int(self.handout) + self.students * self.sheet_pages
+                + math.ceil(self.students / ANSWER_ROWS))
+
+    def problems_for(self, student: int, bank: ProblemBank) -> list[Problem]:
+        """第 student 份卷子（从 0 开始）的全部题目。"""
+        session = f"worksheet:{self.seed}:{student}"
+        return [bank.draw(self.topics[j % len(self.topics)], session, j)
+                for j in range(self.problems)]
+
+
+# ---- 示意图 ----
+
+def _bucket(value: float, step: float = 0.1, lo: float = 0.1, hi: float = 0.9) -> float:
+    """把比例取到 step 的整数倍并限制在 [lo, hi]，使插图只有少数几种。"""
+    return round(min(max(round(value / step) * step, lo), hi), 2)
+
+
+def _sheet(items, xlim, ylim) -> FigureSpec:
+    return FigureSpec(figsize=SHEET_FIGSIZE, dpi=SHEET_DPI, axes=(AxesSpec(
+        items=tuple(items), xlim=xlim, ylim=ylim, grid=None, frameless=True),))
+
+
+def _labels(named: dict, offset=(0.02, 0.02)) -> list:
+    items = []
+    for name, P in named.items():
+        items.append(marker(P, color="black", markersize=3))
+        items.append(Text(P[0] + offset[0], P[1] + offset[1], name, fontsize=11))
+    return items
+
+
+def _equal_height_sheet(t: float) -> FigureSpec:
+    A, B, C = (0.35, 0.8), (0.0, 0.0), (1.0, 0.0)
+    D, H = (t, 0.0), (A[0], 0.0)
+    items = [Shape(points([A, B, D]), facecolor="#BFDBFE", edgecolor="navy", alpha=0.8),
+             polyline([A, B, C], closed=True, linewidth=1.5),
+             line(A, D, linewidth=1.2),
+             line(A, H, linestyle="--", linewidth=1)]
+    items += _labels({"A": A, "B": B, "C": C, "D": D})
+    return _sheet(items, (-0.08, 1.1), (-0.1, 0.9))
+
+
+def _bird_head_sheet(p: float, q: float) -> FigureSpec:
+    angle = np.radians(50)
+    A, B, C = (0.0, 0.0), (0.8 * np.cos(angle), 0.8 * np.sin(angle)), (1.0, 0.0)
+    D, E = (B[0] * p, B[1] * p), (q, 0.0)
+    items = [polyline([A, B, C], closed=True, linewidth=1.5),
+             Shape(points([A, D, E]), facecolor="#FBCFE8", edgecolor="crimson", alpha=0.85),
+             line(D, E, color="crimson", linewidth=1.2)]
+    items += _labels({"A": A, "B": B, "C": C, "D": D, "E": E})
+    return _sheet(items, (-0.08, 1.1), (-0.08, 0.72))
+
+
+def _swallowtail_sheet(t: float) -> FigureSpec:
+    spec = get_model("swallowtail").figure_spec(t=t, s=0.5)
+    axes = replace(spec.axes[0], title="", frameless=True, xlim=(-0.05, 1.08))
+    return replace(spec, axes=(axes,), figsize=SHEET_FIGSIZE, dpi=SHEET_DPI)
+
+
+def _butterfly_sheet() -> FigureSpec:
+    spec = butterfly_figure(quad_from_wings(3, 4, 6)[0])
+    return replace(spec, figsize=SHEET_FIGSIZE, dpi=SHEET_DPI)
+
+
+def problem_figure(problem: Problem) -> FigureSpec:
+    """一道题的示意图（不含答案；数值只出现在题干里）。"""
+    p = problem.params
+    if problem.kind == KIND_EQUAL_HEIGHT:
+        return _equal_height_sheet(_bucket(p["m"] / (p["m"] + p["n"])))
+    if problem.kind == KIND_BIRD_HEAD:
+        # 上限取 0.8：c = a 时 D 与 B 重合，示意图上分不清，按略小一点画
+        return _bird_head_sheet(_bucket(p["c"] / p["a"], 0.2, 0.2, 0.8),
+                                _bucket(p["d"] / p["b"], 0.2, 0.2, 0.8))
+    if problem.kind == KIND_SWALLOWTAIL:
+        return _swallowtail_sheet(_bucket(p["m"] / (p["m"] + p["n"])))
+    if problem.kind == KIND_BUTTERFLY:
+        return _butterfly_sheet()
+    raise ValueError(f"未知题型：{problem.kind}")
+
+
+# ---- 组版 ----
+
+def _wrap(text: str, width: float) -> str:
+    """按显示宽度折行：汉字与全角标点算 1，其余字符算 0.5。"""
+    lines, current, used = [], [], 0.0
+    for ch in text:
+        w = 1.0 if ord(ch) > 0x2E80 else 0.5
+        if used + w > width:
+            lines.append("".join(current))
+            current, used = [], 0.0
+        current.append(ch)
+        used += w
+    lines.append("".join(current))
+    return "\n".join(lines)
+
+
+def _decode(png: bytes) -> np.ndarray:
+    # 存成 uint8 RGB：比 imread 给出的 float32 RGBA 小 16 倍，PDF 里也按 8 位写入
+    return (imread(io.BytesIO(png))[..., :3] * 255).astype(np.uint8)
+
+
+def _new_page() -> Figure:
+    fig = Figure(figsize=PAGE_SIZE, dpi=PAGE_DPI)
+    # 默认会把页面上的所有图片合成一张整页大图再嵌入，既慢又大；这里让每张插图各自嵌入
+    fig.suppressComposite = True
+    return fig
+
+
+def _place_image(fig: Figure, rect, image: np.ndarray) -> None:
+    """把图片按原像素居中贴进 rect（页面比例坐标）；放不下时先按整数倍抽稀。
+
+    figimage 不创建坐标系，PDF 里按原分辨率嵌入，比 add_axes + imshow 快得多。
+    """
+    width, height = rect[2] * PAGE_SIZE[0] * PAGE_DPI, rect[3] * PAGE_SIZE[1] * PAGE_DPI
+    step = math.ceil(max(image.shape[1] / width, image.shape[0] / height, 1))
+    image = image[::step, ::step]
+    x = rect[0] * PAGE_SIZE[0] * PAGE_DPI + (width - image.shape[1]) / 2
+    y = rect[1] * PAGE_SIZE[1] * PAGE_DPI + (height - image.shape[0]) / 2
+    fig.figimage(image, xo=x, yo=y, origin="upper")
+
+
+def _header(fig: Figure, spec: WorksheetSpec, student: int, page: int) -> None:
+    fig.text(0.5, 0.965, spec.title, ha="center", va="top", fontsize=16, weight="bold")
+    fig.text(0.06, 0.925, "姓名：__________　　学号：__________　　得分：______", fontsize=10)
+    fig.text(0.94, 0.925, f"第 {student + 1} 份　{page + 1}/{spec.sheet_pages} 页",
+             ha="right", fontsize=9, color="gray")
+
+
+def _sheet_page(spec: WorksheetSpec, student: int, page: int, problems: list[Problem],
+                image: Callable[[Problem], np.ndarray]) -> Figure:
+    fig = _new_page()
+    _header(fig, spec, student, page)
+    top, cell_w, cell_h = 0.9, 0.88 / COLUMNS, 0.86 / ROWS
+    for i, problem in enumerate(problems):
+        number = page * PER_PAGE + i + 1
+        x = 0.06 + (i % COLUMNS) * cell_w
+        y = top - (i // COLUMNS) * cell_h
+        fig.text(x, y - 0.005, _wrap(f"{number}. {describe(problem)}", 23), va="top",
+                 fontsize=9.5, linespacing=1.5)
+        _place_image(fig, [x, y - cell_h + 0.04, cell_w - 0.03, cell_h * 0.55], image(problem))
+        fig.text(x, y - cell_h + 0.02, "答：______________", fontsize=10)
+    return fig
+
+
+def _answer_page(spec: WorksheetSpec, sheets: list[list[Problem]], first: int) -> Figure:
+    fig = _new_page()
+    fig.text(0.5, 0.965, f"{spec.title}　答案", ha="center", va="top", fontsize=16,
+             weight="bold")
+    rows = []
+    for student in range(first, min(first + ANSWER_ROWS, spec.students)):
+        answers = "  ".join(f"{j + 1}) {p.answer_text}" for j, p in enumerate(sheets[student]))
+        rows.append(f"第 {student + 1:>2} 份：{answers}")
+    fig.text(0.06, 0.92, "\n".join(rows), va="top", fontsize=8 if spec.problems <= 10 else 6.5,
+             linespacing=1.75)
+    return fig
+
+
+def _handout_page(spec: WorksheetSpec, images: list[np.ndarray]) -> Figure:
+    fig = _new_page()
+    fig.text(0.5, 0.965, f"{spec.title}　例题讲义", ha="center", va="top", fontsize=16,
+             weight="bold")
+    for i, image in enumerate(images):
+        _place_image(fig, [0.06, 0.5 - 0.45 * i, 0.88, 0.42], image)
+    return fig
+
+
+# ---- 分段组版：每段在渲染工作进程里排成一份独立的 PDF ----
+
+def _pdf(pages: Iterable[Figure]) -> bytes:
+    buf = io.BytesIO()
+    pdf = PdfPages(buf)
+    try:
+        for fig in pages:
+            with MPL_LOCK:
+                pdf.savefig(fig)
+    finally:
+        with MPL_LOCK:
+            pdf.close()
+    return buf.getvalue()
+
+
+def _sheets_part(spec: WorksheetSpec, first: int, sheets: list[list[Problem]],
+                 pngs: dict) -> bytes:
+    """第 first 份起的若干份卷面；pngs 为这几份用到的 {示意图: PNG}。"""
+    images = {key: _decode(png) for key, png in pngs.items()}
+    return _pdf(_sheet_page(spec, first + k, page, sheet[page * PER_PAGE:(page + 1) * PER_PAGE],
+                            lambda problem: images[problem_figure(problem)])
+                for k, sheet in enumerate(sheets) for page in range(spec.sheet_pages))
+
+
+def _answers_part(spec: WorksheetSpec, sheets: list[list[Problem]]) -> bytes:
+    return _pdf(_answer_page(spec, sheets, first) for first in range(0, spec.students, ANSWER_ROWS))
+
+
+def _handout_part(spec: WorksheetSpec, pngs: list[bytes]) -> bytes:
+    return _pdf([_handout_page(spec, [_decode(png) for png in pngs])])
+
+
+_OBJ = re.compile(rb"(\d+) 0 obj")
+_REF = re.compile(rb"(\d+) 0 R")
+
+
+def _pdf_string(text: str) -> bytes:
+    return b"<FEFF" + text.encode("utf-16-be").hex().upper().encode() + b">"
+
+
+class _PdfConcat:
+    """把若干份 Matplotlib 生成的 PDF 依次拼接成一份，每收到一份就立即写出。
+
+    Matplotlib 输出的是结构固定的 PDF 1.4（无对象流、单个交叉引用表），拼接只需把每份的
+    对象整体重新编号、把页面挂到同一个页面树下，不必解析内容流。对象 1、2、3 预留给
+    目录、页面树和文档信息，它们在最后写出。
+
+    Matplotlib 每贴一次图片就嵌入一份图片数据；同一张示意图在整套卷子里会出现几十次，
+    所以内容相同的图片对象只写第一份，其余引用都指向它。
+    """
+
+    def __init__(self, file: BinaryIO, title: str):
+        self._file = file
+        self._title = title
+        self._pos = 0
+        self._offsets: dict[int, int] = {}
+        self._kids: list[int] = []
+        self._images: dict[bytes, int] = {}
+        self._next = 4
+        self._write(b"%PDF-1.4\n%\xac\xdc \xab\xba\n")
+
+    def _write(self, data: bytes) -> None:
+        self._file.write(data)
+        self._pos += len(data)
+
+    def add(self, pdf: bytes) -> None:
+        """追加一份 PDF 的全部页面。"""
+        xref = int(pdf[pdf.rindex(b"startxref") + 9:].split()[0])
+        lines = pdf[xref:pdf.index(b"trailer", xref)].split(b"\n")
+        first, count = (int(v) for v in lines[1].split())
+        offsets = {first + i: int(row[:10]) for i, row in enumerate(lines[2:2 + count])
+                   if row[17:18] == b"n"}
+        trailer = pdf[pdf.index(b"trailer", xref):]
+        root = int(re.search(rb"/Root (\d+) 0 R", trailer).group(1))
+        info = re.search(rb"/Info (\d+) 0 R", trailer)
+        bounds = sorted(offsets.values()) + [xref]
+        end = dict(zip(bounds, bounds[1:]))
+        body = {num: pdf[off:end[off]] for num, off in offsets.items()}
+        pages = int(re.search(rb"/Pages (\d+) 0 R", body[root]).group(1))
+        kids = [int(n) for n in _REF.findall(body[pages].split(b"/Kids", 1)[1].split(b"]", 1)[0])]
+
+        base = self._next - 1
+        new = {num: num + base for num in body}
+        for num, obj in body.items():
+            head, tail = self._split(obj)
+            if b"/Subtype /Image" in head:
+                key = hashlib.sha1(_REF.sub(b"R", _OBJ.sub(b"", head, count=1)) + tail).digest()
+                new[num] = self._images.setdefault(key, num + base)
+        renumber = lambda m: b"%d 0 R" % new[int(m.group(1))]  # noqa: E731
+        skip = {root, pages, int(info.group(1)) if info else -1}
+        for num in sorted(body):
+            if num in skip or new[num] != num + base:
+                continue
+            head, tail = self._split(body[num])
+            head = _REF.sub(renumber, _OBJ.sub(b"%d 0 obj" % new[num], head, count=1))
+            if num in kids:
+                head = head.replace(b"/Parent %d 0 R" % new[pages], b"/Parent 2 0 R")
+            self._offsets[new[num]] = self._pos
+            self._write(head + tail)
+        self._kids += [k + base for k in kids]
+        self._next = base + max(offsets) + 1
+
+    @staticmethod
+    def _split(obj: bytes) -> tuple[bytes, bytes]:
+        # 只改对象字典里的引用；流数据原样保留
+        cut = obj.find(b"stream\n")
+        return (obj, b"") if cut < 0 else (obj[:cut], obj[cut:])
+
+    def close(self) -> None:
+        """写出目录、页面树、文档信息与交叉引用表。"""
+        kids = b" ".join(b"%d 0 R" % k for k in self._kids)
+        for num, obj in ((1, b"<< /Type /Catalog /Pages 2 0 R >>"),
+                         (2, b"<< /Type /Pages /Kids [ %s ] /Count %d >>" % (kids, len(self._kids))),
+                         (3, b"<< /Title %s /Producer (p2j) >>" % _pdf_string(self._title))):
+            self._offsets[num] = self._pos
+            self._write(b"%d 0 obj\n%s\nendobj\n" % (num, obj))
+        size = self._next
+        xref = [b"xref\n0 %d\n0000000000 65535 f \n" % size]
+        for num in range(1, size):
+            if num in self._offsets:
+                xref.append(b"%010d 00000 n \n" % self._offsets[num])
+            else:
+                xref.append(b"0000000000 65535 f \n")
+        start = self._pos
+        self._write(b"".join(xref))
+        self._write(b"trailer\n<< /Size %d /Root 1 0 R /Info 3 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                    % (size, start))
+
+
+def write_worksheet(spec: WorksheetSpec, file: BinaryIO,
+                    on_page: Optional[Callable[[int, int], None]] = None,
+                    bank: Optional[ProblemBank] = None) -> int:
+    """生成整套练习卷并写入 PDF。
+
+    插图先全部提交到渲染进程池；卷面按每 BLOCK_STUDENTS 份一段交给工作进程排版，
+    同时进行的段数为工作进程数的两倍。各段按顺序拼接进输出文件，每拼好一段回调一次。
+
+    Args:
+        spec: 练习卷规格。
+        file: 输出的二进制文件对象。
+        on_page: 每写完一段调用一次，参数为 (已写页数, 总页数)。
+        bank: 题库，默认为进程共享的默认题库。
+
+    Returns:
+        写入的页数。
+    """
+    start = time.perf_counter()
+    bank = bank or get_default_bank()
+    sheets = [spec.problems_for(s, bank) for s in range(spec.students)]
+    figure_specs = list(dict.fromkeys(problem_figure(p) for sheet in sheets for p in sheet))
+    jobs = [spec_job(f) for f in figure_specs]
+    if spec.handout:
+        jobs += [figure_job(equal_height_application), figure_job(half_model_application)]
+    futures = submit_many(jobs)
+    pending = dict(zip(figure_specs, futures))
+
+    def parts():
+        """依次产出 (函数, 参数, 页数)。"""
+        if spec.handout:
+            yield _handout_part, (spec, [f.result() for f in futures[len(figure_specs):]]), 1
+        for first in range(0, spec.students, BLOCK_STUDENTS):
+            block = sheets[first:first + BLOCK_STUDENTS]
+            used = dict.fromkeys(problem_figure(p) for sheet in block for p in sheet)
+            pngs = {key: pending[key].result() for key in used}
+            yield _sheets_part, (spec, first, block, pngs), len(block) * spec.sheet_pages
+        yield _answers_part, (spec, sheets), math.ceil(spec.students / ANSWER_ROWS)
+
+    total, done = spec.total_pages, 0
+    concat = _PdfConcat(file, spec.title)
+    window: deque = deque()
+
+    def drain() -> None:
+        nonlocal done
+        future, pages = window.popleft()
+        concat.add(future.result())
+        done += pages
+        WORKSHEET_PAGES.inc(pages)
+        if on_page is not None:
+            on_page(done, total)
+
+    try:
+        for func, args, pages in parts():
+            window.append((RENDER_BACKEND.call(func, *args), pages))
+            if len(window) >= max(1, 2 * RENDER_BACKEND.workers):
+                drain()
+        while window:
+            drain()
+    finally:
+        for future, _ in window:
+            future.cancel()
+    concat.close()
+    WORKSHEET_SECONDS.observe(time.perf_counter() - start)
+    return done